@@ -0,0 +1,3 @@
+#!/bin/bash
+
+GUNICORN_MODE=asgi DJANGO_PROCESS_ROLE=asgi exec bash "$(dirname "$0")/start_gunicorn.sh"
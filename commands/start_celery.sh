@@ -1,3 +1,7 @@
 #!/bin/bash
 
+export DJANGO_PROCESS_ROLE=celery
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus-celery}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 celery -A config worker -l ${CELERY_LOG_LEVEL} -c ${CELERY_WORKERS_NUMBER}
\ No newline at end of file
@@ -1,3 +1,5 @@
 #!/bin/bash
 
+export DJANGO_PROCESS_ROLE=celery
+
 celery -A config worker -l ${CELERY_LOG_LEVEL} -c ${CELERY_WORKERS_NUMBER} --beat --scheduler django
\ No newline at end of file
@@ -0,0 +1,10 @@
+#!/bin/bash
+
+cd src
+
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus-web}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+python manage.py migrate
+python manage.py check
+gunicorn -c config/gunicorn.conf.py
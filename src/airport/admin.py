@@ -1,8 +1,9 @@
 from django.contrib import admin
 
-from airport.models import (Airplane, AirplaneType, Airport, Crew, Flight,
-                            FlightSeat, Order, Route, Seat, Tariff, Ticket,
-                            TicketClass)
+from airport.models import (Airplane, AirplaneType, Airport, Crew,
+                            EmailCampaign, EmailCampaignChunk, Flight,
+                            FlightAvailability, FlightSeat, Order, Route, Seat,
+                            Tariff, Ticket, TicketClass, TicketDeliveryJob)
 
 
 @admin.register(Flight)
@@ -73,3 +74,24 @@ class TariffAdmin(admin.ModelAdmin):
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ("created_at", "user")
+
+
+@admin.register(FlightAvailability)
+class FlightAvailabilityAdmin(admin.ModelAdmin):
+    list_display = ("flight", "ticket_class", "total_seats", "booked_seats")
+
+
+@admin.register(TicketDeliveryJob)
+class TicketDeliveryJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "render_status", "store_status", "email_status", "telegram_status", "created_at")
+
+
+@admin.register(EmailCampaign)
+class EmailCampaignAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "created_at", "finished_at")
+
+
+@admin.register(EmailCampaignChunk)
+class EmailCampaignChunkAdmin(admin.ModelAdmin):
+    list_display = ("campaign", "first_user_id", "last_user_id", "last_sent_id", "sent", "failed", "status")
+    list_filter = ("status",)
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AirportConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "airport"
+
+    def ready(self):
+        import airport.checks  # NOQA F401
+        import airport.metrics  # NOQA F401
+        import airport.signals  # NOQA F401
@@ -0,0 +1,248 @@
+import asyncio
+import math
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, NamedTuple
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import connection
+from django.db.models import Exists, OuterRef
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.benchmarks import dataset
+from airport.models import Flight, FlightSeat, Ticket, TicketDeliveryJob
+from airport.services.seat_holds import get_hold_store
+
+PERCENTILES = (50, 95, 99)
+# Full-table list endpoints are measured with fewer iterations.
+HEAVY_CASES = {"flight-seats", "tickets"}
+# Concurrent requests of the ASGI throughput runs.
+CONCURRENCY = 8
+# Development middleware left out of the measured stack: the debug toolbar
+# instruments every query of WSGI requests, and the query counter would see the
+# queries of all concurrent ASGI requests, which share the connection here.
+EXCLUDED_MIDDLEWARE = ("debug_toolbar.middleware.DebugToolbarMiddleware", "airport.querycount.QueryCountMiddleware")
+
+
+class Case(NamedTuple):
+    name: str
+    call: Callable
+
+
+def percentile(samples, value: int) -> float:
+    """Nearest-rank percentile of the samples."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(value / 100 * len(ordered)) - 1)]
+
+
+def measure(call, iterations: int) -> dict:
+    """
+    Latency percentiles of ``iterations`` calls, then queries and allocations of one more.
+
+    Queries and allocations are taken on a separate call because tracing them
+    slows the code down and would skew the latencies.
+    """
+    call()
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            call()
+        allocated, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = {f"p{value}_ms": round(percentile(latencies, value), 3) for value in PERCENTILES}
+    result.update(
+        mean_ms=round(statistics.fmean(latencies), 3),
+        iterations=iterations,
+        queries=len(queries),
+        allocated_kb=round(allocated / 1024, 1),
+        peak_kb=round(peak / 1024, 1),
+    )
+    return result
+
+
+class Scenario:
+    """
+    API hot paths exercised against a generated dataset.
+
+    Requests go through the Django test client with throttling disabled; the
+    Celery publish of send_ticket is replaced by a no-op, so only the request
+    path is measured. Run it inside a transaction that is rolled back: bookings
+    change the data.
+    """
+
+    def __init__(self, bookings: int):
+        self.client = APIClient()
+        # A customer with tickets, so send_ticket has something to deliver.
+        self.user = Ticket.objects.select_related("order__user").order_by("id").first().order.user
+        self.client.force_authenticate(self.user)
+        free = FlightSeat.objects.filter(~Exists(Ticket.objects.filter(flight_seat=OuterRef("pk"))))
+        self.free_seats = iter(free.order_by("flight_id", "id").values_list("flight_id", "id")[:bookings])
+
+    def cases(self) -> list:
+        return [
+            Case("flights", self.get(reverse("airport:flight-list"))),
+            Case("flights-filtered", self.get(reverse("airport:flight-list"), {"min_available_seats": 1})),
+            Case("flight-seats", self.get(reverse("airport:flightseat-list"))),
+            Case("tickets", self.get(reverse("airport:ticket-list"))),
+            Case("with-available-seats", self.with_available_seats),
+            Case("book", self.book),
+            Case("send-ticket", self.get(reverse("airport:send_ticket"))),
+        ]
+
+    def throughput_urls(self) -> dict:
+        """Endpoints served by async views, and a sync one for reference."""
+        job = TicketDeliveryJob.objects.create(user=self.user)
+        return {
+            "send-ticket": reverse("airport:send_ticket"),
+            "send-ticket-status": reverse("airport:send_ticket_status", args=[job.id]),
+            "flights": reverse("airport:flight-list"),
+        }
+
+    def get(self, url, params=None):
+        def call():
+            response = self.client.get(url, params)
+            assert response.status_code < 300, f"GET {url}: {response.status_code}"
+
+        return call
+
+    @staticmethod
+    def with_available_seats():
+        list(Flight.objects.with_available_seats().filter(available_seats__gte=1).order_by("departure_time")[:500])
+
+    def book(self):
+        flight_id, flight_seat_id = next(self.free_seats)
+        response = self.client.post(
+            reverse("airport:flight-book", args=[flight_id]),
+            {"tickets": [{"flight_seat": flight_seat_id, "price": 100}]},
+            format="json",
+        )
+        assert response.status_code == 201, f"book: {response.status_code} {response.data}"
+
+
+def throughput(url: str, user, requests: int, concurrency: int = CONCURRENCY) -> dict:
+    """
+    Requests per second of ``url`` through the WSGI handler, one request at a
+    time as a sync worker serves them, and through the ASGI handler with
+    ``concurrency`` requests in flight.
+
+    Both run in this process and the ORM work of the ASGI requests still runs
+    on one thread, so the numbers compare handler overhead and the gain from
+    overlapping waits, not a multi-worker deployment.
+    """
+    headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+    wsgi_client = Client(headers=headers)
+
+    def wsgi():
+        for _ in range(requests):
+            response = wsgi_client.get(url)
+            assert response.status_code < 300, f"WSGI GET {url}: {response.status_code}"
+
+    async def asgi():
+        client = AsyncClient()
+
+        async def worker(count):
+            for _ in range(count):
+                response = await client.get(url, headers=headers)
+                assert response.status_code < 300, f"ASGI GET {url}: {response.status_code}"
+
+        counts = [requests // concurrency + (index < requests % concurrency) for index in range(concurrency)]
+        await asyncio.gather(*(worker(count) for count in counts))
+
+    result = {"requests": requests, "concurrency": concurrency}
+    for name, run in (("wsgi", wsgi), ("asgi", async_to_sync(asgi))):
+        started = time.perf_counter()
+        run()
+        result[f"{name}_rps"] = round(requests / (time.perf_counter() - started), 1)
+    return result
+
+
+def benchmark_settings():
+    return override_settings(
+        ALLOWED_HOSTS=["testserver"],
+        SEAT_HOLD_BACKEND="airport.services.seat_holds.LocalHoldStore",
+        MIDDLEWARE=[name for name in settings.MIDDLEWARE if name not in EXCLUDED_MIDDLEWARE],
+    )
+
+
+def run_scale(scale: int, flights: int, iterations: int, seed: int) -> dict:
+    """
+    Generate a dataset of ``flights`` flights and measure every case on it.
+
+    Meant to run inside a transaction that is rolled back afterwards.
+    """
+    reference = dataset.create_reference(scale, seed)
+    generated = dataset.Dataset(reference, flights, start=datetime(2030, 1, 1), days=90, seed=seed, batch_size=1000)
+    for shard in range(generated.shards):
+        dataset.generate_shard(generated, shard)
+
+    results = {
+        "dataset": {
+            "flights": Flight.objects.count(),
+            "flight_seats": FlightSeat.objects.count(),
+            "tickets": Ticket.objects.count(),
+        },
+        "cases": {},
+    }
+    with (
+        benchmark_settings(),
+        mock.patch.object(APIView, "get_throttles", return_value=[]),
+        mock.patch("airport.views.start_ticket_delivery"),
+    ):
+        get_hold_store().clear()
+        scenario = Scenario(bookings=iterations + 2)
+        for case in scenario.cases():
+            count = max(1, iterations // 10) if case.name in HEAVY_CASES else iterations
+            results["cases"][case.name] = measure(case.call, count)
+        results["throughput"] = {
+            name: throughput(url, scenario.user, requests=max(CONCURRENCY, iterations))
+            for name, url in scenario.throughput_urls().items()
+        }
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    Regressions of ``current`` against ``baseline`` results.
+
+    A case regresses when its p95 latency grows by more than ``threshold``
+    (a fraction) or when it runs more queries; a throughput measurement when
+    its requests per second drop by more than ``threshold``. Returns readable
+    descriptions.
+    """
+    regressions = []
+    for scale, results in current["scales"].items():
+        baseline_scale = baseline.get("scales", {}).get(scale, {})
+        for name, metrics in results.get("throughput", {}).items():
+            before = baseline_scale.get("throughput", {}).get(name)
+            if before is None:
+                continue
+            for key in ("wsgi_rps", "asgi_rps"):
+                if metrics[key] < before[key] * (1 - threshold):
+                    regressions.append(f"scale {scale} {name}: {key} {before[key]:.1f} -> {metrics[key]:.1f}")
+        baseline_cases = baseline_scale.get("cases", {})
+        for name, metrics in results["cases"].items():
+            before = baseline_cases.get(name)
+            if before is None:
+                continue
+            if metrics["p95_ms"] > before["p95_ms"] * (1 + threshold):
+                regressions.append(f"scale {scale} {name}: p95 {before['p95_ms']:.1f} ms -> {metrics['p95_ms']:.1f} ms")
+            if metrics["queries"] > before["queries"]:
+                regressions.append(f"scale {scale} {name}: queries {before['queries']} -> {metrics['queries']}")
+    return regressions
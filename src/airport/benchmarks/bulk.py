@@ -0,0 +1,108 @@
+import time
+from typing import NamedTuple
+
+from django.db import connection, transaction
+
+from airport.benchmarks import rolled_back
+from airport.models import Airplane, AirplaneType, Airport, TicketClass
+from airport.serializers import (AirportSerializer, CrewSerializer,
+                                 RouteCreateSerializer, SeatCreateSerializer)
+
+
+class Result(NamedTuple):
+    name: str
+    items: int
+    seconds: float
+    queries: int
+    bulk_seconds: float
+    bulk_queries: int
+
+    @property
+    def speedup(self) -> float:
+        return self.seconds / self.bulk_seconds if self.bulk_seconds else 0.0
+
+
+def _measure(create) -> tuple:
+    queries = 0
+
+    def count_queries(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    with rolled_back(), connection.execute_wrapper(count_queries):
+        started = time.perf_counter()
+        create()
+        elapsed = time.perf_counter() - started
+    return elapsed, queries
+
+
+def _create_one_by_one(serializer_class, items) -> None:
+    for item in items:
+        serializer = serializer_class(data=item)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save()
+
+
+def _create_in_bulk(serializer_class, items) -> None:
+    serializer = serializer_class(data=items, many=True)
+    serializer.is_valid(raise_exception=True)
+    with transaction.atomic():
+        serializer.save()
+
+
+def compare(name, serializer_class, items) -> Result:
+    """
+    Time validating and saving ``items`` one by one, as separate POSTs do, and as one bulk create.
+    """
+    seconds, queries = _measure(lambda: _create_one_by_one(serializer_class, items))
+    bulk_seconds, bulk_queries = _measure(lambda: _create_in_bulk(serializer_class, items))
+    return Result(name, len(items), seconds, queries, bulk_seconds, bulk_queries)
+
+
+def run(count: int) -> list:
+    """
+    Compare single and bulk creates of ``count`` items per endpoint.
+
+    Meant to run inside a transaction that is rolled back afterwards.
+    """
+    airports = Airport.objects.bulk_create(
+        Airport(name=f"Airport {index}", closest_big_city="City", airport_code=f"BA{index}", geographical_coordinates=0)
+        for index in range(2)
+    )
+    airplanes = Airplane.objects.bulk_create(
+        Airplane(name=f"A{index}", airplane_type=AirplaneType.objects.create(name=f"Type {index}"))
+        for index in range(count // 260 + 1)
+    )
+    ticket_classes = TicketClass.objects.bulk_create(TicketClass(name=f"Class {index}") for index in range(3))
+
+    seats = [
+        {
+            "airplane": airplanes[index // 260].id,
+            "seat": index % 10 + 1,
+            "row": chr(ord("A") + index % 260 // 10),
+            "ticket_class": ticket_classes[index % 3].id,
+        }
+        for index in range(count)
+    ]
+    routes = [
+        {"source": airports[0].id, "destination": airports[1].id, "distance": 1000, "code_route": f"BR{index}"}
+        for index in range(count)
+    ]
+    new_airports = [
+        {
+            "name": f"Bulk {index}",
+            "closest_big_city": "City",
+            "airport_code": f"BB{index}",
+            "geographical_coordinates": 1,
+        }
+        for index in range(count)
+    ]
+    crews = [{"first_name": f"Pilot {index}", "last_name": "Benchmark"} for index in range(count)]
+    return [
+        compare("seats", SeatCreateSerializer, seats),
+        compare("routes", RouteCreateSerializer, routes),
+        compare("airports", AirportSerializer, new_airports),
+        compare("crews", CrewSerializer, crews),
+    ]
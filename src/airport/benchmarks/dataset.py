@@ -0,0 +1,285 @@
+import csv
+import io
+import random
+from datetime import datetime, timedelta
+from itertools import accumulate
+from string import ascii_uppercase
+from typing import NamedTuple
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from airport.bulk import bulk_created
+from airport.models import (Airplane, AirplaneType, Airport, Crew, Flight,
+                            FlightSeat, Order, Route, Seat, Ticket,
+                            TicketClass)
+
+BATCH_SIZE = 2000
+FLIGHTS_PER_SCALE = 1000
+AIRPORTS_PER_SCALE = 20
+AIRPLANES_PER_SCALE = 5
+USERS_PER_SCALE = 500
+CREW_PER_AIRPLANE = 15
+USER_PASSWORD = "loadtest"
+
+# Seat rows (letters), seats per row, and how many leading seat numbers belong to each premium class.
+LAYOUTS = {
+    "Regional jet": ("ABCD", 19, {"Business": 2}),
+    "Narrow-body": ("ABCDEF", 30, {"Business": 4}),
+    "Wide-body": ("ABCDEFGHJK", 40, {"First": 2, "Business": 6}),
+}
+LAYOUT_WEIGHTS = {"Regional jet": 3, "Narrow-body": 5, "Wide-body": 2}
+FARE_MULTIPLIERS = {"First": 8.0, "Business": 4.0, "Economy": 1.0}
+STATUS_WEIGHTS = {
+    Flight.Status.SCHEDULED: 90,
+    Flight.Status.DELAYED: 6,
+    Flight.Status.EN_ROUTE: 2,
+    Flight.Status.CANCELLED: 2,
+}
+ORDER_SIZES = (1, 1, 1, 2, 2, 3, 4)
+
+
+class RouteSpec(NamedTuple):
+    id: int
+    distance: int
+    hub_to_hub: bool
+
+
+class Reference(NamedTuple):
+    """Ids of the generated reference data that flight shards draw from."""
+
+    routes: list
+    route_weights: list
+    airplanes: list
+    seats: dict
+    crew_ids: list
+    user_ids: list
+    fares: dict
+
+
+class Dataset(NamedTuple):
+    reference: Reference
+    flights: int
+    start: datetime
+    days: int
+    seed: int
+    batch_size: int
+
+    @property
+    def shards(self) -> int:
+        return -(-self.flights // self.batch_size)
+
+
+def insert_rows(model, fields, rows) -> None:
+    """
+    Insert value tuples of ``fields``: with COPY on PostgreSQL, in batched INSERTs elsewhere.
+    """
+    if connection.vendor == "postgresql":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        quote = connection.ops.quote_name
+        columns = ", ".join(quote(model._meta.get_field(field).column) for field in fields)
+        sql = f"COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)"
+        with connection.cursor() as cursor:
+            if hasattr(cursor.cursor, "copy"):
+                # psycopg 3
+                with cursor.cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+                return
+            if hasattr(cursor.cursor, "copy_expert"):
+                cursor.copy_expert(sql, buffer)
+                return
+    model.objects.bulk_create([model(**dict(zip(fields, row))) for row in rows], batch_size=BATCH_SIZE)
+
+
+def airport_code(index: int) -> str:
+    """Deterministic four-letter codes ZAAA, ZAAB, ... that do not clash with IATA codes."""
+    letters = []
+    for _ in range(3):
+        index, remainder = divmod(index, len(ascii_uppercase))
+        letters.append(ascii_uppercase[remainder])
+    return "Z" + "".join(reversed(letters))
+
+
+def create_reference(scale: int, seed: int) -> Reference:
+    """
+    Create ticket classes, airplanes with seats, airports with hubs, routes, crew and users.
+
+    Every spoke airport is linked to two hubs and the hubs to each other; routes
+    between hubs are flown four times as often.
+    """
+    rng = random.Random(f"{seed}-reference")
+    classes = {name: TicketClass.objects.get_or_create(name=name)[0] for name in FARE_MULTIPLIERS}
+
+    types = {name: AirplaneType.objects.get_or_create(name=name)[0] for name in LAYOUTS}
+    layouts = rng.choices(list(LAYOUT_WEIGHTS), weights=list(LAYOUT_WEIGHTS.values()), k=AIRPLANES_PER_SCALE * scale)
+    airplanes = Airplane.objects.bulk_create(
+        [Airplane(name=f"{layout} {index + 1}", airplane_type=types[layout]) for index, layout in enumerate(layouts)],
+        batch_size=BATCH_SIZE,
+    )
+    seats = []
+    for airplane, layout in zip(airplanes, layouts):
+        rows, seats_per_row, premium = LAYOUTS[layout]
+        bounds = list(accumulate(premium.values()))
+        for number in range(1, seats_per_row + 1):
+            premium_classes = [name for name, bound in zip(premium, bounds) if number <= bound]
+            ticket_class = classes[premium_classes[0] if premium_classes else "Economy"]
+            for row in rows:
+                seats.append(
+                    Seat(airplane=airplane, seat=number, row=row, seat_type="standard", ticket_class=ticket_class)
+                )
+    seats = Seat.objects.bulk_create(seats, batch_size=BATCH_SIZE)
+    seats_by_airplane = {}
+    for seat in seats:
+        seats_by_airplane.setdefault(seat.airplane_id, []).append((seat.id, seat.ticket_class_id))
+
+    airport_count = min(AIRPORTS_PER_SCALE * scale, len(ascii_uppercase) ** 3)
+    airports = Airport.objects.bulk_create(
+        [
+            Airport(
+                name=f"Airport {airport_code(index)}",
+                closest_big_city=f"City {airport_code(index)}",
+                airport_code=airport_code(index),
+                geographical_coordinates=round(rng.uniform(-180, 180), 4),
+            )
+            for index in range(airport_count)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    hub_count = max(2, airport_count // 10)
+    hubs, spokes = airports[:hub_count], airports[hub_count:]
+    pairs = [(source, destination, True) for source in hubs for destination in hubs if source is not destination]
+    for spoke in spokes:
+        for hub in rng.sample(hubs, k=min(2, len(hubs))):
+            pairs += [(spoke, hub, False), (hub, spoke, False)]
+    routes = Route.objects.bulk_create(
+        [
+            Route(
+                source=source,
+                destination=destination,
+                distance=int(200 + abs(source.geographical_coordinates - destination.geographical_coordinates) * 30),
+                code_route=f"Z{index}",
+            )
+            for index, (source, destination, _) in enumerate(pairs)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    crew = Crew.objects.bulk_create(
+        [
+            Crew(first_name=f"Crew{index}", last_name=rng.choice(("Shevchenko", "Smith", "Martin", "Garcia")))
+            for index in range(CREW_PER_AIRPLANE * len(airplanes))
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    password = make_password(USER_PASSWORD)
+    users = get_user_model().objects.bulk_create(
+        [
+            get_user_model()(
+                username=f"loadtest{index}",
+                email=f"loadtest{index}@example.com",
+                phone=f"+38099{index:07d}",
+                password=password,
+            )
+            for index in range(USERS_PER_SCALE * scale)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    for model, instances in ((Airplane, airplanes), (Seat, seats), (Airport, airports), (Route, routes), (Crew, crew)):
+        bulk_created.send(sender=model, instances=instances)
+
+    return Reference(
+        routes=[RouteSpec(route.id, route.distance, hub_to_hub) for route, (_, _, hub_to_hub) in zip(routes, pairs)],
+        route_weights=[4 if hub_to_hub else 1 for _, _, hub_to_hub in pairs],
+        airplanes=[airplane.id for airplane in airplanes],
+        seats=seats_by_airplane,
+        crew_ids=[member.id for member in crew],
+        user_ids=[user.id for user in users],
+        fares={ticket_class.id: FARE_MULTIPLIERS[name] for name, ticket_class in classes.items()},
+    )
+
+
+def generate_shard(dataset: Dataset, shard: int) -> tuple:
+    """
+    Create the flights of one shard with their crew, seat inventory, orders and tickets.
+
+    The shard draws from its own seeded generator, so its content does not
+    depend on which process runs it or in what order. Returns (flights, tickets).
+    """
+    reference = dataset.reference
+    rng = random.Random(f"{dataset.seed}-flights-{shard}")
+    first = shard * dataset.batch_size
+    count = min(dataset.batch_size, dataset.flights - first)
+    window = dataset.days * 24 * 60
+
+    routes = rng.choices(reference.routes, weights=reference.route_weights, k=count)
+    statuses = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()), k=count)
+    flights = []
+    for route, flight_status in zip(routes, statuses):
+        departure_time = dataset.start + timedelta(minutes=rng.randrange(0, window, 5))
+        flights.append(
+            Flight(
+                route_id=route.id,
+                airplane_id=rng.choice(reference.airplanes),
+                departure_time=departure_time,
+                arrival_time=departure_time + timedelta(minutes=30 + route.distance * 60 // 800),
+                status=flight_status,
+            )
+        )
+
+    with transaction.atomic():
+        flights = Flight.objects.bulk_create(flights, batch_size=BATCH_SIZE)
+        insert_rows(
+            Flight.crew.through,
+            ("flight_id", "crew_id"),
+            [
+                (flight.id, crew_id)
+                for flight in flights
+                for crew_id in rng.sample(reference.crew_ids, k=min(len(reference.crew_ids), rng.randint(2, 4)))
+            ],
+        )
+        now = timezone.now()
+        insert_rows(
+            FlightSeat,
+            ("flight_id", "seat_id", "updated_at"),
+            [(flight.id, seat_id, now) for flight in flights for seat_id, _ in reference.seats[flight.airplane_id]],
+        )
+        flight_seats = dict(
+            ((flight_id, seat_id), pk)
+            for flight_id, seat_id, pk in FlightSeat.objects.filter(flight__in=flights).values_list(
+                "flight_id", "seat_id", "id"
+            )
+        )
+
+        bookings = []
+        for flight, route in zip(flights, routes):
+            if flight.status == Flight.Status.CANCELLED:
+                continue
+            inventory = reference.seats[flight.airplane_id]
+            load_factor = rng.betavariate(9, 2) if route.hub_to_hub else rng.betavariate(6, 3)
+            base_fare = 50 + route.distance * 0.1
+            for seat_id, ticket_class_id in rng.sample(inventory, k=int(len(inventory) * load_factor)):
+                price = round(base_fare * reference.fares[ticket_class_id], 2)
+                bookings.append((flight_seats[(flight.id, seat_id)], price))
+
+        owners, orders = [], []
+        while len(owners) < len(bookings):
+            orders.append(Order(user_id=rng.choice(reference.user_ids)))
+            owners += [len(orders) - 1] * rng.choice(ORDER_SIZES)
+        orders = Order.objects.bulk_create(orders, batch_size=BATCH_SIZE)
+        insert_rows(
+            Ticket,
+            ("flight_seat_id", "order_id", "price", "updated_at"),
+            [
+                (flight_seat_id, orders[owner].id, price, now)
+                for (flight_seat_id, price), owner in zip(bookings, owners)
+            ],
+        )
+        bulk_created.send(sender=Order, instances=orders)
+        # Rebuilds the availability counters of the flights, now that their tickets exist.
+        bulk_created.send(sender=Flight, instances=flights)
+    return len(flights), len(bookings)
@@ -0,0 +1,112 @@
+import time
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from rest_framework.renderers import JSONRenderer
+
+from airport.models import (Airplane, AirplaneType, Airport, Crew, Flight,
+                            FlightSeat, Route, Seat, TicketClass)
+from airport.row_serializers import (FlightRowSerializer,
+                                     FlightSeatRowSerializer)
+from airport.serializers import (FlightListRetrieveSerializer,
+                                 FlightSeatListRetrieveSerializer)
+
+SEATS_PER_FLIGHT = 10
+CREW_PER_FLIGHT = 3
+
+
+class Result(NamedTuple):
+    name: str
+    rows: int
+    seconds: float
+    fast_seconds: float
+
+    @property
+    def speedup(self) -> float:
+        return self.seconds / self.fast_seconds if self.fast_seconds else 0.0
+
+
+def create_flights(count: int) -> None:
+    """
+    Create ``count`` flights and ``count`` flight seats in bulk.
+
+    Meant to run inside a transaction that is rolled back afterwards.
+    """
+    kbp = Airport.objects.create(
+        name="Boryspil", closest_big_city="Kyiv", airport_code="KBP", geographical_coordinates=1
+    )
+    lhr = Airport.objects.create(
+        name="Heathrow", closest_big_city="London", airport_code="LHR", geographical_coordinates=2
+    )
+    route = Route.objects.create(source=kbp, destination=lhr, distance=2100, code_route="KBP-LHR")
+    airplane = Airplane.objects.create(name="A320", airplane_type=AirplaneType.objects.create(name="Jet"))
+    economy = TicketClass.objects.create(name="Economy")
+    seats = Seat.objects.bulk_create(
+        Seat(airplane=airplane, seat=1, row=chr(ord("A") + index), seat_type="window", ticket_class=economy)
+        for index in range(SEATS_PER_FLIGHT)
+    )
+    crew = Crew.objects.bulk_create(
+        Crew(first_name=f"Pilot{index}", last_name="Benchmark") for index in range(CREW_PER_FLIGHT)
+    )
+
+    departure_time = datetime(2030, 1, 1, 6, 0)
+    flights = Flight.objects.bulk_create(
+        Flight(
+            route=route,
+            airplane=airplane,
+            departure_time=departure_time + timedelta(minutes=index),
+            arrival_time=departure_time + timedelta(minutes=index, hours=2, seconds=index % 3600),
+            status=index % 4 + 1,
+        )
+        for index in range(count)
+    )
+    Flight.crew.through.objects.bulk_create(
+        Flight.crew.through(flight_id=flight.id, crew_id=member.id) for flight in flights for member in crew
+    )
+    FlightSeat.objects.bulk_create(
+        FlightSeat(flight=flight, seat=seat) for flight in flights[: count // SEATS_PER_FLIGHT + 1] for seat in seats
+    )
+
+
+def _best_of(repeat: int, render) -> tuple:
+    best, output = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = render()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+def compare(name, queryset, serializer_class, row_serializer, rows: int, repeat: int) -> Result:
+    """
+    Time rendering ``rows`` rows of ``queryset`` to JSON with the DRF serializer and with the row serializer.
+
+    Both paths include their database queries. Raises AssertionError if the JSON differs.
+    """
+    queryset = queryset.order_by("id")
+    values = queryset.select_related(None).prefetch_related(None).values(*row_serializer.columns)
+    renderer = JSONRenderer()
+
+    seconds, expected = _best_of(repeat, lambda: renderer.render(serializer_class(queryset[:rows], many=True).data))
+    fast_seconds, actual = _best_of(repeat, lambda: renderer.render(row_serializer.serialize(list(values[:rows]))))
+    if actual != expected:
+        raise AssertionError(f"{name}: row serializer output differs from {serializer_class.__name__}")
+    return Result(name, rows, seconds, fast_seconds)
+
+
+def run(rows: int, repeat: int = 3) -> list:
+    flights = Flight.objects.select_related("route__source", "route__destination", "airplane").prefetch_related("crew")
+    flight_seats = FlightSeat.objects.select_related(
+        "seat__airplane",
+        "seat__ticket_class",
+        "flight__route__source",
+        "flight__route__destination",
+        "flight__airplane",
+    ).prefetch_related("flight__crew")
+    return [
+        compare("flights", flights, FlightListRetrieveSerializer, FlightRowSerializer(), rows, repeat),
+        compare(
+            "flight-seats", flight_seats, FlightSeatListRetrieveSerializer, FlightSeatRowSerializer(), rows, repeat
+        ),
+    ]
@@ -0,0 +1,177 @@
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.dispatch import Signal
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
+
+# Sent after BulkCreateListSerializer inserted rows, which bypasses post_save.
+# Receivers get the model as sender and the created ``instances``.
+bulk_created = Signal()
+
+BULK_INSTANCES = "bulk_instances"
+UNIQUE_CHECK_CHUNK_SIZE = 500
+
+
+def unique_field_sets(model) -> list:
+    """
+    Field name tuples that must be unique together, single unique fields included.
+    """
+    field_sets = [(field.name,) for field in model._meta.concrete_fields if field.unique and not field.primary_key]
+    field_sets += [tuple(fields) for fields in model._meta.unique_together]
+    field_sets += [tuple(constraint.fields) for constraint in model._meta.total_unique_constraints]
+    return list(dict.fromkeys(field_sets))
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField resolved from instances preloaded by BulkCreateListSerializer.
+
+    Fields of the same model share one lookup with the queryset of the first of
+    them. Outside a bulk create it behaves as PrimaryKeyRelatedField.
+    """
+
+    def to_internal_value(self, data):
+        model = self.get_queryset().model
+        loaded = self.context.get(BULK_INSTANCES, {}).get(model)
+        if loaded is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = model._meta.pk.to_python(data)
+        except (TypeError, DjangoValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if pk not in loaded:
+            self.fail("does_not_exist", pk_value=data)
+        return loaded[pk]
+
+
+class BulkCreateListSerializer(serializers.ListSerializer):
+    """
+    List serializer that validates and inserts many objects at once.
+
+    Related objects of all items are loaded with one query per related model, unique
+    fields are checked for the whole list with a query per unique field set instead
+    of one per item, and rows are inserted with ``bulk_create`` in batches of
+    BULK_CREATE_BATCH_SIZE. Errors are reported per item, in request order.
+    """
+
+    unique_error = "This field must be unique."
+    unique_together_error = "The fields {field_names} must make a unique set."
+
+    def to_internal_value(self, data):
+        self.remove_unique_validators()
+        if isinstance(data, list):
+            self.preload_related(data)
+        try:
+            validated = super().to_internal_value(data)
+        finally:
+            self.context.pop(BULK_INSTANCES, None)
+        self.validate_unique(validated)
+        return validated
+
+    def remove_unique_validators(self) -> None:
+        """Drop the per-item unique validators of the child: validate_unique() checks the whole list."""
+        self.child.validators = [
+            validator for validator in self.child.validators if not isinstance(validator, UniqueTogetherValidator)
+        ]
+        for field in self.child.fields.values():
+            field.validators = [
+                validator for validator in field.validators if not isinstance(validator, UniqueValidator)
+            ]
+
+    def preload_related(self, data) -> None:
+        """Load the instances referenced by BulkPrimaryKeyRelatedFields, one query per model."""
+        fields = [
+            field
+            for field in self.child.fields.values()
+            if isinstance(field, BulkPrimaryKeyRelatedField) and not field.read_only
+        ]
+        querysets, pks = {}, {}
+        for field in fields:
+            queryset = field.get_queryset()
+            querysets.setdefault(queryset.model, queryset)
+            model_pks = pks.setdefault(queryset.model, set())
+            for item in data:
+                value = item.get(field.field_name) if isinstance(item, dict) else None
+                if value is None or isinstance(value, bool):
+                    continue
+                try:
+                    model_pks.add(queryset.model._meta.pk.to_python(value))
+                except (TypeError, DjangoValidationError):
+                    continue
+        self.context[BULK_INSTANCES] = {model: querysets[model].in_bulk(model_pks) for model, model_pks in pks.items()}
+
+    def validate_unique(self, items) -> None:
+        model = self.child.Meta.model
+        writable = {name for name, field in self.child.fields.items() if not field.read_only}
+        errors = [{} for _ in items]
+
+        for names in unique_field_sets(model):
+            if not writable.issuperset(names):
+                continue
+            keys = {}
+            for index, item in enumerate(items):
+                key = tuple(getattr(item.get(name), "pk", item.get(name)) for name in names)
+                if None in key:
+                    continue
+                if key in keys:
+                    self.add_unique_error(errors[index], names)
+                else:
+                    keys[key] = index
+            for key in self.existing_keys(model, names, list(keys)):
+                self.add_unique_error(errors[keys[key]], names)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+    @staticmethod
+    def existing_keys(model, names, keys):
+        for start in range(0, len(keys), UNIQUE_CHECK_CHUNK_SIZE):
+            end = start + UNIQUE_CHECK_CHUNK_SIZE
+            chunk = keys[start:end]
+            condition = reduce(or_, (Q(**dict(zip(names, key))) for key in chunk))
+            yield from model._default_manager.filter(condition).values_list(*names).distinct()
+
+    def add_unique_error(self, errors, names) -> None:
+        if len(names) == 1:
+            errors.setdefault(names[0], []).append(self.unique_error)
+        else:
+            message = self.unique_together_error.format(field_names=", ".join(names))
+            errors.setdefault(api_settings.NON_FIELD_ERRORS_KEY, []).append(message)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        instances = model._default_manager.bulk_create(
+            [model(**attrs) for attrs in validated_data], batch_size=settings.BULK_CREATE_BATCH_SIZE
+        )
+        bulk_created.send(sender=model, instances=instances)
+        return instances
+
+
+class BulkCreateMixin:
+    """
+    Create accepts a JSON list of objects and inserts them in one transaction.
+
+    A single object is created as before. The child serializer must declare
+    ``list_serializer_class = BulkCreateListSerializer``.
+    """
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(
+            data=request.data, many=True, allow_empty=False, max_length=settings.BULK_CREATE_MAX_ITEMS
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
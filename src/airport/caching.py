@@ -0,0 +1,256 @@
+import calendar
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from config.db_router import primary_reads
+
+VERSION_KEY = "response-version:{}"
+MODIFIED_KEY = "last-modified:{}"
+
+
+def cache_is_shared() -> bool:
+    """
+    Whether the default cache is shared between processes, so version bumps reach every worker.
+    """
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache)
+
+
+def _version_key(model) -> str:
+    return VERSION_KEY.format(model._meta.label_lower)
+
+
+def model_versions(models) -> list:
+    """
+    Current cache version of each model, in order.
+    """
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, 0, timeout=None)
+            versions[key] = cache.get(key, 0)
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(model) -> None:
+    key = _version_key(model)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+    cache.set(MODIFIED_KEY.format(model._meta.label_lower), timezone.now(), timeout=None)
+
+
+def last_change(models):
+    """
+    Time of the latest version bump of any of the models, None if none was recorded.
+    """
+    moments = cache.get_many([MODIFIED_KEY.format(model._meta.label_lower) for model in models])
+    return max(moments.values(), default=None)
+
+
+def _etag_matches(request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match", "")
+    return header.strip() == "*" or etag in [value.strip() for value in header.split(",")]
+
+
+def _with_validators(response, headers: dict):
+    if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+        for name, value in headers.items():
+            response[name] = value
+        patch_vary_headers(response, ["Accept"])
+    return response
+
+
+class CachedResponseMixin:
+    """
+    Cache list and retrieve responses of a viewset.
+
+    Cache keys embed a version counter of every model in ``cache_models``;
+    model signals bump the counters on commit, so entries of older versions are
+    never read again and simply expire; with a per-process cache, which other
+    processes' bumps never reach, entries expire after LOCAL_RESPONSE_CACHE_TIMEOUT
+    at the latest. Misses are filled from the primary
+    database, since a replica may not have replayed the commit that bumped the
+    version yet. Responses carry an ETag, and a request with a matching
+    If-None-Match gets 304 Not Modified.
+    """
+
+    cache_models = ()
+    cache_timeout = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_cache_models(self):
+        return self.cache_models or (self.queryset.model,)
+
+    def get_response_cache_key(self, request) -> str:
+        versions = ".".join(str(version) for version in model_versions(self.get_cache_models()))
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        return f"response:{type(self).__name__}:{self.action}:{versions}:{path}"
+
+    def cached_response(self, view, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        if cached is None:
+            with primary_reads():
+                response = view(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cached = (hashlib.md5(JSONRenderer().render(response.data)).hexdigest(), response.data)
+            timeout = self.cache_timeout if self.cache_timeout is not None else settings.RESPONSE_CACHE_TIMEOUT
+            if not cache_is_shared():
+                timeout = min(timeout, settings.LOCAL_RESPONSE_CACHE_TIMEOUT)
+            cache.set(key, cached, timeout)
+
+        digest, data = cached
+        representation = f"{digest}|{request.accepted_renderer.media_type}"
+        etag = f'"{hashlib.md5(representation.encode()).hexdigest()}"'
+        if _etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        else:
+            response = Response(data, headers={"ETag": etag})
+        patch_vary_headers(response, ["Accept"])
+        return response
+
+
+class ConditionalResponseMixin:
+    """
+    Answer conditional list and retrieve requests without loading rows.
+
+    A list is validated by the versions of its model and of the models the
+    serializer embeds (``conditional_models``), so checking it costs a few cache
+    reads however many rows match; signals bump the versions on commit. A
+    retrieve is validated by the newest ``watermark_fields`` value of its row,
+    read by primary key, and the versions of ``conditional_models``.
+    Last-Modified is the newest of those moments. A matching If-None-Match, or an
+    If-Modified-Since not older than Last-Modified, gets 304 Not Modified.
+
+    Responses that also depend on state outside the database, which can change
+    without any version moving, are left unconditional by ``is_conditional``.
+    """
+
+    watermark_fields = ("updated_at",)
+    conditional_models = ()
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_conditional():
+            return super().list(request, *args, **kwargs)
+        models = (self.queryset.model, *self.get_conditional_models())
+        return self.conditional_response(models, "", last_change(models), super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.is_conditional():
+            return super().retrieve(request, *args, **kwargs)
+        models = self.get_conditional_models()
+        count, modified = self.get_watermark(self.get_watermark_queryset(kwargs))
+        modified = max(filter(None, (modified, last_change(models))), default=None)
+        return self.conditional_response(models, count, modified, super().retrieve, request, *args, **kwargs)
+
+    def get_conditional_models(self):
+        return self.conditional_models
+
+    def is_conditional(self) -> bool:
+        return True
+
+    def get_watermark_queryset(self, kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            return self.get_queryset().filter(**{self.lookup_field: kwargs[lookup_url_kwarg]}).order_by()
+        except (TypeError, ValueError, ValidationError):
+            # A lookup value of the wrong type matches no row, as in get_object.
+            raise Http404
+
+    def get_watermark_aggregates(self) -> dict:
+        aggregates = {f"watermark_{index}": Max(field) for index, field in enumerate(self.watermark_fields)}
+        return {"count": Count("pk"), **aggregates}
+
+    def get_watermark(self, queryset):
+        return self.read_watermark(queryset.aggregate(**self.get_watermark_aggregates()))
+
+    @staticmethod
+    def read_watermark(watermark: dict):
+        moments = [value for key, value in watermark.items() if key != "count" and value is not None]
+        return watermark["count"], max(moments, default=None)
+
+    def conditional_response(self, models, watermark, last_modified, view, request, *args, **kwargs):
+        headers, not_modified = self.check_validators(models, watermark, last_modified, request)
+        if not_modified:
+            return _with_validators(Response(status=status.HTTP_304_NOT_MODIFIED), headers)
+        return _with_validators(view(request, *args, **kwargs), headers)
+
+    def check_validators(self, models, watermark, last_modified, request):
+        """
+        The ETag and Last-Modified headers of the response, and whether the client's copy is still fresh.
+        """
+        versions = model_versions(models)
+        moment = last_modified and last_modified.isoformat()
+        # JSON and NDJSON bodies of the same URL differ, so the representation is part of the validator.
+        media_type = request.accepted_renderer.media_type
+        validator = f"{request.get_full_path()}|{media_type}|{watermark}|{moment}|{versions}"
+        headers = {"ETag": f'"{hashlib.md5(validator.encode()).hexdigest()}"'}
+        if last_modified is not None:
+            headers["Last-Modified"] = http_date(calendar.timegm(last_modified.utctimetuple()))
+
+        if "If-None-Match" in request.headers:
+            not_modified = _etag_matches(request, headers["ETag"])
+        else:
+            since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+            not_modified = None not in (since, last_modified) and calendar.timegm(last_modified.utctimetuple()) <= since
+        return headers, not_modified
+
+
+class AsyncConditionalResponseMixin(ConditionalResponseMixin):
+    """
+    ConditionalResponseMixin for an AsyncGenericViewSet whose list and retrieve are coroutines.
+
+    The cache reads run off the event loop and the retrieve watermark is read
+    with the async ORM; the response is awaited from the view below.
+    """
+
+    async def list(self, request, *args, **kwargs):
+        # The list below the mixins, past the sync one of ConditionalResponseMixin.
+        view = super(ConditionalResponseMixin, self).list
+        if not self.is_conditional():
+            return await view(request, *args, **kwargs)
+        models = (self.queryset.model, *self.get_conditional_models())
+        modified = await sync_to_async(last_change, thread_sensitive=False)(models)
+        return await self.aconditional_response(models, "", modified, view, request, *args, **kwargs)
+
+    async def retrieve(self, request, *args, **kwargs):
+        view = super(ConditionalResponseMixin, self).retrieve
+        if not self.is_conditional():
+            return await view(request, *args, **kwargs)
+        models = self.get_conditional_models()
+        count, modified = await self.aget_watermark(self.get_watermark_queryset(kwargs))
+        changed = await sync_to_async(last_change, thread_sensitive=False)(models)
+        modified = max(filter(None, (modified, changed)), default=None)
+        return await self.aconditional_response(models, count, modified, view, request, *args, **kwargs)
+
+    async def aget_watermark(self, queryset):
+        return self.read_watermark(await queryset.aaggregate(**self.get_watermark_aggregates()))
+
+    async def aconditional_response(self, models, watermark, last_modified, view, request, *args, **kwargs):
+        check_validators = sync_to_async(self.check_validators, thread_sensitive=False)
+        headers, not_modified = await check_validators(models, watermark, last_modified, request)
+        if not_modified:
+            return _with_validators(Response(status=status.HTTP_304_NOT_MODIFIED), headers)
+        return _with_validators(await view(request, *args, **kwargs), headers)
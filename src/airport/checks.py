@@ -0,0 +1,20 @@
+from django.core import checks
+
+from airport.caching import cache_is_shared
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Cached responses, ETags and the connection index are invalidated through the default cache,
+    so a deployment with several processes needs it shared.
+    """
+    if cache_is_shared():
+        return []
+    return [
+        checks.Error(
+            "The default cache is local to each process, so writes do not invalidate other workers' caches.",
+            hint="Set CACHE_REDIS_URL.",
+            id="airport.E001",
+        )
+    ]
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from airport.benchmarks import bulk, rolled_back
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare creating seats, routes, airports and crews one by one with bulk creates. "
+        "The data is created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, nargs="+", default=[100, 1000], help="Items per create")
+
+    def handle(self, *args, **options):
+        for count in options["items"]:
+            with rolled_back():
+                results = bulk.run(count)
+            for result in results:
+                self.stdout.write(
+                    f"{result.name:<9} {result.items:>6} items: "
+                    f"one by one {result.items / result.seconds:>9.0f} items/s ({result.queries} queries), "
+                    f"bulk {result.items / result.bulk_seconds:>9.0f} items/s ({result.bulk_queries} queries), "
+                    f"{result.speedup:.1f}x"
+                )
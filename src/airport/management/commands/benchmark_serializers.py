@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from airport.benchmarks import rolled_back, serializers
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of the flight list serializers with the row serializers "
+        "on generated data. The data is created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000], help="Row counts to render")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best one is reported")
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            serializers.create_flights(max(options["rows"]))
+            for rows in options["rows"]:
+                for result in serializers.run(rows, options["repeat"]):
+                    self.stdout.write(
+                        f"{result.name:<13} {result.rows:>7} rows: "
+                        f"serializer {result.rows / result.seconds:>10.0f} rows/s, "
+                        f"row serializer {result.rows / result.fast_seconds:>10.0f} rows/s, "
+                        f"{result.speedup:.1f}x"
+                    )
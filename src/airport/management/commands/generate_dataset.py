@@ -0,0 +1,86 @@
+import multiprocessing
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+
+from airport.benchmarks import dataset
+from airport.models import Airport
+
+_dataset = None
+
+
+def _init_worker(generated):
+    global _dataset
+    _dataset = generated
+    # Forked workers must not share the parent's database connections.
+    connections.close_all()
+
+
+def _generate_shard(shard):
+    return dataset.generate_shard(_dataset, shard)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic dataset for load tests: per unit of --scale "
+        f"{dataset.FLIGHTS_PER_SCALE} flights with seat inventory, orders and tickets, "
+        f"{dataset.AIRPORTS_PER_SCALE} airports around hubs, {dataset.AIRPLANES_PER_SCALE} airplanes "
+        f"and {dataset.USERS_PER_SCALE} users (password '{dataset.USER_PASSWORD}')."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=int, default=1, help="Size multiplier")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the random generators")
+        parser.add_argument("--start", type=datetime.fromisoformat, default=datetime(2030, 1, 1), help="First day")
+        parser.add_argument("--flights", type=int, help="Number of flights instead of the scaled default")
+        parser.add_argument("--days", type=int, default=90, help="Days the departures are spread over")
+        parser.add_argument("--workers", type=int, default=1, help="Processes inserting flight shards")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Flights per shard and transaction")
+
+    def handle(self, *args, **options):
+        if options["scale"] < 1 or options["workers"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--scale, --workers and --batch-size must be positive")
+        if options["workers"] > 1 and connection.vendor == "sqlite":
+            raise CommandError("SQLite allows a single writer; use --workers 1")
+        if Airport.objects.filter(airport_code=dataset.airport_code(0)).exists():
+            raise CommandError("A generated dataset already exists in this database")
+
+        started = time.monotonic()
+        with transaction.atomic():
+            reference = dataset.create_reference(options["scale"], options["seed"])
+        self.stdout.write(
+            f"Reference data: {len(reference.routes)} routes, {len(reference.airplanes)} airplanes, "
+            f"{len(reference.user_ids)} users"
+        )
+
+        generated = dataset.Dataset(
+            reference=reference,
+            flights=options["flights"] or dataset.FLIGHTS_PER_SCALE * options["scale"],
+            start=options["start"],
+            days=options["days"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+        )
+        flights = tickets = 0
+        for shard_flights, shard_tickets in self.run_shards(generated, options["workers"]):
+            flights += shard_flights
+            tickets += shard_tickets
+            rate = flights / max(time.monotonic() - started, 1e-9)
+            self.stdout.write(f"{flights}/{generated.flights} flights, {tickets} tickets ({rate:.0f} flights/s)")
+
+        self.stdout.write(self.style.SUCCESS(f"Generated {flights} flights and {tickets} tickets"))
+
+    @staticmethod
+    def run_shards(generated, workers):
+        shards = range(generated.shards)
+        if workers == 1:
+            for shard in shards:
+                yield dataset.generate_shard(generated, shard)
+            return
+
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        with context.Pool(workers, initializer=_init_worker, initargs=(generated,)) as pool:
+            yield from pool.imap_unordered(_generate_shard, shards)
@@ -0,0 +1,92 @@
+import json
+import os
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.services.schedule_import import (COLUMNS, ScheduleImporter,
+                                              read_schedule)
+
+MAX_REPORTED_ERRORS = 20
+
+
+class Command(BaseCommand):
+    help = (
+        "Import flights, routes and crew assignments from a CSV or Parquet schedule. "
+        f"Columns: {', '.join(COLUMNS)}; crew holds 'First Last' names separated by ';'. "
+        "Progress is checkpointed after every chunk and --resume continues after the last one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Schedule file (.csv or .parquet)")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rows imported per transaction")
+        parser.add_argument("--checkpoint", help="Checkpoint file (default: <path>.checkpoint)")
+        parser.add_argument("--resume", action="store_true", help="Skip the rows recorded in the checkpoint")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.is_file():
+            raise CommandError(f"{path} does not exist")
+        checkpoint_path = Path(options["checkpoint"] or f"{path}.checkpoint")
+        progress = self.load_checkpoint(checkpoint_path, path) if options["resume"] else self.new_progress(path)
+
+        try:
+            rows = read_schedule(path)
+        except ImportError as exc:
+            raise CommandError(str(exc)) from exc
+        # Data rows start on line 2 of a CSV, after the header.
+        line = progress["rows"] + 2
+        rows = islice(rows, progress["rows"], None)
+        importer = ScheduleImporter()
+        started = time.monotonic()
+        imported = 0
+
+        while chunk := list(islice(rows, options["chunk_size"])):
+            result = importer.import_chunk(chunk, first_line=line)
+            line += len(chunk)
+            imported += len(chunk)
+            progress["rows"] += len(chunk)
+            progress["created"] += result.created
+            progress["duplicates"] += result.duplicates
+            progress["errors"] += len(result.errors)
+            self.save_checkpoint(checkpoint_path, progress)
+
+            for error_line, message in result.errors[:MAX_REPORTED_ERRORS]:
+                self.stderr.write(f"Line {error_line}: {message}")
+            rate = imported / max(time.monotonic() - started, 1e-9)
+            self.stdout.write(
+                f"{progress['rows']} rows: {progress['created']} flights created, "
+                f"{progress['duplicates']} already present, {progress['errors']} rejected ({rate:.0f} rows/s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {path}: {progress['created']} flights created"))
+
+    @staticmethod
+    def new_progress(path) -> dict:
+        return {
+            "source": str(path.resolve()),
+            "size": path.stat().st_size,
+            "rows": 0,
+            "created": 0,
+            "duplicates": 0,
+            "errors": 0,
+        }
+
+    def load_checkpoint(self, checkpoint_path, path) -> dict:
+        if not checkpoint_path.exists():
+            return self.new_progress(path)
+        progress = json.loads(checkpoint_path.read_text())
+        expected = self.new_progress(path)
+        if (progress["source"], progress["size"]) != (expected["source"], expected["size"]):
+            raise CommandError(f"{checkpoint_path} belongs to another version of the schedule; remove it to start over")
+        self.stdout.write(f"Resuming after {progress['rows']} rows")
+        return progress
+
+    @staticmethod
+    def save_checkpoint(checkpoint_path, progress) -> None:
+        # Write then rename, so an interrupted run never leaves a truncated checkpoint.
+        temporary = checkpoint_path.with_name(f"{checkpoint_path.name}.tmp")
+        temporary.write_text(json.dumps(progress))
+        os.replace(temporary, checkpoint_path)
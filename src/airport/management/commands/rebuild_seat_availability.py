@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.services.seat_availability import (rebuild_availability,
+                                                verify_availability)
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the FlightAvailability seat counters from seats and tickets, "
+        "or compare them with a fresh count with --verify."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--flight", type=int, nargs="+", dest="flights", help="Only these flight ids")
+        parser.add_argument(
+            "--verify", action="store_true", help="Report mismatching counters instead of rebuilding them"
+        )
+
+    def handle(self, *args, **options):
+        flights = options["flights"]
+
+        if not options["verify"]:
+            written = rebuild_availability(flights)
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} seat availability counters"))
+            return
+
+        mismatches = verify_availability(flights)
+        for flight_id, ticket_class_id, stored, actual in mismatches:
+            self.stdout.write(
+                f"Flight {flight_id}, ticket class {ticket_class_id}: "
+                f"stored (total, booked)={stored}, actual={actual}"
+            )
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} seat availability counters are out of date")
+        self.stdout.write(self.style.SUCCESS("Seat availability counters are up to date"))
@@ -0,0 +1,85 @@
+import json
+import platform
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from airport.benchmarks import api, dataset, rolled_back
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the API hot paths (flight, flight seat and ticket lists, with_available_seats(), "
+        "booking, send_ticket) on generated datasets, in a transaction that is rolled back. "
+        "Reports latency percentiles, query counts and allocations, and WSGI against ASGI throughput, "
+        "optionally compared with a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", type=int, nargs="+", default=[1], help="Dataset scales (see generate_dataset)")
+        parser.add_argument(
+            "--flights-per-scale", type=int, default=dataset.FLIGHTS_PER_SCALE, help="Flights per unit of scale"
+        )
+        parser.add_argument("--iterations", type=int, default=50, help="Timed calls per case")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the dataset")
+        parser.add_argument("--output", help="Write the results to this JSON file")
+        parser.add_argument("--compare", help="Baseline results JSON to check for regressions")
+        parser.add_argument(
+            "--threshold", type=float, default=0.2, help="Allowed p95 slowdown against the baseline (0.2 = 20%%)"
+        )
+
+    def handle(self, *args, **options):
+        baseline = json.loads(Path(options["compare"]).read_text()) if options["compare"] else None
+        results = {
+            "commit": git_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "iterations": options["iterations"],
+            "scales": {},
+        }
+
+        for scale in options["scales"]:
+            flights = scale * options["flights_per_scale"]
+            self.stdout.write(f"Scale {scale}: generating {flights} flights")
+            with rolled_back():
+                measured = api.run_scale(scale, flights, options["iterations"], options["seed"])
+            results["scales"][str(scale)] = measured
+            for name, metrics in measured["cases"].items():
+                self.stdout.write(
+                    f"  {name:<21} p50 {metrics['p50_ms']:>9.2f} ms  p95 {metrics['p95_ms']:>9.2f} ms  "
+                    f"p99 {metrics['p99_ms']:>9.2f} ms  {metrics['queries']:>3} queries  "
+                    f"peak {metrics['peak_kb']:>9.1f} KiB"
+                )
+            for name, metrics in measured["throughput"].items():
+                self.stdout.write(
+                    f"  {name:<21} WSGI {metrics['wsgi_rps']:>8.1f} req/s  "
+                    f"ASGI {metrics['asgi_rps']:>8.1f} req/s ({metrics['concurrency']} concurrent)"
+                )
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is not None:
+            regressions = api.compare(results, baseline, options["threshold"])
+            for regression in regressions:
+                self.stderr.write(regression)
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions against {options['compare']}")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}"))
@@ -1,5 +1,7 @@
+from django.apps import apps
 from django.db import models
-from django.db.models import Count, F
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 
 
 class FlightQuerySet(models.QuerySet):
@@ -9,13 +11,24 @@ class FlightQuerySet(models.QuerySet):
     Adds an annotation with the number of available seats on flights:
     - total_seats: total number of seats.
     - booked_seats: number of seats already booked.
-    - available_seats: the number of available seats.
+    - available_seats: the number of seats not booked.
+
+    The numbers are read from the FlightAvailability counters, one indexed
+    lookup per flight instead of counting seats and tickets. Holds live in the
+    hold store, not in the database, so callers subtract them for the flights
+    they return (see HoldStore.held_per_flight).
     """
 
     def with_available_seats(self):
+        availability = (
+            apps.get_model("airport", "FlightAvailability")
+            .objects.filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+        )
         return self.annotate(
-            total_seats=Count("airplane__seats_airplane", distinct=True),
-            booked_seats=Count("flight_seats__ticket_flight", distinct=True),
+            total_seats=Coalesce(Subquery(availability.annotate(total=Sum("total_seats")).values("total")), 0),
+            booked_seats=Coalesce(Subquery(availability.annotate(booked=Sum("booked_seats")).values("booked")), 0),
         ).annotate(available_seats=F("total_seats") - F("booked_seats"))
 
 
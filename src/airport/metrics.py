@@ -0,0 +1,257 @@
+import hmac
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from celery import signals
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess,
+                               start_http_server)
+
+from airport.querycount import ExecuteWrapper
+
+logger = logging.getLogger(__name__)
+
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, float("inf"))
+
+REQUEST_DURATION = Histogram(
+    "airport_http_request_duration_seconds", "Time spent on HTTP requests", ["view", "method", "status"]
+)
+REQUEST_DB_QUERIES = Histogram(
+    "airport_http_request_db_queries", "SQL queries per HTTP request", ["view", "method"], buckets=QUERY_BUCKETS
+)
+REQUEST_DB_DURATION = Histogram(
+    "airport_http_request_db_duration_seconds", "Time spent in SQL queries per HTTP request", ["view", "method"]
+)
+TASK_DURATION = Histogram("airport_celery_task_duration_seconds", "Celery task run time", ["task", "state"])
+TASK_FAILURES = Counter("airport_celery_task_failures_total", "Celery tasks that raised", ["task", "exception"])
+TASK_RETRIES = Counter("airport_celery_task_retries_total", "Celery task retries", ["task"])
+PDF_RENDER_DURATION = Histogram("airport_pdf_render_duration_seconds", "Chromium PDF render time", ["outcome"])
+PDF_RENDER_REJECTED = Counter("airport_pdf_render_rejected_total", "PDF renders rejected by a full queue")
+DELIVERY_DURATION = Histogram("airport_delivery_duration_seconds", "Time to hand a message to a channel", ["channel"])
+DELIVERY_ERRORS = Counter("airport_delivery_errors_total", "Messages a channel failed to accept", ["channel"])
+DB_CONNECTIONS_OPENED = Counter("airport_db_connections_opened_total", "New database connections", ["alias"])
+# Pool gauges are summed over the live processes in multi-process mode.
+DB_POOL_SIZE = Gauge(
+    "airport_db_pool_connections", "Connections held by the pool", ["alias"], multiprocess_mode="livesum"
+)
+DB_POOL_AVAILABLE = Gauge(
+    "airport_db_pool_available_connections", "Idle connections in the pool", ["alias"], multiprocess_mode="livesum"
+)
+DB_POOL_MAX = Gauge("airport_db_pool_max_connections", "Pool max_size", ["alias"], multiprocess_mode="livesum")
+DB_POOL_WAITING = Gauge(
+    "airport_db_pool_waiting_requests", "Requests waiting for a connection", ["alias"], multiprocess_mode="livesum"
+)
+DB_POOL_REQUESTS = Counter("airport_db_pool_requests_total", "Connections requested from the pool", ["alias"])
+DB_POOL_QUEUED = Counter("airport_db_pool_queued_requests_total", "Requests that had to wait", ["alias"])
+DB_POOL_WAIT = Counter("airport_db_pool_wait_seconds_total", "Time spent waiting for a connection", ["alias"])
+DB_POOL_ERRORS = Counter("airport_db_pool_errors_total", "Requests that timed out or failed", ["alias"])
+DB_POOL_LOST = Counter("airport_db_pool_connections_lost_total", "Broken connections found by the pool", ["alias"])
+
+
+def get_registry():
+    """
+    The registry to expose: per-process files merged in multi-process mode, the default registry otherwise.
+
+    Multi-process mode is on when PROMETHEUS_MULTIPROC_DIR is set before
+    prometheus_client is imported, as gunicorn and Celery prefork workers need.
+    """
+    if MULTIPROC_DIR_ENV not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint; with METRICS_TOKEN set it requires ``Authorization: Bearer <token>``.
+    """
+    token = settings.METRICS_TOKEN
+    if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponseForbidden()
+    observe_db_pools()
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+@connection_created.connect
+def _connection_created(sender, connection, **kwargs):
+    DB_CONNECTIONS_OPENED.labels(connection.alias).inc()
+
+
+def observe_db_pools() -> None:
+    """
+    Copy the statistics of the psycopg pools of this process to the pool metrics.
+
+    Only aliases with OPTIONS["pool"] have one (see config/database.py); it is
+    created with the first connection. Counters are popped from the pool, so
+    each call adds what happened since the previous one.
+    """
+    for connection in connections.all(initialized_only=True):
+        pool = getattr(connection, "_connection_pools", {}).get(connection.alias)
+        if pool is None:
+            continue
+        stats = pool.pop_stats()
+        alias = connection.alias
+        DB_POOL_SIZE.labels(alias).set(stats.get("pool_size", 0))
+        DB_POOL_AVAILABLE.labels(alias).set(stats.get("pool_available", 0))
+        DB_POOL_MAX.labels(alias).set(stats.get("pool_max", 0))
+        DB_POOL_WAITING.labels(alias).set(stats.get("requests_waiting", 0))
+        DB_POOL_REQUESTS.labels(alias).inc(stats.get("requests_num", 0))
+        DB_POOL_QUEUED.labels(alias).inc(stats.get("requests_queued", 0))
+        DB_POOL_WAIT.labels(alias).inc(stats.get("requests_wait_ms", 0) / 1000)
+        DB_POOL_ERRORS.labels(alias).inc(stats.get("requests_errors", 0))
+        DB_POOL_LOST.labels(alias).inc(stats.get("connections_lost", 0))
+
+
+class QueryTimer(ExecuteWrapper):
+    """
+    Count and time the SQL queries executed on every database connection.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.duration += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """
+    Latency, SQL query count and SQL time of each request, labelled with the view name.
+
+    Requests that match no URL are labelled "unmatched", so the label values
+    stay bounded. Streaming responses are observed once their content is written.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        timer = QueryTimer()
+        with timer.record():
+            response = self.get_response(request)
+        return self.process_response(request, response, timer, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        timer = QueryTimer()
+        async with timer.arecord():
+            response = await self.get_response(request)
+        return self.process_response(request, response, timer, started)
+
+    def process_response(self, request, response, timer, started):
+        if response.streaming and response.is_async:
+            response.streaming_content = self.observe_async_stream(
+                request, response, response.streaming_content, timer, started
+            )
+        elif response.streaming:
+            response.streaming_content = self.observe_stream(
+                request, response, response.streaming_content, timer, started
+            )
+        else:
+            self.observe(request, response, timer, started)
+        return response
+
+    def observe_stream(self, request, response, content, timer, started):
+        with timer.record():
+            yield from content
+        self.observe(request, response, timer, started)
+
+    async def observe_async_stream(self, request, response, content, timer, started):
+        async with timer.arecord():
+            async for chunk in content:
+                yield chunk
+        self.observe(request, response, timer, started)
+
+    @staticmethod
+    def observe(request, response, timer, started) -> None:
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        REQUEST_DURATION.labels(view, request.method, response.status_code).observe(time.perf_counter() - started)
+        REQUEST_DB_QUERIES.labels(view, request.method).observe(timer.queries)
+        REQUEST_DB_DURATION.labels(view, request.method).observe(timer.duration)
+        observe_db_pools()
+
+
+@contextmanager
+def track_delivery(channel: str):
+    """
+    Time handing a message to ``channel`` (email, telegram) and count the failures.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        DELIVERY_ERRORS.labels(channel).inc()
+        raise
+    finally:
+        DELIVERY_DURATION.labels(channel).observe(time.perf_counter() - started)
+
+
+_task_started = {}
+
+
+@signals.task_prerun.connect
+def _task_prerun(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@signals.task_postrun.connect
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+    observe_db_pools()
+
+
+@signals.task_failure.connect
+def _task_failure(sender=None, exception=None, **kwargs):
+    TASK_FAILURES.labels(sender.name, type(exception).__name__).inc()
+
+
+@signals.task_retry.connect
+def _task_retry(sender=None, **kwargs):
+    TASK_RETRIES.labels(sender.name).inc()
+
+
+@signals.worker_init.connect
+def _start_worker_exporter(**kwargs):
+    """
+    Serve the worker metrics on CELERY_METRICS_PORT from the main worker process.
+
+    In multi-process mode the pool children write to PROMETHEUS_MULTIPROC_DIR
+    and the exporter merges their files.
+    """
+    port = settings.CELERY_METRICS_PORT
+    if port:
+        start_http_server(port, registry=get_registry())
+        logger.info("Serving Celery metrics on port %d", port)
+
+
+@signals.worker_process_shutdown.connect
+def _mark_worker_process_dead(pid=None, **kwargs):
+    if MULTIPROC_DIR_ENV in os.environ:
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0003_ticketdeliveryjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticketdeliveryjob",
+            name="mode",
+            field=models.CharField(
+                choices=[("document", "Document"), ("per_ticket", "Per Ticket")],
+                default="document",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="ticketdeliveryjob",
+            name="upcoming_only",
+            field=models.BooleanField(default=False),
+        ),
+    ]
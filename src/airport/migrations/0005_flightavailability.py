@@ -0,0 +1,91 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_flight_availability(apps, schema_editor):
+    Seat = apps.get_model("airport", "Seat")
+    Ticket = apps.get_model("airport", "Ticket")
+    FlightAvailability = apps.get_model("airport", "FlightAvailability")
+
+    counters = {}
+    totals = (
+        Seat.objects.values_list("airplane__flight_airplane", "ticket_class_id")
+        .filter(airplane__flight_airplane__isnull=False)
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    for flight_id, ticket_class_id, total in totals:
+        counters[(flight_id, ticket_class_id)] = [total, 0]
+    booked = (
+        Ticket.objects.values_list("flight_seat__flight_id", "flight_seat__seat__ticket_class_id")
+        .annotate(booked=Count("id"))
+        .order_by()
+    )
+    for flight_id, ticket_class_id, count in booked:
+        counters.setdefault((flight_id, ticket_class_id), [0, 0])[1] = count
+
+    FlightAvailability.objects.bulk_create(
+        [
+            FlightAvailability(
+                flight_id=flight_id, ticket_class_id=ticket_class_id, total_seats=total, booked_seats=count
+            )
+            for (flight_id, ticket_class_id), (total, count) in counters.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0004_ticketdeliveryjob_mode"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FlightAvailability",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("total_seats", models.IntegerField(default=0)),
+                ("booked_seats", models.IntegerField(default=0)),
+                (
+                    "flight",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="availability",
+                        to="airport.flight",
+                    ),
+                ),
+                (
+                    "ticket_class",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="flight_availability",
+                        to="airport.ticketclass",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Flight Availability",
+                "verbose_name_plural": "Flight Availability",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("flight", "ticket_class"),
+                        name="unique_flight_availability_class",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_flight_availability, migrations.RunPython.noop),
+    ]
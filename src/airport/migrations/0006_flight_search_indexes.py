@@ -0,0 +1,40 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0005_flightavailability"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["departure_time", "id"], name="flight_departure_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["status", "departure_time", "id"],
+                name="flight_status_departure_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["route", "departure_time", "id"],
+                name="flight_route_departure_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["airplane", "departure_time", "id"],
+                name="flight_airplane_departure_idx",
+            ),
+        ),
+    ]
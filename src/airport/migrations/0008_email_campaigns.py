@@ -0,0 +1,108 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:01
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0007_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailCampaign",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("subject", models.CharField(max_length=255)),
+                ("body", models.TextField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("retrying", "Retrying"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="running",
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Email Campaign",
+                "verbose_name_plural": "Email Campaigns",
+            },
+        ),
+        migrations.CreateModel(
+            name="EmailCampaignChunk",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("first_user_id", models.BigIntegerField()),
+                ("last_user_id", models.BigIntegerField()),
+                ("last_sent_id", models.BigIntegerField(default=0)),
+                ("sent", models.PositiveIntegerField(default=0)),
+                ("failed", models.PositiveIntegerField(default=0)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("retrying", "Retrying"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("locked_until", models.DateTimeField(blank=True, null=True)),
+                ("error", models.TextField(blank=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "campaign",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="chunks",
+                        to="airport.emailcampaign",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Email Campaign Chunk",
+                "verbose_name_plural": "Email Campaign Chunks",
+                "ordering": ("first_user_id",),
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("campaign", "first_user_id"),
+                        name="unique_campaign_chunk_range",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,9 +1,10 @@
 import random
+import uuid
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext as _
 
 from airport.manager import FlightManager
@@ -31,11 +32,18 @@ class Flight(models.Model):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     status = models.SmallIntegerField(choices=Status.choices, default=Status.SCHEDULED)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     objects = FlightManager()
 
     class Meta:
         verbose_name = _("Flight")
         verbose_name_plural = _("Flights")
+        indexes = [
+            models.Index(fields=["departure_time", "id"], name="flight_departure_idx"),
+            models.Index(fields=["status", "departure_time", "id"], name="flight_status_departure_idx"),
+            models.Index(fields=["route", "departure_time", "id"], name="flight_route_departure_idx"),
+            models.Index(fields=["airplane", "departure_time", "id"], name="flight_airplane_departure_idx"),
+        ]
 
     def __str__(self):
         return f"ID Flight:{self.id} "
@@ -153,6 +161,11 @@ class Seat(models.Model):
     def __str__(self):
         return f"ID {self.id}"
 
+    def save(self, *args, **kwargs):
+        # Seat counters of the airplane's flights are updated by signals in the same transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class FlightSeat(models.Model):
     """
@@ -164,9 +177,14 @@ class FlightSeat(models.Model):
 
     seat = models.ForeignKey("Seat", on_delete=models.CASCADE, related_name="flight_seats")
     flight = models.ForeignKey("Flight", on_delete=models.CASCADE, related_name="flight_seats")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def clean(self):
-        if self.seat.airplane != self.flight.airplane:
+        if FlightSeat.seat.is_cached(self) and FlightSeat.flight.is_cached(self):
+            valid = self.seat.airplane_id == self.flight.airplane_id
+        else:
+            valid = Seat.objects.filter(pk=self.seat_id, airplane__flight_airplane=self.flight_id).exists()
+        if not valid:
             raise ValidationError(_("Seat seat must belong to flight seat"))
 
     def save(self, *args, **kwargs):
@@ -224,6 +242,7 @@ class Ticket(models.Model):
     flight_seat = models.ForeignKey("FlightSeat", on_delete=models.CASCADE, related_name="ticket_flight")
     order = models.ForeignKey("Order", on_delete=models.CASCADE, related_name="ticket_order")
     price = models.FloatField(validators=[MinValueValidator(0.0)])
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         verbose_name = _("Ticket")
@@ -240,6 +259,11 @@ class Ticket(models.Model):
     def __str__(self):
         return f"{self.flight_seat} {self.order} {self.price}"
 
+    def save(self, *args, **kwargs):
+        # The flight's booked seat counter is updated by signals in the same transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class TicketClass(models.Model):
     """
@@ -302,3 +326,151 @@ class Order(models.Model):
 
     def __str__(self):
         return f"Order date: {self.created_at}"
+
+
+class FlightAvailability(models.Model):
+    """
+    Flight seat availability model.
+
+    Denormalized seat counters of a flight per ticket class, maintained on
+    Ticket and Seat changes, so flight listings do not have to count seats and
+    tickets with joins. Rebuild or verify them with the
+    ``rebuild_seat_availability`` management command.
+    """
+
+    flight = models.ForeignKey("Flight", on_delete=models.CASCADE, related_name="availability")
+    ticket_class = models.ForeignKey("TicketClass", on_delete=models.CASCADE, related_name="flight_availability")
+    total_seats = models.IntegerField(default=0)
+    booked_seats = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = _("Flight Availability")
+        verbose_name_plural = _("Flight Availability")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["flight", "ticket_class"],
+                name="unique_flight_availability_class",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.flight} {self.ticket_class}: {self.available_seats}/{self.total_seats}"
+
+    @property
+    def available_seats(self):
+        return self.total_seats - self.booked_seats
+
+
+class TicketDeliveryJob(models.Model):
+    """
+    Ticket delivery job model.
+
+    Tracks the progress of the render -> store -> email/Telegram pipeline
+    started by a send-ticket request. Each stage has its own status column,
+    so parallel delivery stages never overwrite each other's progress.
+    In the per-ticket mode every ticket is rendered separately and delivered
+    as a ZIP bundle.
+    """
+
+    class StageStatus(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        RETRYING = "retrying"
+        DONE = "done"
+        SKIPPED = "skipped"
+        FAILED = "failed"
+
+    class Mode(models.TextChoices):
+        DOCUMENT = "document"
+        PER_TICKET = "per_ticket"
+
+    STAGES = ("render", "store", "email", "telegram")
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="ticket_delivery_jobs")
+    mode = models.CharField(max_length=10, choices=Mode.choices, default=Mode.DOCUMENT)
+    upcoming_only = models.BooleanField(default=False)
+    pdf_path = models.CharField(max_length=255, blank=True)
+    render_status = models.CharField(max_length=10, choices=StageStatus.choices, default=StageStatus.PENDING)
+    store_status = models.CharField(max_length=10, choices=StageStatus.choices, default=StageStatus.PENDING)
+    email_status = models.CharField(max_length=10, choices=StageStatus.choices, default=StageStatus.PENDING)
+    telegram_status = models.CharField(max_length=10, choices=StageStatus.choices, default=StageStatus.PENDING)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Ticket Delivery Job")
+        verbose_name_plural = _("Ticket Delivery Jobs")
+
+    def __str__(self):
+        return f"Ticket delivery {self.id}"
+
+    @property
+    def stages(self) -> dict:
+        return {stage: getattr(self, f"{stage}_status") for stage in self.STAGES}
+
+
+class EmailCampaign(models.Model):
+    """
+    Email campaign model.
+
+    One message sent to every active user with an email address. The users
+    are split into id ranges, one EmailCampaignChunk each, which Celery
+    workers send in parallel. The name is unique, so starting a campaign
+    again resumes its unfinished chunks instead of sending it twice.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        RETRYING = "retrying"
+        DONE = "done"
+        FAILED = "failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=100, unique=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.RUNNING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Email Campaign")
+        verbose_name_plural = _("Email Campaigns")
+
+    def __str__(self):
+        return self.name
+
+
+class EmailCampaignChunk(models.Model):
+    """
+    Users of one campaign whose ids are between first_user_id and last_user_id.
+
+    last_sent_id is the checkpoint: the users up to it have been handled, so
+    a retried or redelivered chunk task continues after it. A worker holds the
+    chunk until locked_until, which it extends while sending.
+    """
+
+    campaign = models.ForeignKey(EmailCampaign, on_delete=models.CASCADE, related_name="chunks")
+    first_user_id = models.BigIntegerField()
+    last_user_id = models.BigIntegerField()
+    last_sent_id = models.BigIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=EmailCampaign.Status.choices, default=EmailCampaign.Status.PENDING)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("first_user_id",)
+        constraints = [
+            models.UniqueConstraint(fields=["campaign", "first_user_id"], name="unique_campaign_chunk_range")
+        ]
+        verbose_name = _("Email Campaign Chunk")
+        verbose_name_plural = _("Email Campaign Chunks")
+
+    def __str__(self):
+        return f"{self.campaign} users {self.first_user_id}-{self.last_user_id}"
@@ -0,0 +1,133 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from django.utils.translation import gettext as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a unique ordering.
+
+    The cursor holds the ordering values of the last row of the page and the next
+    page is fetched with a row comparison on them, so every page is a range scan
+    on the matching composite index, however deep the client pages.
+    The last ordering field must be unique (usually the primary key).
+    """
+
+    ordering = ("id",)
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = _("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        rows = list(self.page_queryset(queryset, request, page_size))
+        return self.page(rows, page_size)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        rows = [row async for row in self.page_queryset(queryset, request, page_size)]
+        return self.page(rows, page_size)
+
+    def page_queryset(self, queryset, request, page_size):
+        """The rows of the page after the cursor, and one more to tell whether a next page exists."""
+        self.request = request
+        self.model = queryset.model
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+        return queryset[: page_size + 1]
+
+    def page(self, rows, page_size) -> list:
+        self.next_position = self.position(rows[page_size - 1]) if len(rows) > page_size else None
+        return rows[:page_size]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def after(self, position) -> Q:
+        """
+        Rows strictly after ``position`` in the ordering.
+
+        Expands the row comparison (a, b) > (x, y) into (a > x) OR (a = x AND b > y),
+        with a redundant a >= x bound that lets the planner use an index range scan.
+        """
+        conditions = []
+        for index, field in enumerate(self.ordering):
+            equal = {name: value for name, value in zip(self.ordering[:index], position)}
+            conditions.append(Q(**equal, **{f"{field}__gt": position[index]}))
+        return Q(**{f"{self.ordering[0]}__gte": position[0]}) & reduce(or_, conditions)
+
+    def position(self, row) -> list:
+        return [row[field] if isinstance(row, dict) else getattr(row, field) for field in self.ordering]
+
+    def encode_cursor(self, position) -> str:
+        values = [value.isoformat() if hasattr(value, "isoformat") else value for value in position]
+        return urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            values = json.loads(urlsafe_b64decode(encoded.encode()))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return [self.model._meta.get_field(field).to_python(value) for field, value in zip(self.ordering, values)]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class FlightKeysetPagination(KeysetPagination):
+    ordering = ("departure_time", "id")
@@ -0,0 +1,196 @@
+import logging
+import re
+import threading
+from collections import Counter
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+
+from asgiref.sync import (iscoroutinefunction, markcoroutinefunction,
+                          sync_to_async)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+VALUES_LIST = re.compile(r"VALUES \((?:%s, )*%s\)(?:, \((?:%s, )*%s\))*")
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+DUPLICATE_QUERIES_HEADER = "X-Duplicate-Queries"
+
+
+def fingerprint(sql: str) -> str:
+    """
+    The query with the lengths of IN and VALUES lists erased.
+
+    Django passes values as parameters, so queries that differ only in their
+    values share the SQL text already.
+    """
+    return VALUES_LIST.sub("VALUES (...)", IN_LIST.sub("IN (...)", sql))
+
+
+class ExecuteWrapper:
+    """
+    A callable installed with execute_wrapper() on every database connection.
+    """
+
+    def __call__(self, execute, sql, params, many, context):
+        raise NotImplementedError
+
+    def _install(self, stack: ExitStack) -> None:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+
+    @contextmanager
+    def record(self):
+        with ExitStack() as stack:
+            self._install(stack)
+            yield self
+
+    @asynccontextmanager
+    async def arecord(self):
+        """
+        record() for async code: the wrappers go on the connections of the
+        thread that sync_to_async runs the ORM in, not on those of the event loop.
+        """
+        stack = ExitStack()
+        await sync_to_async(self._install)(stack)
+        try:
+            yield self
+        finally:
+            await sync_to_async(stack.close)()
+
+
+class QueryRecorder(ExecuteWrapper):
+    """
+    Fingerprints of the SQL queries executed on every database connection.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(fingerprint(sql))
+        return execute(sql, params, many, context)
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    def duplicates(self) -> dict:
+        """Fingerprints executed more than once, with their counts."""
+        return {query: count for query, count in Counter(self.queries).items() if count > 1}
+
+    @property
+    def duplicate_count(self) -> int:
+        return sum(count - 1 for count in self.duplicates().values())
+
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.duplicates = Counter()
+
+    def add(self, recorder: QueryRecorder) -> None:
+        self.requests += 1
+        self.queries += len(recorder)
+        self.max_queries = max(self.max_queries, len(recorder))
+        self.duplicates.update(recorder.duplicates())
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "queries": self.queries,
+            "max_queries": self.max_queries,
+            "duplicates": dict(self.duplicates.most_common()),
+        }
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def endpoint_stats() -> dict:
+    """Query statistics of this process per endpoint ("METHOD view_name")."""
+    with _stats_lock:
+        return {endpoint: stats.as_dict() for endpoint, stats in _stats.items()}
+
+
+def reset_endpoint_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+class QueryCountMiddleware:
+    """
+    Count the SQL queries of each request and spot repeated ones.
+
+    Enabled with QUERY_COUNT_ENABLED. Responses get X-Query-Count and
+    X-Duplicate-Queries headers, totals are kept per endpoint (see
+    endpoint_stats()), and a warning is logged when a request repeats a query
+    QUERY_COUNT_DUPLICATE_THRESHOLD times or more, the usual sign of an N+1.
+    Queries of streaming responses are counted while the content is written
+    and only logged, as the headers are gone by then.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERY_COUNT_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = self.get_response(request)
+        return self.process_response(request, response, recorder)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        async with recorder.arecord():
+            response = await self.get_response(request)
+        return self.process_response(request, response, recorder)
+
+    def process_response(self, request, response, recorder):
+        if response.streaming and response.is_async:
+            response.streaming_content = self.record_async_stream(request, response.streaming_content, recorder)
+        elif response.streaming:
+            response.streaming_content = self.record_stream(request, response.streaming_content, recorder)
+        else:
+            response[QUERY_COUNT_HEADER] = str(len(recorder))
+            response[DUPLICATE_QUERIES_HEADER] = str(recorder.duplicate_count)
+            self.report(request, recorder)
+        return response
+
+    def record_stream(self, request, content, recorder):
+        with recorder.record():
+            yield from content
+        self.report(request, recorder)
+
+    async def record_async_stream(self, request, content, recorder):
+        async with recorder.arecord():
+            async for chunk in content:
+                yield chunk
+        self.report(request, recorder)
+
+    @staticmethod
+    def report(request, recorder: QueryRecorder) -> None:
+        match = request.resolver_match
+        endpoint = f"{request.method} {match.view_name if match else request.path}"
+        with _stats_lock:
+            _stats.setdefault(endpoint, EndpointStats()).add(recorder)
+
+        repeated = {
+            query: count
+            for query, count in recorder.duplicates().items()
+            if count >= settings.QUERY_COUNT_DUPLICATE_THRESHOLD
+        }
+        for query, count in repeated.items():
+            logger.warning("%s ran the same query %d times: %s", endpoint, count, query)
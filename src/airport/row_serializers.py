@@ -0,0 +1,141 @@
+from collections import defaultdict
+from operator import itemgetter
+
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from airport.models import Flight
+from airport.serializers import STATUS_MAPPING, format_duration
+
+
+class FlightRowSerializer:
+    """
+    Read-only fast path for FlightListRetrieveSerializer.
+
+    Builds the same JSON from ``.values()`` rows: the columns are fetched in one
+    query, crew members of all flights in a second one, and every field is read
+    with a precompiled item getter instead of going through DRF fields.
+    """
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self.columns = tuple(
+            prefix + column
+            for column in (
+                "id",
+                "route__source__name",
+                "route__destination__name",
+                "route__distance",
+                "route__code_route",
+                "airplane__name",
+                "departure_time",
+                "arrival_time",
+                "status",
+            )
+        )
+        self._row = itemgetter(*self.columns)
+        self._datetime = serializers.DateTimeField().to_representation
+
+    @staticmethod
+    def crew_members(flight_ids):
+        return (
+            Flight.crew.through.objects.filter(flight_id__in=set(flight_ids))
+            .order_by("id")
+            .values_list("flight_id", "crew__first_name", "crew__last_name")
+        )
+
+    def crew(self, flight_ids) -> dict:
+        crew = defaultdict(list)
+        for flight_id, first_name, last_name in self.crew_members(flight_ids):
+            crew[flight_id].append({"first_name": first_name, "last_name": last_name})
+        return crew
+
+    async def acrew(self, flight_ids) -> dict:
+        crew = defaultdict(list)
+        async for flight_id, first_name, last_name in self.crew_members(flight_ids):
+            crew[flight_id].append({"first_name": first_name, "last_name": last_name})
+        return crew
+
+    def flight(self, row, crew) -> dict:
+        flight_id, source, destination, distance, code_route, airplane, departure, arrival, status = self._row(row)
+        return {
+            "route": {"source": source, "destination": destination, "distance": distance, "code_route": code_route},
+            "airplane": airplane,
+            "departure_time": self._datetime(departure),
+            "arrival_time": self._datetime(arrival),
+            "status": STATUS_MAPPING.get(status, "UNKNOWN"),
+            "crew": crew.get(flight_id, []),
+            "formatted_duration": format_duration(departure, arrival),
+        }
+
+    def serialize(self, rows) -> list:
+        crew = self.crew(row[self.columns[0]] for row in rows)
+        return [self.flight(row, crew) for row in rows]
+
+    async def aserialize(self, rows) -> list:
+        crew = await self.acrew(row[self.columns[0]] for row in rows)
+        return [self.flight(row, crew) for row in rows]
+
+
+class FlightSeatRowSerializer:
+    """
+    Read-only fast path for FlightSeatListRetrieveSerializer.
+    """
+
+    def __init__(self):
+        self.flight_rows = FlightRowSerializer(prefix="flight__")
+        self.seat_columns = ("seat__airplane__name", "seat__seat", "seat__row", "seat__ticket_class__name")
+        self.columns = self.seat_columns + self.flight_rows.columns
+        self._seat = itemgetter(*self.seat_columns)
+
+    def serialize(self, rows) -> list:
+        crew = self.flight_rows.crew(row["flight__id"] for row in rows)
+        data = []
+        for row in rows:
+            airplane, seat, seat_row, ticket_class = self._seat(row)
+            data.append(
+                {
+                    "seat": {"airplane": airplane, "seat": seat, "row": seat_row, "ticket_class": ticket_class},
+                    "flight": self.flight_rows.flight(row, crew),
+                }
+            )
+        return data
+
+
+class RowListMixin:
+    """
+    List action of a viewset served by a row serializer.
+
+    Filtering and pagination work as usual, but rows are fetched with ``.values()``
+    and rendered by ``row_serializer`` instead of instantiating models.
+    """
+
+    row_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.select_related(None).prefetch_related(None).values(*self.row_serializer.columns)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.row_serializer.serialize(page))
+        return Response(self.row_serializer.serialize(list(rows)))
+
+
+class AsyncRowListMixin:
+    """
+    RowListMixin for an AsyncGenericViewSet: the rows are read with the async ORM.
+
+    ``row_serializer`` must have ``aserialize``.
+    """
+
+    row_serializer = None
+
+    async def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.select_related(None).prefetch_related(None).values(*self.row_serializer.columns)
+
+        page = await self.apaginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(await self.row_serializer.aserialize(page))
+        return Response(await self.row_serializer.aserialize([row async for row in rows]))
@@ -1,8 +1,19 @@
+from django.db import transaction
 from rest_framework import serializers
 
+from airport.bulk import BulkCreateListSerializer, BulkPrimaryKeyRelatedField
 from airport.models import (Airplane, AirplaneType, Airport, Crew, Flight,
-                            FlightSeat, Order, Route, Seat, Tariff, Ticket,
-                            TicketClass)
+                            FlightAvailability, FlightSeat, Order, Route, Seat,
+                            Tariff, Ticket, TicketClass, TicketDeliveryJob)
+from airport.services.seat_inventory import generate_flight_seats
+
+STATUS_MAPPING = {1: "SCHEDULED", 2: "DELAYED", 3: "CANCELLED", 4: "COMPLETED"}
+
+
+def format_duration(departure_time, arrival_time) -> str:
+    hours, remainder = divmod((arrival_time - departure_time).total_seconds(), 3600)
+    minutes, _ = divmod(remainder, 60)
+    return f"{int(hours)}ч {int(minutes)}м"
 
 
 class AirplaneTypeSerializer(serializers.ModelSerializer):
@@ -33,8 +44,11 @@ class SeatListRetrieveSerializer(serializers.ModelSerializer):
 
 
 class SeatCreateSerializer(SeatListRetrieveSerializer):
-    airplane = serializers.PrimaryKeyRelatedField(queryset=Airplane.objects.all())
-    ticket_class = serializers.PrimaryKeyRelatedField(queryset=TicketClass.objects.all())
+    airplane = BulkPrimaryKeyRelatedField(queryset=Airplane.objects.all())
+    ticket_class = BulkPrimaryKeyRelatedField(queryset=TicketClass.objects.all())
+
+    class Meta(SeatListRetrieveSerializer.Meta):
+        list_serializer_class = BulkCreateListSerializer
 
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -87,6 +101,7 @@ class AirportSerializer(serializers.ModelSerializer):
     class Meta:
         model = Airport
         fields = ("name", "closest_big_city", "airport_code", "geographical_coordinates")
+        list_serializer_class = BulkCreateListSerializer
 
 
 class RouteSerializer(serializers.ModelSerializer):
@@ -107,18 +122,22 @@ class RouteListRetrieveSerializer(RouteSerializer):
 
 
 class RouteCreateSerializer(RouteSerializer):
-    source = serializers.PrimaryKeyRelatedField(
+    source = BulkPrimaryKeyRelatedField(
         queryset=Airport.objects.all(),
     )
-    destination = serializers.PrimaryKeyRelatedField(
+    destination = BulkPrimaryKeyRelatedField(
         queryset=Airport.objects.all(),
     )
 
+    class Meta(RouteSerializer.Meta):
+        list_serializer_class = BulkCreateListSerializer
+
 
 class CrewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Crew
         fields = ("first_name", "last_name")
+        list_serializer_class = BulkCreateListSerializer
 
 
 class FlightSerializer(serializers.ModelSerializer):
@@ -148,14 +167,10 @@ class FlightListRetrieveSerializer(FlightSerializer):
         return obj.airplane.name
 
     def get_status(self, obj):
-        status_mapping = {1: "SCHEDULED", 2: "DELAYED", 3: "CANCELLED", 4: "COMPLETED"}
-        return status_mapping.get(obj.status, "UNKNOWN")
+        return STATUS_MAPPING.get(obj.status, "UNKNOWN")
 
     def get_formatted_duration(self, obj):
-        duration = obj.arrival_time - obj.departure_time
-        hours, remainder = divmod(duration.total_seconds(), 3600)
-        minutes, _ = divmod(remainder, 60)
-        return f"{int(hours)}ч {int(minutes)}м"
+        return format_duration(obj.departure_time, obj.arrival_time)
 
 
 class FlightCreateSerializer(FlightSerializer):
@@ -178,8 +193,10 @@ class FlightCreateSerializer(FlightSerializer):
 
     def create(self, validated_data):
         crew_data = validated_data.pop("crew", [])
-        flight = Flight.objects.create(**validated_data)
-        flight.crew.set(crew_data)
+        with transaction.atomic():
+            flight = Flight.objects.create(**validated_data)
+            flight.crew.set(crew_data)
+            generate_flight_seats([flight.id])
         return flight
 
 
@@ -205,6 +222,28 @@ class FlightSeatCreateSerializer(serializers.ModelSerializer):
         fields = ("seat", "flight")
 
 
+class SendTicketParamsSerializer(serializers.Serializer):
+    mode = serializers.ChoiceField(
+        choices=TicketDeliveryJob.Mode.choices,
+        default=TicketDeliveryJob.Mode.DOCUMENT,
+        help_text="document: one PDF with all tickets, per_ticket: ZIP with a PDF per ticket",
+    )
+    upcoming = serializers.BooleanField(default=False, help_text="Send only tickets for upcoming flights")
+
+
+class TicketDeliveryJobSerializer(serializers.ModelSerializer):
+    job_id = serializers.UUIDField(source="id", read_only=True)
+    stages = serializers.DictField(child=serializers.CharField(), read_only=True)
+    pdf_ready = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TicketDeliveryJob
+        fields = ("job_id", "mode", "upcoming_only", "stages", "pdf_ready", "error", "created_at", "updated_at")
+
+    def get_pdf_ready(self, obj):
+        return bool(obj.pdf_path)
+
+
 class SeatFilterSerializer(serializers.Serializer):
     airplane = serializers.CharField(required=False, help_text="Filter by airplane name (partial match)")
     ticket_class = serializers.CharField(required=False, help_text="Filter by ticketclass (partial match)")
@@ -213,3 +252,155 @@ class SeatFilterSerializer(serializers.Serializer):
 class TariffFilterSerializer(serializers.Serializer):
     code = serializers.CharField(required=False, help_text="Filter by code tariff (partial match)")
     name = serializers.CharField(required=False, help_text="Filter by name tariff (partial match)")
+
+
+class FlightFilterSerializer(serializers.Serializer):
+    source = serializers.CharField(required=False, help_text="Filter by source airport code")
+    destination = serializers.CharField(required=False, help_text="Filter by destination airport code")
+    departure_after = serializers.DateTimeField(required=False, help_text="Departure time from (inclusive)")
+    departure_before = serializers.DateTimeField(required=False, help_text="Departure time up to (exclusive)")
+    status = serializers.ChoiceField(choices=Flight.Status.choices, required=False, help_text="Filter by status")
+    airplane_type = serializers.CharField(required=False, help_text="Filter by airplane type (partial match)")
+    min_available_seats = serializers.IntegerField(
+        required=False, min_value=1, help_text="Only flights with at least this many free seats"
+    )
+
+    def validate(self, attrs):
+        departure_after = attrs.get("departure_after")
+        departure_before = attrs.get("departure_before")
+        if departure_after and departure_before and departure_after >= departure_before:
+            raise serializers.ValidationError("departure_after must be earlier than departure_before")
+        return attrs
+
+
+class ConnectionSearchSerializer(serializers.Serializer):
+    source = serializers.CharField(help_text="Source airport code")
+    destination = serializers.CharField(help_text="Destination airport code")
+    departure_after = serializers.DateTimeField(help_text="First flight departs from (inclusive)")
+    departure_before = serializers.DateTimeField(help_text="First flight departs up to (exclusive)")
+    max_legs = serializers.IntegerField(default=3, min_value=1, max_value=3, help_text="Maximum number of flights")
+    min_layover = serializers.IntegerField(default=45, min_value=0, help_text="Minimum layover in minutes")
+    max_layover = serializers.IntegerField(default=360, min_value=0, help_text="Maximum layover in minutes")
+    sort = serializers.ChoiceField(
+        choices=["duration", "distance"], default="duration", help_text="Rank by total duration or distance"
+    )
+    limit = serializers.IntegerField(default=20, min_value=1, max_value=100, help_text="Maximum number of itineraries")
+
+    def validate(self, attrs):
+        if attrs["departure_after"] >= attrs["departure_before"]:
+            raise serializers.ValidationError("departure_after must be earlier than departure_before")
+        if attrs["min_layover"] > attrs["max_layover"]:
+            raise serializers.ValidationError("min_layover must not exceed max_layover")
+        return attrs
+
+
+class ConnectionLegSerializer(serializers.Serializer):
+    flight_id = serializers.IntegerField()
+    code_route = serializers.CharField(source="route.code_route")
+    source = serializers.CharField(source="route.source_code")
+    destination = serializers.CharField(source="route.destination_code")
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    distance = serializers.IntegerField(source="route.distance")
+
+
+class ConnectionItinerarySerializer(serializers.Serializer):
+    legs = ConnectionLegSerializer(many=True)
+    total_duration_minutes = serializers.SerializerMethodField()
+    total_distance = serializers.IntegerField(source="distance")
+    layovers_minutes = serializers.SerializerMethodField()
+
+    def get_total_duration_minutes(self, itinerary) -> int:
+        return int(itinerary.duration.total_seconds() // 60)
+
+    def get_layovers_minutes(self, itinerary) -> list[int]:
+        return [int(layover.total_seconds() // 60) for layover in itinerary.layovers]
+
+
+class BookingItemSerializer(serializers.Serializer):
+    flight_seat = serializers.IntegerField(help_text="Flight seat id")
+    price = serializers.FloatField(min_value=0.0)
+
+
+class BookingSerializer(serializers.Serializer):
+    tickets = BookingItemSerializer(many=True, allow_empty=False)
+
+    def validate_tickets(self, tickets):
+        flight_seat_ids = [item["flight_seat"] for item in tickets]
+        if len(set(flight_seat_ids)) != len(flight_seat_ids):
+            raise serializers.ValidationError("Each flight seat can be booked only once")
+        known = set(
+            FlightSeat.objects.filter(flight=self.context["flight"], id__in=flight_seat_ids).values_list(
+                "id", flat=True
+            )
+        )
+        unknown = sorted(set(flight_seat_ids) - known)
+        if unknown:
+            raise serializers.ValidationError(f"Flight seats {unknown} do not belong to this flight")
+        return tickets
+
+
+class BookedTicketSerializer(serializers.ModelSerializer):
+    flight_seat = serializers.IntegerField(source="flight_seat_id", read_only=True)
+
+    class Meta:
+        model = Ticket
+        fields = ("id", "flight_seat", "price")
+
+
+class BookingResultSerializer(serializers.Serializer):
+    order_id = serializers.IntegerField(source="order.id")
+    created_at = serializers.DateTimeField(source="order.created_at")
+    tickets = BookedTicketSerializer(many=True)
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    hold_id = serializers.CharField(source="id")
+    flight = serializers.IntegerField(source="flight_id")
+    flight_seats = serializers.SerializerMethodField()
+    expires_at = serializers.DateTimeField(source="expires_at_datetime")
+
+    def get_flight_seats(self, hold) -> list[int]:
+        return sorted(hold.seats)
+
+
+class FlightAvailabilitySerializer(serializers.ModelSerializer):
+    ticket_class = serializers.SlugRelatedField(read_only=True, slug_field="name")
+    held_seats = serializers.IntegerField()
+    available_seats = serializers.SerializerMethodField()
+
+    class Meta:
+        model = FlightAvailability
+        fields = ("ticket_class", "total_seats", "booked_seats", "held_seats", "available_seats")
+
+    def get_available_seats(self, availability) -> int:
+        return max(availability.available_seats - availability.held_seats, 0)
+
+
+class FlightSeatRegenerateSerializer(serializers.Serializer):
+    flights = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, help_text="Flight ids")
+    airplane = serializers.PrimaryKeyRelatedField(
+        queryset=Airplane.objects.all(), required=False, help_text="Move the flights to this airplane first"
+    )
+
+    def validate_flights(self, flights):
+        unknown = sorted(set(flights) - set(Flight.objects.filter(id__in=flights).values_list("id", flat=True)))
+        if unknown:
+            raise serializers.ValidationError(f"Unknown flights: {unknown}")
+        return sorted(set(flights))
+
+
+class SeatMapSeatSerializer(serializers.Serializer):
+    flight_seat = serializers.IntegerField()
+    row = serializers.CharField()
+    seat = serializers.IntegerField()
+    seat_type = serializers.CharField()
+    ticket_class = serializers.CharField()
+
+
+class SeatMapSerializer(serializers.Serializer):
+    flight = serializers.IntegerField()
+    seats = SeatMapSeatSerializer(many=True)
+    occupancy = serializers.CharField(help_text="Base64 bitmap of booked seats, bit i (MSB first) is seats[i]")
+    held = serializers.CharField(help_text="Base64 bitmap of seats with an active hold")
+    free_seats = serializers.IntegerField()
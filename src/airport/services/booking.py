@@ -0,0 +1,95 @@
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+
+from airport.caching import bump_model_version
+from airport.models import FlightSeat, Order, Ticket
+from airport.services import seat_availability, seat_map
+from airport.services.seat_holds import Hold, SeatConflictError, get_hold_store
+
+
+class Booking(NamedTuple):
+    order: Order
+    tickets: list
+
+
+def _booked(flight_seat_ids) -> set:
+    return set(Ticket.objects.filter(flight_seat_id__in=flight_seat_ids).values_list("flight_seat_id", flat=True))
+
+
+def _held_by_others(flight_seat_ids, hold_id) -> set:
+    return {seat_id for seat_id, owner in get_hold_store().owners(flight_seat_ids).items() if owner != hold_id}
+
+
+def book_seats(user, flight_id, prices: dict, hold_id=None) -> Booking:
+    """
+    Book flight seats for a user in one transaction.
+
+    ``prices`` maps flight seat ids of the flight to ticket prices. The seat rows are
+    claimed with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent buyers never wait
+    on each other: a seat locked by another transaction, or one that already has a
+    ticket, or one held by anyone but ``hold_id``, is reported as taken and nothing
+    is booked. The Order and its Tickets are inserted in bulk and the flight's seat
+    counters are updated once per class.
+    """
+    requested = set(prices)
+    with transaction.atomic():
+        claimed = set(
+            FlightSeat.objects.select_for_update(skip_locked=True)
+            .filter(flight_id=flight_id, id__in=requested)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        taken = (requested - claimed) | _booked(claimed) | _held_by_others(claimed, hold_id)
+        if taken:
+            raise SeatConflictError(taken)
+
+        order = Order.objects.create(user=user)
+        try:
+            with transaction.atomic():
+                tickets = Ticket.objects.bulk_create(
+                    Ticket(order=order, flight_seat_id=flight_seat_id, price=prices[flight_seat_id])
+                    for flight_seat_id in sorted(requested)
+                )
+        except IntegrityError:
+            # A ticket was created through a path that does not lock the seat.
+            raise SeatConflictError(_booked(requested) or requested)
+
+        # bulk_create sends no signals, so the counters are adjusted here.
+        per_class = (
+            FlightSeat.objects.filter(id__in=requested)
+            .values_list("seat__ticket_class_id")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        seat_availability.adjust_booked_classes(flight_id, dict(per_class))
+        transaction.on_commit(lambda: seat_map.mark_seats(flight_id, list(requested), True))
+        transaction.on_commit(lambda: bump_model_version(Ticket))
+    return Booking(order=order, tickets=tickets)
+
+
+def hold_seats(user, flight_id, prices: dict, ttl: int = None) -> Hold:
+    """
+    Hold flight seats for checkout without writing tickets.
+
+    Seats that already have tickets or are held by another buyer raise SeatConflictError.
+    """
+    booked = _booked(prices)
+    if booked:
+        raise SeatConflictError(booked)
+    seats = dict(
+        FlightSeat.objects.filter(flight_id=flight_id, id__in=prices).values_list("id", "seat__ticket_class_id")
+    )
+    return get_hold_store().hold(user.id, flight_id, seats, prices, ttl or settings.SEAT_HOLD_TTL)
+
+
+def confirm_hold(user, hold: Hold) -> Booking:
+    """
+    Turn an active hold into an Order with its Tickets and release the hold on commit.
+    """
+    with transaction.atomic():
+        booking = book_seats(user, hold.flight_id, hold.prices, hold_id=hold.id)
+        transaction.on_commit(lambda: get_hold_store().release(hold))
+    return booking
@@ -0,0 +1,375 @@
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from airport.models import Flight, Route
+from config.db_router import primary_reads
+
+VERSION_KEY = "connections:index-version"
+CHANGE_KEY = "connections:change:{}"
+# Further behind than this, a process rebuilds instead of replaying the changes.
+MAX_REPLAYED_CHANGES = 1000
+SORT_KEYS = {
+    "duration": lambda itinerary: (itinerary.duration, itinerary.distance),
+    "distance": lambda itinerary: (itinerary.distance, itinerary.duration),
+}
+
+
+class RouteInfo(NamedTuple):
+    id: int
+    code_route: str
+    source_id: int
+    destination_id: int
+    source_code: str
+    destination_code: str
+    distance: int
+
+
+class Leg(NamedTuple):
+    flight_id: int
+    route: RouteInfo
+    departure_time: datetime
+    arrival_time: datetime
+
+
+class Itinerary(NamedTuple):
+    legs: tuple
+    duration: timedelta
+    distance: int
+
+    @property
+    def layovers(self) -> list:
+        return [nxt.departure_time - prev.arrival_time for prev, nxt in zip(self.legs, self.legs[1:])]
+
+
+def _current_version() -> int:
+    cache.add(VERSION_KEY, 0, timeout=None)
+    return cache.get(VERSION_KEY, 0)
+
+
+def _bump_version() -> int:
+    cache.add(VERSION_KEY, 0, timeout=None)
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+        return 1
+
+
+def _publish_change(kind: str, object_id) -> int:
+    """
+    Bump the index version and record which flight or route it changed, for other processes to replay.
+    """
+    version = _bump_version()
+    cache.set(CHANGE_KEY.format(version), (kind, object_id), settings.CONNECTION_INDEX_CHANGE_TTL)
+    return version
+
+
+def _changes(first_version: int, last_version: int) -> list | None:
+    """
+    The changes of versions first_version..last_version, None if any of them is unknown.
+    """
+    if not 0 < last_version - first_version + 1 <= MAX_REPLAYED_CHANGES:
+        return None
+    keys = [CHANGE_KEY.format(version) for version in range(first_version, last_version + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) != len(keys):
+        return None
+    return [changes[key] for key in keys]
+
+
+class ConnectionIndex:
+    """
+    In-memory index of the Route graph and of flight departures.
+
+    Holds the route adjacency (airport -> outgoing routes) and, per airport, the
+    indexed flights sorted by departure time, so connecting flights after a
+    layover are found with a binary search. Flights and routes are updated
+    in place from model signals. Each change bumps a version counter in the
+    shared cache and records the changed flight or route under the new version,
+    so other processes re-read just those rows on their next search; a process
+    that missed a change it cannot replay (bulk changes, expired records)
+    rebuilds. Reads go to the primary so the index never holds rows older than
+    its version.
+    Only flights that are not cancelled and depart after
+    ``now - CONNECTION_INDEX_LOOKBACK`` are indexed.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._version = None
+        self._routes = {}
+        self._adjacency = defaultdict(set)
+        self._reverse_adjacency = defaultdict(set)
+        self._departures = defaultdict(list)
+        self._legs = {}
+        self._route_flights = defaultdict(set)
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def build(self) -> None:
+        with self._lock, primary_reads():
+            self._version = _current_version()
+            self._routes.clear()
+            self._adjacency.clear()
+            self._reverse_adjacency.clear()
+            self._departures.clear()
+            self._legs.clear()
+            self._route_flights.clear()
+
+            for route in Route.objects.select_related("source", "destination"):
+                self._add_route(route)
+
+            flights = (
+                Flight.objects.filter(departure_time__gte=timezone.now() - settings.CONNECTION_INDEX_LOOKBACK)
+                .exclude(status=Flight.Status.CANCELLED)
+                .values_list("id", "route_id", "departure_time", "arrival_time")
+                .order_by()
+            )
+            for flight_id, route_id, departure_time, arrival_time in flights.iterator(chunk_size=5000):
+                self._add_leg(flight_id, route_id, departure_time, arrival_time, sort=False)
+            for departures in self._departures.values():
+                departures.sort()
+            self._built = True
+
+    def ensure_fresh(self) -> None:
+        with self._lock:
+            if not self._built:
+                self.build()
+                return
+            version = _current_version()
+            if version == self._version:
+                return
+            changes = _changes(self._version + 1, version)
+            if changes is None:
+                self.build()
+                return
+            with primary_reads():
+                for kind, object_id in changes:
+                    if kind == "flight":
+                        self._refresh_flight(object_id)
+                    else:
+                        self._refresh_route(object_id)
+            self._version = version
+
+    def refresh_flight(self, flight_id) -> None:
+        """
+        Re-read one flight from the database and update its index entry.
+        """
+        with self._lock, primary_reads():
+            if not self._built:
+                return
+            self._refresh_flight(flight_id)
+            self._mark_changed("flight", flight_id)
+
+    def refresh_route(self, route_id) -> None:
+        """
+        Re-read one route and the legs of its flights.
+        """
+        with self._lock, primary_reads():
+            if not self._built:
+                return
+            self._refresh_route(route_id)
+            self._mark_changed("route", route_id)
+
+    def _refresh_flight(self, flight_id) -> None:
+        self._remove_leg(flight_id)
+        flight = (
+            Flight.objects.filter(pk=flight_id, departure_time__gte=timezone.now() - settings.CONNECTION_INDEX_LOOKBACK)
+            .exclude(status=Flight.Status.CANCELLED)
+            .values_list("id", "route_id", "departure_time", "arrival_time")
+            .first()
+        )
+        if flight is not None:
+            self._add_leg(*flight)
+
+    def _refresh_route(self, route_id) -> None:
+        flight_ids = list(self._route_flights.get(route_id, ()))
+        for flight_id in flight_ids:
+            self._remove_leg(flight_id)
+        self._remove_route(route_id)
+
+        route = Route.objects.select_related("source", "destination").filter(pk=route_id).first()
+        if route is not None:
+            self._add_route(route)
+            flights = (
+                Flight.objects.filter(pk__in=flight_ids)
+                .exclude(status=Flight.Status.CANCELLED)
+                .values_list("id", "route_id", "departure_time", "arrival_time")
+            )
+            for flight in flights:
+                self._add_leg(*flight)
+
+    def search(
+        self,
+        source_id,
+        destination_id,
+        departure_after: datetime,
+        departure_before: datetime,
+        max_legs: int = 3,
+        min_layover: timedelta = timedelta(minutes=45),
+        max_layover: timedelta = timedelta(hours=6),
+        sort: str = "duration",
+        limit: int = 20,
+    ) -> list:
+        """
+        Find itineraries of 1..max_legs flights from source to destination.
+
+        The first flight departs within [departure_after, departure_before) and every
+        layover lasts between min_layover and max_layover. Itineraries are ranked by
+        total duration or total distance.
+        """
+        self.ensure_fresh()
+        with self._lock:
+            hops_to_destination = self._hops_to(destination_id, max_legs)
+            if source_id not in hops_to_destination or source_id == destination_id:
+                return []
+
+            sort_key = SORT_KEYS[sort]
+            best = []
+            stack = [
+                (leg,)
+                for leg in self._departing(source_id, departure_after, departure_before)
+                if hops_to_destination.get(leg.route.destination_id, max_legs + 1) <= max_legs - 1
+            ]
+            while stack:
+                legs = stack.pop()
+                last = legs[-1]
+                airport_id = last.route.destination_id
+                if airport_id == destination_id:
+                    itinerary = Itinerary(
+                        legs=legs,
+                        duration=last.arrival_time - legs[0].departure_time,
+                        distance=sum(leg.route.distance for leg in legs),
+                    )
+                    heapq.heappush(best, (_negated(sort_key(itinerary)), id(itinerary), itinerary))
+                    if len(best) > limit:
+                        heapq.heappop(best)
+                    continue
+
+                legs_left = max_legs - len(legs)
+                visited = {legs[0].route.source_id, *(leg.route.destination_id for leg in legs)}
+                for leg in self._departing(
+                    airport_id, last.arrival_time + min_layover, last.arrival_time + max_layover, inclusive=True
+                ):
+                    next_airport = leg.route.destination_id
+                    if next_airport in visited:
+                        continue
+                    if hops_to_destination.get(next_airport, max_legs + 1) <= legs_left - 1:
+                        stack.append(legs + (leg,))
+
+            return sorted((item for _, _, item in best), key=sort_key)
+
+    def _departing(self, airport_id, start: datetime, end: datetime, inclusive: bool = False):
+        departures = self._departures.get(airport_id, [])
+        position = bisect_left(departures, (start,))
+        for departure_time, flight_id in departures[position:]:
+            if departure_time > end or (departure_time == end and not inclusive):
+                break
+            yield self._legs[flight_id]
+
+    def _hops_to(self, destination_id, max_legs: int) -> dict:
+        """
+        Minimal number of route hops from each airport to the destination, up to max_legs.
+        """
+        hops = {destination_id: 0}
+        queue = deque([destination_id])
+        while queue:
+            airport_id = queue.popleft()
+            if hops[airport_id] == max_legs:
+                continue
+            for route_id in self._reverse_adjacency.get(airport_id, ()):
+                source_id = self._routes[route_id].source_id
+                if source_id not in hops:
+                    hops[source_id] = hops[airport_id] + 1
+                    queue.append(source_id)
+        return hops
+
+    def _add_route(self, route) -> None:
+        info = RouteInfo(
+            id=route.id,
+            code_route=route.code_route,
+            source_id=route.source_id,
+            destination_id=route.destination_id,
+            source_code=route.source.airport_code,
+            destination_code=route.destination.airport_code,
+            distance=route.distance,
+        )
+        self._routes[route.id] = info
+        self._adjacency[info.source_id].add(route.id)
+        self._reverse_adjacency[info.destination_id].add(route.id)
+
+    def _remove_route(self, route_id) -> None:
+        info = self._routes.pop(route_id, None)
+        if info is not None:
+            self._adjacency[info.source_id].discard(route_id)
+            self._reverse_adjacency[info.destination_id].discard(route_id)
+
+    def _add_leg(self, flight_id, route_id, departure_time, arrival_time, sort: bool = True) -> None:
+        route = self._routes.get(route_id)
+        if route is None:
+            return
+        self._legs[flight_id] = Leg(flight_id, route, departure_time, arrival_time)
+        self._route_flights[route_id].add(flight_id)
+        if sort:
+            insort(self._departures[route.source_id], (departure_time, flight_id))
+        else:
+            self._departures[route.source_id].append((departure_time, flight_id))
+
+    def _remove_leg(self, flight_id) -> None:
+        leg = self._legs.pop(flight_id, None)
+        if leg is None:
+            return
+        self._route_flights[leg.route.id].discard(flight_id)
+        departures = self._departures[leg.route.source_id]
+        position = bisect_left(departures, (leg.departure_time, flight_id))
+        if position < len(departures) and departures[position] == (leg.departure_time, flight_id):
+            del departures[position]
+
+    def _mark_changed(self, kind: str, object_id) -> None:
+        version = _publish_change(kind, object_id)
+        # Otherwise another process changed data meanwhile; the next search replays its changes and this one.
+        if version == self._version + 1:
+            self._version = version
+
+
+def _negated(key: tuple) -> tuple:
+    return tuple(-value.total_seconds() if isinstance(value, timedelta) else -value for value in key)
+
+
+_index = ConnectionIndex()
+
+
+def get_connection_index() -> ConnectionIndex:
+    return _index
+
+
+def flight_changed(flight_id) -> None:
+    if _index.built:
+        _index.refresh_flight(flight_id)
+    else:
+        _publish_change("flight", flight_id)
+
+
+def route_changed(route_id) -> None:
+    if _index.built:
+        _index.refresh_route(route_id)
+    else:
+        _publish_change("route", route_id)
+
+
+def invalidate() -> None:
+    """
+    Rebuild the index in every process on its next search, after bulk changes.
+    """
+    _bump_version()
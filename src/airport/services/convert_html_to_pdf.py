@@ -1,15 +1,23 @@
+import logging
 import os
 import uuid
 
 from django.template.loader import render_to_string
-from playwright.sync_api import sync_playwright
 
+from airport.metrics import track_delivery
+from airport.services.pdf_cache import get_pdf_cache
+from airport.services.pdf_renderer import get_renderer_pool
 from airport.services.send_email import send_ticket_email
 from airport.services.send_telegram_massage import bot
 from user.models import PendingTelegramTicket
 
+logger = logging.getLogger(__name__)
 
-def generate_and_send_pdf(user, context: dict, template_name: str) -> str:
+
+def render_html(context: dict, template_name: str) -> str:
+    """
+    Render the template with static links rewritten to local files for Chromium.
+    """
     html_string = render_to_string(template_name, context)
 
     static_root = os.path.abspath("static")
@@ -18,7 +26,13 @@ def generate_and_send_pdf(user, context: dict, template_name: str) -> str:
 
     html_string = html_string.replace('href="/static/', f'href="{static_url}/')
     html_string = html_string.replace('src="/static/', f'src="{static_url}/')
+    return html_string
+
 
+def html_to_pdf(html_string: str) -> str:
+    """
+    Render an HTML document into a PDF file in ``tmp`` and return its path.
+    """
     os.makedirs("tmp", exist_ok=True)
 
     html_path = os.path.join("tmp", f"{uuid.uuid4().hex}.html")
@@ -27,23 +41,63 @@ def generate_and_send_pdf(user, context: dict, template_name: str) -> str:
     with open(html_path, "w", encoding="utf-8") as f:
         f.write(html_string)
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
-        page.goto(f"file:///{os.path.abspath(html_path)}", wait_until="networkidle")
-        page.pdf(path=pdf_path, format="A4", print_background=True)
-        browser.close()
+    try:
+        get_renderer_pool().render(html_path, pdf_path)
+    finally:
+        os.remove(html_path)
+
+    return pdf_path
+
+
+def render_pdf(context: dict, template_name: str) -> str:
+    """
+    Render the template into a PDF file in ``tmp`` and return its path.
+    """
+    return html_to_pdf(render_html(context, template_name))
+
+
+def render_pdf_cached(context: dict, template_name: str, ticket_ids=()) -> str:
+    """
+    Return the cached PDF artifact for the rendered template, rendering it on a miss.
 
-    os.remove(html_path)
+    ``ticket_ids`` tag the artifact so that changes to those tickets evict it.
+    """
+    html_string = render_html(context, template_name)
+    pdf_cache = get_pdf_cache()
+    key = pdf_cache.make_key(html_string, template_name)
 
+    cached_path = pdf_cache.get(key)
+    if cached_path:
+        return cached_path
+    return pdf_cache.put(key, html_to_pdf(html_string), ticket_ids)
+
+
+def send_pdf_to_telegram(user, pdf_path: str) -> bool:
+    """
+    Send the PDF to the user's Telegram chat.
+
+    Users without a linked chat get a PendingTelegramTicket that the bot delivers later.
+    Returns True when the document was sent right away.
+    """
     if getattr(user, "telegram_chat_id", None):
-        try:
-            with open(pdf_path, "rb") as pdf_file:
-                bot.send_document(user.telegram_chat_id, pdf_file, caption="Ваш билет")
-        except Exception as e:
-            print("Ошибка отправки документа через Telegram:", e)
-    else:
-        PendingTelegramTicket.objects.create(user=user, pdf_path=f"{os.path.abspath(pdf_path)}")
+        with open(pdf_path, "rb") as pdf_file, track_delivery("telegram"):
+            bot.send_document(user.telegram_chat_id, pdf_file, caption="Ваш билет")
+        return True
+
+    PendingTelegramTicket.objects.create(user=user, pdf_path=f"{os.path.abspath(pdf_path)}")
+    return False
+
+
+def generate_and_send_pdf(user, context: dict, template_name: str) -> str:
+    tickets = list(context.get("tickets", []))
+    pdf_path = render_pdf_cached(
+        dict(context, tickets=tickets), template_name, ticket_ids=[ticket.id for ticket in tickets]
+    )
+
+    try:
+        send_pdf_to_telegram(user, pdf_path)
+    except Exception:
+        logger.exception("Sending the ticket PDF to Telegram failed for user %s", user.pk)
 
     send_ticket_email(email=user.email, path_file=pdf_path)
 
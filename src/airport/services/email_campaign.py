@@ -0,0 +1,70 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+
+def shard_id_ranges(first_id: int, last_id: int, size: int) -> list:
+    """Inclusive (first, last) id ranges of ``size`` ids covering first_id..last_id."""
+    return [(start, min(start + size - 1, last_id)) for start in range(first_id, last_id + 1, size)]
+
+
+def campaign_recipients():
+    return get_user_model().objects.filter(is_active=True, email__isnull=False).exclude(email="")
+
+
+def recipient_batches(first_id: int, last_id: int, after_id: int, batch_size: int):
+    """
+    (id, email) pairs of the recipients with ids in first_id..last_id after ``after_id``, in id order.
+
+    Pages by id, so each batch is an index range scan however far the chunk got.
+    """
+    recipients = campaign_recipients().filter(id__range=(first_id, last_id)).order_by("id")
+    while True:
+        batch = list(recipients.filter(id__gt=after_id).values_list("id", "email")[:batch_size])
+        if not batch:
+            return
+        yield batch
+        after_id = batch[-1][0]
+
+
+class ProviderRateLimiter:
+    """
+    At most ``rate`` messages per second through the ``provider`` SMTP host.
+
+    Sends are counted per second in Redis (``EMAIL_RATE_LIMIT_REDIS_URL``),
+    so every worker sending through the provider shares one budget.
+    """
+
+    prefix = "email-rate"
+
+    def __init__(self, provider: str, rate: int, redis=None, clock=time.time, sleep=time.sleep):
+        if redis is None:
+            import redis as redis_client
+
+            redis = redis_client.Redis.from_url(settings.EMAIL_RATE_LIMIT_REDIS_URL)
+        self.provider = provider
+        self.rate = rate
+        self.redis = redis
+        self._clock = clock
+        self._sleep = sleep
+
+    @classmethod
+    def for_provider(cls, provider: str) -> "ProviderRateLimiter":
+        return cls(provider, settings.EMAIL_PROVIDER_RATE_LIMITS.get(provider, settings.EMAIL_DEFAULT_RATE_LIMIT))
+
+    def wait(self) -> None:
+        """Block until one more message may be sent; a rate of 0 is unlimited."""
+        if not self.rate:
+            return
+        while True:
+            now = self._clock()
+            window = int(now)
+            key = f"{self.prefix}:{self.provider}:{window}"
+            pipe = self.redis.pipeline()
+            pipe.incr(key)
+            pipe.expire(key, 5)
+            sent, _ = pipe.execute()
+            if sent <= self.rate:
+                return
+            self._sleep(window + 1 - now)
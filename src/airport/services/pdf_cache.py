@@ -0,0 +1,162 @@
+import functools
+import hashlib
+import os
+import threading
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+
+from user.models import PendingTelegramTicket
+
+TAG_KEY = "pdf-cache:ticket:{}"
+TAG_TIMEOUT = 60 * 60 * 24 * 30
+
+
+@functools.cache
+def asset_version(template_name: str) -> str:
+    """
+    Fingerprint of the template and static assets that affect the PDF output.
+
+    Built from file sizes and modification times, once per process: assets
+    change with a deploy, which restarts the processes.
+    """
+    paths = [get_template(template_name).origin.name]
+    for static_dir in settings.STATICFILES_DIRS:
+        paths.extend(str(path) for path in sorted(Path(static_dir).rglob("*")) if path.is_file())
+
+    digest = hashlib.sha256()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+class PdfArtifactCache:
+    """
+    Content-addressed store of rendered PDFs on local disk.
+
+    Artifacts are keyed by a hash of the rendered HTML plus the template/static
+    asset version, so a changed ticket never hits a stale artifact. Reads refresh
+    the file mtime and eviction removes the least recently used files once the
+    directory grows past ``max_bytes``. Artifacts still referenced by unsent
+    PendingTelegramTicket rows are never evicted; other artifacts removed
+    before a delivery task sends them are rendered again by that task.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def make_key(self, html: str, template_name: str) -> str:
+        digest = hashlib.sha256(asset_version(template_name).encode())
+        digest.update(html.encode("utf-8"))
+        return digest.hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.abspath(os.path.join(self.directory, f"{key}.pdf"))
+
+    def get(self, key: str) -> str | None:
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, pdf_path: str, ticket_ids=()) -> str:
+        """
+        Move a rendered PDF into the cache and return the artifact path.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(key)
+        # Move through a unique name so a concurrent reader never sees a partial file.
+        staging_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        os.replace(pdf_path, staging_path)
+        os.replace(staging_path, path)
+
+        self._tag(key, ticket_ids)
+        self.evict()
+        return path
+
+    def invalidate_tickets(self, ticket_ids) -> int:
+        """
+        Drop the artifacts that contain any of the given tickets.
+        """
+        tag_keys = [TAG_KEY.format(ticket_id) for ticket_id in ticket_ids]
+        if not tag_keys:
+            return 0
+        keys = set()
+        for artifact_keys in cache.get_many(tag_keys).values():
+            keys.update(artifact_keys)
+        cache.delete_many(tag_keys)
+
+        pinned = self._pinned_paths()
+        removed = 0
+        for key in keys:
+            path = self.path_for(key)
+            if path not in pinned and self._remove(path):
+                removed += 1
+        return removed
+
+    def evict(self) -> int:
+        """
+        Remove least recently used artifacts until the cache fits into ``max_bytes``.
+        """
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory) if os.path.isdir(self.directory) else ():
+                if entry.name.endswith(".pdf"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, os.path.abspath(entry.path)))
+                    total += stat.st_size
+            if total <= self.max_bytes:
+                return 0
+
+            pinned = self._pinned_paths()
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path in pinned:
+                    continue
+                if self._remove(path):
+                    total -= size
+                    removed += 1
+            return removed
+
+    def _tag(self, key: str, ticket_ids) -> None:
+        for ticket_id in ticket_ids:
+            tag_key = TAG_KEY.format(ticket_id)
+            keys = cache.get(tag_key, [])
+            if key not in keys:
+                cache.set(tag_key, keys + [key], TAG_TIMEOUT)
+
+    def _pinned_paths(self) -> set:
+        return set(
+            PendingTelegramTicket.objects.filter(
+                sent=False, pdf_path__startswith=os.path.abspath(self.directory)
+            ).values_list("pdf_path", flat=True)
+        )
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+
+_pdf_cache = None
+
+
+def get_pdf_cache() -> PdfArtifactCache:
+    global _pdf_cache
+    if _pdf_cache is None:
+        _pdf_cache = PdfArtifactCache(directory=settings.PDF_CACHE_DIR, max_bytes=settings.PDF_CACHE_MAX_BYTES)
+    return _pdf_cache
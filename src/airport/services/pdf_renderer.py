@@ -0,0 +1,254 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from playwright.sync_api import sync_playwright
+
+from airport.metrics import PDF_RENDER_DURATION, PDF_RENDER_REJECTED
+
+logger = logging.getLogger(__name__)
+
+PDF_OPTIONS = {"format": "A4", "print_background": True}
+
+
+class PdfRenderError(Exception):
+    """The renderer pool could not produce a PDF."""
+
+
+class PdfRendererBusy(PdfRenderError):
+    """The render queue is full."""
+
+
+class _BrowserSession:
+    """
+    One Chromium process with a single reusable page.
+
+    The sync Playwright API is bound to the thread that started it, so a session
+    must only be used from the worker thread that launched it.
+    """
+
+    def __init__(self):
+        self.renders = 0
+        self._playwright = sync_playwright().start()
+        self._browser = self._playwright.chromium.launch()
+        self._page = self._browser.new_page()
+
+    @property
+    def healthy(self) -> bool:
+        return self._browser.is_connected() and not self._page.is_closed()
+
+    def render(self, html_path: str, pdf_path: str, timeout: float) -> None:
+        """
+        Render within ``timeout`` seconds; Playwright raises its TimeoutError
+        once they are spent, which frees the worker.
+        """
+        self._page.set_default_timeout(timeout * 1000)
+        self._page.goto(f"file:///{os.path.abspath(html_path)}", wait_until="networkidle")
+        self._page.pdf(path=pdf_path, **PDF_OPTIONS)
+        self.renders += 1
+
+    def close(self) -> None:
+        try:
+            self._browser.close()
+        except Exception:  # NOQA: the browser may already be gone
+            pass
+        try:
+            self._playwright.stop()
+        except Exception:  # NOQA
+            pass
+
+
+class RendererStats:
+    """
+    Thread-safe counters and a rolling window of render latencies.
+    """
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.renders = 0
+        self.failures = 0
+        self.recycles = 0
+        self.rejected = 0
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.renders += 1
+            self._latencies.append(seconds)
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def latency_percentiles(self) -> dict:
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return {"p50": None, "p95": None, "p99": None}
+        return {f"p{p}": samples[min(len(samples) - 1, len(samples) * p // 100)] for p in (50, 95, 99)}
+
+
+class _RenderJob:
+    def __init__(self, html_path: str, pdf_path: str, deadline: float):
+        self.html_path = html_path
+        self.pdf_path = pdf_path
+        self.deadline = deadline
+        self.future = Future()
+
+
+class PdfRendererPool:
+    """
+    Pool of warm Chromium processes rendering HTML files into PDF.
+
+    Jobs go through a bounded queue to ``size`` worker threads, each owning a
+    browser session. A session is recycled after ``max_renders`` renders
+    (to contain memory leaks) and after any failed or crashed render.
+
+    Each job has a deadline ``render_timeout`` seconds after it was submitted.
+    The browser gets what is left of it as the Playwright timeout, so a render
+    the caller gave up on stops there and releases its worker; jobs whose
+    deadline passed in the queue are not started.
+    """
+
+    def __init__(self, size: int, queue_size: int, render_timeout: float, max_renders: int):
+        self.size = size
+        self.render_timeout = render_timeout
+        self.max_renders = max_renders
+        self.stats = RendererStats()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._workers = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.pid = os.getpid()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._workers or self._closed:
+                return
+            for index in range(self.size):
+                worker = threading.Thread(target=self._run, name=f"pdf-renderer-{index}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def render(self, html_path: str, pdf_path: str) -> str:
+        """
+        Render ``html_path`` into ``pdf_path`` and return ``pdf_path``.
+
+        Raises PdfRendererBusy when the queue is full and PdfRenderError when the
+        render fails or does not finish within the render timeout.
+        """
+        if self._closed:
+            raise PdfRenderError("Renderer pool is closed")
+        self.start()
+
+        job = _RenderJob(html_path, pdf_path, deadline=time.monotonic() + self.render_timeout)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self.stats.incr("rejected")
+            PDF_RENDER_REJECTED.inc()
+            raise PdfRendererBusy("Too many PDF renders in progress")
+
+        try:
+            return job.future.result(timeout=self.render_timeout)
+        except FutureTimeoutError:
+            job.future.cancel()
+            raise PdfRenderError(f"PDF render did not finish in {self.render_timeout}s")
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth(),
+            "renders": self.stats.renders,
+            "failures": self.stats.failures,
+            "recycles": self.stats.recycles,
+            "rejected": self.stats.rejected,
+            "latency": self.stats.latency_percentiles(),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            workers, self._workers = self._workers, []
+        for _ in workers:
+            self._queue.put(None)
+        for worker in workers:
+            worker.join(timeout=self.render_timeout)
+
+    def _launch(self) -> _BrowserSession:
+        return _BrowserSession()
+
+    def _run(self) -> None:
+        session = None
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            future = job.future
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            started = time.monotonic()
+            if started >= job.deadline:
+                future.set_exception(PdfRenderError("PDF render timed out in the queue"))
+                continue
+            try:
+                if session is None:
+                    session = self._launch()
+                # A Playwright timeout of 0 would mean no timeout at all.
+                session.render(job.html_path, job.pdf_path, timeout=max(job.deadline - time.monotonic(), 0.001))
+            except Exception as e:
+                logger.warning("PDF render failed, recycling browser: %s", e)
+                self.stats.incr("failures")
+                PDF_RENDER_DURATION.labels("failure").observe(time.monotonic() - started)
+                future.set_exception(PdfRenderError(str(e)))
+                if session is not None:
+                    session.close()
+                    session = None
+                    self.stats.incr("recycles")
+                continue
+
+            elapsed = time.monotonic() - started
+            self.stats.observe(elapsed)
+            PDF_RENDER_DURATION.labels("success").observe(elapsed)
+            future.set_result(job.pdf_path)
+            if session.renders >= self.max_renders or not session.healthy:
+                session.close()
+                session = None
+                self.stats.incr("recycles")
+
+        if session is not None:
+            session.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_renderer_pool() -> PdfRendererPool:
+    """
+    Return the process-wide renderer pool, creating it on first use.
+
+    A pool inherited through fork() (Celery prefork, gunicorn) has no live worker
+    threads, so a new one is created for each process.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = PdfRendererPool(
+                size=settings.PDF_RENDERER_POOL_SIZE,
+                queue_size=settings.PDF_RENDERER_QUEUE_SIZE,
+                render_timeout=settings.PDF_RENDER_TIMEOUT,
+                max_renders=settings.PDF_RENDERER_MAX_RENDERS,
+            )
+            atexit.register(_pool.close)
+        return _pool
@@ -0,0 +1,222 @@
+import csv
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+from django.db import transaction
+
+from airport.bulk import bulk_created
+from airport.models import Airplane, Airport, Crew, Flight, Route
+from airport.services.seat_inventory import generate_flight_seats
+
+BATCH_SIZE = 1000
+COLUMNS = (
+    "code_route",
+    "source",
+    "destination",
+    "distance",
+    "airplane",
+    "departure_time",
+    "arrival_time",
+    "status",
+    "crew",
+)
+CREW_SEPARATOR = ";"
+
+
+class ScheduleRowError(ValueError):
+    pass
+
+
+class ChunkResult(NamedTuple):
+    created: int
+    duplicates: int
+    errors: list
+
+
+def read_schedule(path, batch_size: int = BATCH_SIZE):
+    """
+    Stream the rows of a schedule file as dicts.
+
+    ``.parquet`` files are read in record batches with pyarrow, which is an
+    optional dependency; anything else is read as CSV with a header row.
+    """
+    path = Path(path)
+    if path.suffix.lower() != ".parquet":
+        return _read_csv(path)
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Reading Parquet schedules requires pyarrow (pip install pyarrow)") from exc
+    return (row for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size) for row in batch.to_pylist())
+
+
+def _read_csv(path):
+    with path.open(newline="", encoding="utf-8") as schedule:
+        yield from csv.DictReader(schedule)
+
+
+def _datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    return datetime.fromisoformat(str(value).strip())
+
+
+def _status(value) -> int:
+    if value in (None, ""):
+        return Flight.Status.SCHEDULED
+    text = str(value).strip()
+    if text.isdigit():
+        return Flight.Status(int(text))
+    return Flight.Status[text.upper()]
+
+
+def _crew_names(value) -> list:
+    names = []
+    for member in str(value or "").split(CREW_SEPARATOR):
+        first_name, _, last_name = member.strip().partition(" ")
+        if first_name:
+            names.append((first_name, last_name.strip()))
+    return names
+
+
+class ScheduleImporter:
+    """
+    Import schedule rows into routes, flights and crew assignments.
+
+    Airports (by code), airplanes (by name), routes (by code) and crew members
+    (by first and last name) are resolved through maps loaded once, so a chunk
+    costs a fixed number of queries whatever its size: missing routes and crew
+    members are created with one bulk insert each, flights and their crew links
+    with another, and the seat inventory and availability counters of the new
+    flights are built set-wise. Flights already stored for the same route and
+    departure time are skipped, which makes re-importing a chunk harmless.
+    """
+
+    def __init__(self):
+        self.airports = {code.upper(): pk for code, pk in Airport.objects.values_list("airport_code", "id")}
+        self.airplanes = dict(Airplane.objects.values_list("name", "id"))
+        self.routes = dict(Route.objects.values_list("code_route", "id"))
+        self.crew = {}
+        for pk, first_name, last_name in Crew.objects.order_by("-id").values_list("id", "first_name", "last_name"):
+            self.crew[(first_name, last_name)] = pk
+
+    def parse(self, row) -> dict:
+        try:
+            airplane = row["airplane"]
+            if airplane not in self.airplanes:
+                raise ScheduleRowError(f"Unknown airplane {airplane!r}")
+            departure_time, arrival_time = _datetime(row["departure_time"]), _datetime(row["arrival_time"])
+            if arrival_time <= departure_time:
+                raise ScheduleRowError("arrival_time must be after departure_time")
+            parsed = {
+                "code_route": str(row["code_route"]).strip(),
+                "airplane_id": self.airplanes[airplane],
+                "departure_time": departure_time,
+                "arrival_time": arrival_time,
+                "status": _status(row.get("status")),
+                "crew": _crew_names(row.get("crew")),
+            }
+            if parsed["code_route"] not in self.routes:
+                parsed["route"] = self.parse_route(row)
+        except KeyError as exc:
+            raise ScheduleRowError(f"Missing or invalid value for {exc}") from exc
+        except ValueError as exc:
+            raise ScheduleRowError(str(exc)) from exc
+        return parsed
+
+    def parse_route(self, row) -> dict:
+        if len(str(row["code_route"]).strip()) > Route._meta.get_field("code_route").max_length:
+            raise ScheduleRowError(f"Route code {row['code_route']!r} is too long")
+        source, destination = str(row["source"]).strip().upper(), str(row["destination"]).strip().upper()
+        for code in (source, destination):
+            if code not in self.airports:
+                raise ScheduleRowError(f"Unknown airport {code!r}")
+        return {
+            "source_id": self.airports[source],
+            "destination_id": self.airports[destination],
+            "distance": int(row["distance"]),
+        }
+
+    def import_chunk(self, rows, first_line: int) -> ChunkResult:
+        """
+        Import one chunk of rows in a transaction; ``first_line`` numbers the rows in errors.
+        """
+        flights, errors = [], []
+        for line, row in enumerate(rows, start=first_line):
+            try:
+                flights.append(self.parse(row))
+            except ScheduleRowError as exc:
+                errors.append((line, str(exc)))
+
+        with transaction.atomic():
+            self.create_routes(flights)
+            self.create_crew(flights)
+            flights, duplicates = self.drop_existing(flights)
+            created = Flight.objects.bulk_create(
+                [
+                    Flight(
+                        route_id=self.routes[flight["code_route"]],
+                        airplane_id=flight["airplane_id"],
+                        departure_time=flight["departure_time"],
+                        arrival_time=flight["arrival_time"],
+                        status=flight["status"],
+                    )
+                    for flight in flights
+                ],
+                batch_size=BATCH_SIZE,
+            )
+            Flight.crew.through.objects.bulk_create(
+                [
+                    Flight.crew.through(flight_id=instance.id, crew_id=self.crew[name])
+                    for instance, flight in zip(created, flights)
+                    for name in dict.fromkeys(flight["crew"])
+                ],
+                batch_size=BATCH_SIZE,
+            )
+            generate_flight_seats([instance.id for instance in created])
+            bulk_created.send(sender=Flight, instances=created)
+        return ChunkResult(len(created), duplicates, errors)
+
+    def create_routes(self, flights) -> None:
+        missing = {}
+        for flight in flights:
+            if flight["code_route"] not in self.routes:
+                missing.setdefault(flight["code_route"], flight["route"])
+        if not missing:
+            return
+        routes = Route.objects.bulk_create(
+            [Route(code_route=code, **fields) for code, fields in missing.items()], batch_size=BATCH_SIZE
+        )
+        self.routes.update((route.code_route, route.id) for route in routes)
+        bulk_created.send(sender=Route, instances=routes)
+
+    def create_crew(self, flights) -> None:
+        missing = {name for flight in flights for name in flight["crew"] if name not in self.crew}
+        if not missing:
+            return
+        members = Crew.objects.bulk_create(
+            [Crew(first_name=first_name, last_name=last_name) for first_name, last_name in sorted(missing)],
+            batch_size=BATCH_SIZE,
+        )
+        self.crew.update(((member.first_name, member.last_name), member.id) for member in members)
+        bulk_created.send(sender=Crew, instances=members)
+
+    def drop_existing(self, flights) -> tuple:
+        if not flights:
+            return flights, 0
+        keys = {(self.routes[flight["code_route"]], flight["departure_time"]) for flight in flights}
+        existing = set(
+            Flight.objects.filter(
+                route_id__in={route_id for route_id, _ in keys},
+                departure_time__gte=min(departure for _, departure in keys),
+                departure_time__lte=max(departure for _, departure in keys),
+            ).values_list("route_id", "departure_time")
+        )
+        new = []
+        for flight in flights:
+            key = (self.routes[flight["code_route"]], flight["departure_time"])
+            if key not in existing:
+                existing.add(key)
+                new.append(flight)
+        return new, len(flights) - len(new)
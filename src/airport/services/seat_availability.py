@@ -0,0 +1,148 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from airport.caching import bump_model_version
+from airport.models import Flight, FlightAvailability, Seat, Ticket
+
+CHUNK_SIZE = 1000
+
+
+def count_availability(flight_ids) -> dict:
+    """
+    Count seats and tickets of the flights from scratch.
+
+    Returns {(flight_id, ticket_class_id): [total_seats, booked_seats]}.
+    """
+    counters = defaultdict(lambda: [0, 0])
+    totals = (
+        Seat.objects.filter(airplane__flight_airplane__in=flight_ids)
+        .values_list("airplane__flight_airplane", "ticket_class_id")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    for flight_id, ticket_class_id, total in totals:
+        counters[(flight_id, ticket_class_id)][0] = total
+
+    booked = (
+        Ticket.objects.filter(flight_seat__flight_id__in=flight_ids)
+        .values_list("flight_seat__flight_id", "flight_seat__seat__ticket_class_id")
+        .annotate(booked=Count("id"))
+        .order_by()
+    )
+    for flight_id, ticket_class_id, count in booked:
+        counters[(flight_id, ticket_class_id)][1] = count
+    return counters
+
+
+def _flight_id_chunks(flight_ids=None):
+    if flight_ids is not None:
+        flight_ids = sorted(set(flight_ids))
+        for start in range(0, len(flight_ids), CHUNK_SIZE):
+            end = start + CHUNK_SIZE
+            yield flight_ids[start:end]
+        return
+
+    last_id = 0
+    while True:
+        chunk = list(Flight.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:CHUNK_SIZE])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
+
+
+def rebuild_availability(flight_ids=None) -> int:
+    """
+    Recompute the counters of the given flights (all flights by default).
+
+    Returns the number of counter rows written.
+    """
+    written = 0
+    for chunk in _flight_id_chunks(flight_ids):
+        counters = count_availability(chunk)
+        with transaction.atomic():
+            FlightAvailability.objects.filter(flight_id__in=chunk).delete()
+            FlightAvailability.objects.bulk_create(
+                FlightAvailability(
+                    flight_id=flight_id, ticket_class_id=ticket_class_id, total_seats=total, booked_seats=booked
+                )
+                for (flight_id, ticket_class_id), (total, booked) in counters.items()
+            )
+        written += len(counters)
+    bump_model_version(FlightAvailability)
+    return written
+
+
+def verify_availability(flight_ids=None) -> list:
+    """
+    Compare the counters with a fresh count.
+
+    Returns a list of (flight_id, ticket_class_id, stored, actual) mismatches,
+    where stored and actual are (total_seats, booked_seats) tuples.
+    """
+    mismatches = []
+    for chunk in _flight_id_chunks(flight_ids):
+        actual = {key: tuple(value) for key, value in count_availability(chunk).items()}
+        stored = {
+            (flight_id, ticket_class_id): (total, booked)
+            for flight_id, ticket_class_id, total, booked in FlightAvailability.objects.filter(
+                flight_id__in=chunk
+            ).values_list("flight_id", "ticket_class_id", "total_seats", "booked_seats")
+        }
+        for key in sorted(actual.keys() | stored.keys()):
+            if actual.get(key, (0, 0)) != stored.get(key, (0, 0)):
+                mismatches.append((*key, stored.get(key), actual.get(key)))
+    return mismatches
+
+
+def adjust_booked(flight_id, ticket_class_id, delta: int) -> None:
+    adjust_booked_classes(flight_id, {ticket_class_id: delta})
+
+
+def adjust_booked_classes(flight_id, deltas: dict) -> None:
+    """
+    Add booked seat ``deltas`` ({ticket_class_id: delta}) to the counters of a flight.
+
+    Called after the tickets are written. Flights inserted in bulk have no
+    counters yet; those are rebuilt from the tickets instead, which count the new
+    ones already, so no delta is applied on top of the rebuild.
+    """
+    missing = False
+    for ticket_class_id, delta in deltas.items():
+        updated = FlightAvailability.objects.filter(flight_id=flight_id, ticket_class_id=ticket_class_id).update(
+            booked_seats=F("booked_seats") + delta
+        )
+        missing = missing or (not updated and delta > 0)
+    if missing:
+        rebuild_availability([flight_id])
+    bump_model_version(FlightAvailability)
+
+
+def adjust_total(airplane_id, ticket_class_id, delta: int) -> None:
+    """
+    Add ``delta`` seats of a ticket class to every flight of the airplane.
+    """
+    flights = Flight.objects.filter(airplane_id=airplane_id)
+    FlightAvailability.objects.filter(flight__in=flights, ticket_class_id=ticket_class_id).update(
+        total_seats=F("total_seats") + delta
+    )
+    if delta > 0:
+        missing = flights.exclude(availability__ticket_class_id=ticket_class_id).values_list("id", flat=True)
+        FlightAvailability.objects.bulk_create(
+            [
+                FlightAvailability(flight_id=flight_id, ticket_class_id=ticket_class_id, total_seats=delta)
+                for flight_id in missing
+            ],
+            ignore_conflicts=True,
+        )
+    bump_model_version(FlightAvailability)
+
+
+def ticket_flight_and_class(flight_seat_id) -> tuple:
+    return (
+        Seat.objects.filter(flight_seats__id=flight_seat_id)
+        .values_list("flight_seats__flight_id", "ticket_class_id")
+        .get()
+    )
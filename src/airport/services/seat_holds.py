@@ -0,0 +1,371 @@
+import json
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import NamedTuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Hold payloads outlive their seats so the sweeper can still read them.
+PAYLOAD_GRACE_SECONDS = 3600
+
+
+class SeatConflictError(Exception):
+    """
+    Some of the requested seats are booked, held or being booked by another buyer.
+    """
+
+    def __init__(self, taken):
+        self.taken = sorted(taken)
+        super().__init__(f"Seats already taken: {self.taken}")
+
+
+class Hold(NamedTuple):
+    id: str
+    user_id: int
+    flight_id: int
+    seats: dict
+    prices: dict
+    expires_at: float
+
+    @property
+    def expires_at_datetime(self) -> datetime:
+        return datetime.fromtimestamp(self.expires_at)
+
+    def is_active(self, now: float = None) -> bool:
+        return self.expires_at > (time.time() if now is None else now)
+
+    def to_json(self) -> str:
+        return json.dumps(self._asdict())
+
+    @classmethod
+    def from_json(cls, raw) -> "Hold":
+        data = json.loads(raw)
+        data["seats"] = {int(seat_id): class_id for seat_id, class_id in data["seats"].items()}
+        data["prices"] = {int(seat_id): price for seat_id, price in data["prices"].items()}
+        return cls(**data)
+
+
+class HoldStore(ABC):
+    """
+    Time-limited holds on flight seats.
+
+    A hold claims all of its seats or none of them. Active holds are indexed per
+    flight and per (flight, ticket class) by expiry time, so counting held seats
+    is a range count instead of a scan, and expired holds are cleaned up in
+    batches by ``sweep``.
+    """
+
+    @abstractmethod
+    def hold(self, user_id, flight_id, seats: dict, prices: dict, ttl: int) -> Hold:
+        """
+        Hold ``seats`` ({flight_seat_id: ticket_class_id}) for ``ttl`` seconds.
+
+        Raises SeatConflictError with the seats held by someone else.
+        """
+
+    @abstractmethod
+    def get(self, hold_id) -> Hold | None:
+        """
+        The hold if it exists and has not expired.
+        """
+
+    @abstractmethod
+    def release(self, hold: Hold) -> None:
+        """
+        Drop the hold and free its seats.
+        """
+
+    @abstractmethod
+    def owners(self, flight_seat_ids) -> dict:
+        """
+        Map held seats among ``flight_seat_ids`` to the id of the hold owning them.
+        """
+
+    @abstractmethod
+    def held_seats(self, flight_id) -> set:
+        """
+        Actively held seats of the flight.
+        """
+
+    @abstractmethod
+    def held_counts(self, flight_id, ticket_class_ids) -> dict:
+        """
+        Number of actively held seats of the flight per ticket class.
+        """
+
+    @abstractmethod
+    def held_per_flight(self, flight_ids) -> dict:
+        """
+        Number of actively held seats per flight among ``flight_ids``, for the flights that have any.
+        """
+
+    @abstractmethod
+    def sweep(self, limit: int) -> int:
+        """
+        Drop up to ``limit`` expired holds from the indexes, returns the number dropped.
+        """
+
+    @staticmethod
+    def _new_hold(user_id, flight_id, seats, prices, ttl) -> Hold:
+        return Hold(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            flight_id=flight_id,
+            seats=dict(seats),
+            prices=dict(prices),
+            expires_at=time.time() + ttl,
+        )
+
+
+CLAIM_SCRIPT = """
+local n = (#ARGV - 5)
+local taken = {}
+for i = 1, n do
+    local owner = redis.call("GET", KEYS[3 + i])
+    if owner and owner ~= ARGV[1] then
+        table.insert(taken, ARGV[5 + i])
+    end
+end
+if #taken > 0 then
+    return taken
+end
+for i = 1, n do
+    redis.call("SET", KEYS[3 + i], ARGV[1], "PX", ARGV[2])
+    redis.call("ZADD", KEYS[3], ARGV[3], ARGV[5 + i])
+    redis.call("ZADD", KEYS[3 + n + i], ARGV[3], ARGV[5 + i])
+end
+redis.call("SET", KEYS[1], ARGV[4], "PX", ARGV[5])
+redis.call("ZADD", KEYS[2], ARGV[3], ARGV[1])
+return taken
+"""
+
+RELEASE_SCRIPT = """
+local n = (#ARGV - 1)
+for i = 1, n do
+    if redis.call("GET", KEYS[3 + i]) == ARGV[1] then
+        redis.call("DEL", KEYS[3 + i])
+        redis.call("ZREM", KEYS[3], ARGV[1 + i])
+        redis.call("ZREM", KEYS[3 + n + i], ARGV[1 + i])
+    end
+end
+redis.call("DEL", KEYS[1])
+redis.call("ZREM", KEYS[2], ARGV[1])
+return n
+"""
+
+
+class RedisHoldStore(HoldStore):
+    """
+    Holds in Redis.
+
+    Every held seat is a key owned by its hold and expiring with it; claiming and
+    releasing run as Lua scripts so a hold never takes only part of its seats.
+    Per-flight and per-class sorted sets score seats by expiry (milliseconds).
+    """
+
+    prefix = "seat-hold"
+
+    def __init__(self, url=None):
+        import redis
+
+        self.redis = redis.Redis.from_url(url or settings.SEAT_HOLD_REDIS_URL, decode_responses=True)
+        self._claim = self.redis.register_script(CLAIM_SCRIPT)
+        self._release = self.redis.register_script(RELEASE_SCRIPT)
+
+    def _hold_key(self, hold_id) -> str:
+        return f"{self.prefix}:hold:{hold_id}"
+
+    def _seat_key(self, flight_seat_id) -> str:
+        return f"{self.prefix}:seat:{flight_seat_id}"
+
+    def _flight_key(self, flight_id) -> str:
+        return f"{self.prefix}:flight:{flight_id}"
+
+    def _class_key(self, flight_id, ticket_class_id) -> str:
+        return f"{self.prefix}:flight:{flight_id}:class:{ticket_class_id}"
+
+    @property
+    def _expiry_key(self) -> str:
+        return f"{self.prefix}:expiry"
+
+    def _script_keys(self, hold: Hold, seat_ids) -> list:
+        return [
+            self._hold_key(hold.id),
+            self._expiry_key,
+            self._flight_key(hold.flight_id),
+            *(self._seat_key(seat_id) for seat_id in seat_ids),
+            *(self._class_key(hold.flight_id, hold.seats[seat_id]) for seat_id in seat_ids),
+        ]
+
+    def hold(self, user_id, flight_id, seats: dict, prices: dict, ttl: int) -> Hold:
+        hold = self._new_hold(user_id, flight_id, seats, prices, ttl)
+        seat_ids = sorted(hold.seats)
+        taken = self._claim(
+            keys=self._script_keys(hold, seat_ids),
+            args=[
+                hold.id,
+                ttl * 1000,
+                int(hold.expires_at * 1000),
+                hold.to_json(),
+                (ttl + PAYLOAD_GRACE_SECONDS) * 1000,
+                *seat_ids,
+            ],
+        )
+        if taken:
+            raise SeatConflictError(int(seat_id) for seat_id in taken)
+        return hold
+
+    def get(self, hold_id) -> Hold | None:
+        raw = self.redis.get(self._hold_key(hold_id))
+        if raw is None:
+            return None
+        hold = Hold.from_json(raw)
+        return hold if hold.is_active() else None
+
+    def release(self, hold: Hold) -> None:
+        seat_ids = sorted(hold.seats)
+        self._release(keys=self._script_keys(hold, seat_ids), args=[hold.id, *seat_ids])
+
+    def owners(self, flight_seat_ids) -> dict:
+        flight_seat_ids = list(flight_seat_ids)
+        if not flight_seat_ids:
+            return {}
+        values = self.redis.mget([self._seat_key(seat_id) for seat_id in flight_seat_ids])
+        return {seat_id: owner for seat_id, owner in zip(flight_seat_ids, values) if owner is not None}
+
+    def held_seats(self, flight_id) -> set:
+        now = int(time.time() * 1000)
+        return {int(seat_id) for seat_id in self.redis.zrangebyscore(self._flight_key(flight_id), f"({now}", "+inf")}
+
+    def held_counts(self, flight_id, ticket_class_ids) -> dict:
+        now = int(time.time() * 1000)
+        ticket_class_ids = list(ticket_class_ids)
+        pipe = self.redis.pipeline(transaction=False)
+        for ticket_class_id in ticket_class_ids:
+            pipe.zcount(self._class_key(flight_id, ticket_class_id), f"({now}", "+inf")
+        return dict(zip(ticket_class_ids, pipe.execute()))
+
+    def held_per_flight(self, flight_ids) -> dict:
+        now = int(time.time() * 1000)
+        flight_ids = list(flight_ids)
+        pipe = self.redis.pipeline(transaction=False)
+        for flight_id in flight_ids:
+            pipe.zcount(self._flight_key(flight_id), f"({now}", "+inf")
+        return {flight_id: count for flight_id, count in zip(flight_ids, pipe.execute()) if count}
+
+    def sweep(self, limit: int) -> int:
+        now = int(time.time() * 1000)
+        hold_ids = self.redis.zrangebyscore(self._expiry_key, "-inf", now, start=0, num=limit)
+        if not hold_ids:
+            return 0
+        payloads = self.redis.mget([self._hold_key(hold_id) for hold_id in hold_ids])
+        pipe = self.redis.pipeline(transaction=False)
+        for hold_id, raw in zip(hold_ids, payloads):
+            if raw is not None:
+                hold = Hold.from_json(raw)
+                pipe.zremrangebyscore(self._flight_key(hold.flight_id), "-inf", now)
+                for ticket_class_id in set(hold.seats.values()):
+                    pipe.zremrangebyscore(self._class_key(hold.flight_id, ticket_class_id), "-inf", now)
+                pipe.delete(self._hold_key(hold_id))
+            pipe.zrem(self._expiry_key, hold_id)
+        pipe.execute()
+        return len(hold_ids)
+
+
+class LocalHoldStore(HoldStore):
+    """
+    In-process stand-in for RedisHoldStore, used in tests and local development.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        self._holds = {}
+        self._seat_owners = {}
+
+    def _active_owner(self, flight_seat_id, now) -> str | None:
+        hold_id = self._seat_owners.get(flight_seat_id)
+        hold = self._holds.get(hold_id)
+        if hold is None or not hold.is_active(now):
+            return None
+        return hold_id
+
+    def hold(self, user_id, flight_id, seats: dict, prices: dict, ttl: int) -> Hold:
+        hold = self._new_hold(user_id, flight_id, seats, prices, ttl)
+        now = time.time()
+        with self._lock:
+            taken = [seat_id for seat_id in hold.seats if self._active_owner(seat_id, now) is not None]
+            if taken:
+                raise SeatConflictError(taken)
+            self._holds[hold.id] = hold
+            for seat_id in hold.seats:
+                self._seat_owners[seat_id] = hold.id
+        return hold
+
+    def get(self, hold_id) -> Hold | None:
+        hold = self._holds.get(hold_id)
+        return hold if hold is not None and hold.is_active() else None
+
+    def release(self, hold: Hold) -> None:
+        with self._lock:
+            self._holds.pop(hold.id, None)
+            for seat_id in hold.seats:
+                if self._seat_owners.get(seat_id) == hold.id:
+                    del self._seat_owners[seat_id]
+
+    def owners(self, flight_seat_ids) -> dict:
+        now = time.time()
+        with self._lock:
+            owners = {seat_id: self._active_owner(seat_id, now) for seat_id in flight_seat_ids}
+        return {seat_id: owner for seat_id, owner in owners.items() if owner is not None}
+
+    def _active_holds(self, flight_id):
+        now = time.time()
+        return [hold for hold in self._holds.values() if hold.flight_id == flight_id and hold.is_active(now)]
+
+    def held_seats(self, flight_id) -> set:
+        with self._lock:
+            return {seat_id for hold in self._active_holds(flight_id) for seat_id in hold.seats}
+
+    def held_counts(self, flight_id, ticket_class_ids) -> dict:
+        counts = dict.fromkeys(ticket_class_ids, 0)
+        with self._lock:
+            for hold in self._active_holds(flight_id):
+                for ticket_class_id in hold.seats.values():
+                    if ticket_class_id in counts:
+                        counts[ticket_class_id] += 1
+        return counts
+
+    def held_per_flight(self, flight_ids) -> dict:
+        flight_ids = set(flight_ids)
+        now = time.time()
+        counts = {}
+        with self._lock:
+            for hold in self._holds.values():
+                if hold.flight_id in flight_ids and hold.is_active(now):
+                    counts[hold.flight_id] = counts.get(hold.flight_id, 0) + len(hold.seats)
+        return counts
+
+    def sweep(self, limit: int) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [hold for hold in self._holds.values() if not hold.is_active(now)][:limit]
+        for hold in expired:
+            self.release(hold)
+        return len(expired)
+
+
+_stores = {}
+
+
+def get_hold_store() -> HoldStore:
+    backend = settings.SEAT_HOLD_BACKEND
+    if backend not in _stores:
+        _stores[backend] = import_string(backend)()
+    return _stores[backend]
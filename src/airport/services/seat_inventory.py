@@ -0,0 +1,81 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from airport.caching import bump_model_version
+from airport.models import Flight, FlightSeat, Seat, Ticket
+from airport.services import seat_availability, seat_map
+from airport.services.pdf_cache import get_pdf_cache
+
+BATCH_SIZE = 1000
+
+
+class InventoryConflictError(Exception):
+    """
+    Seats that would be removed from a flight's inventory already have tickets.
+    """
+
+    def __init__(self, flight_seat_ids):
+        self.flight_seat_ids = sorted(flight_seat_ids)
+        super().__init__(f"Flight seats with tickets: {self.flight_seat_ids}")
+
+
+def generate_flight_seats(flight_ids) -> int:
+    """
+    Create the missing FlightSeat rows for every seat of the flights' airplanes.
+
+    Seats are matched to flights by airplane in one query per batch, so every
+    generated row is valid by construction and no per-row clean() is needed.
+    Returns the number of rows created.
+    """
+    flight_ids = list(flight_ids)
+    airplanes = dict(Flight.objects.filter(id__in=flight_ids).values_list("id", "airplane_id"))
+    seats = defaultdict(list)
+    for seat_id, airplane_id in Seat.objects.filter(airplane_id__in=set(airplanes.values())).values_list(
+        "id", "airplane_id"
+    ):
+        seats[airplane_id].append(seat_id)
+    existing = set(FlightSeat.objects.filter(flight_id__in=flight_ids).values_list("flight_id", "seat_id"))
+
+    missing = [
+        FlightSeat(flight_id=flight_id, seat_id=seat_id)
+        for flight_id, airplane_id in airplanes.items()
+        for seat_id in seats[airplane_id]
+        if (flight_id, seat_id) not in existing
+    ]
+    FlightSeat.objects.bulk_create(missing, batch_size=BATCH_SIZE)
+    transaction.on_commit(lambda: seat_map.invalidate(flight_ids))
+    transaction.on_commit(lambda: bump_model_version(FlightSeat))
+    return len(missing)
+
+
+def regenerate_flight_seats(flight_ids, airplane=None) -> dict:
+    """
+    Bring the seat inventory of the flights in line with their airplane.
+
+    When ``airplane`` is given the flights are moved to it first. Flight seats of
+    another airplane are deleted unless they have tickets, in which case
+    InventoryConflictError is raised and nothing changes.
+    """
+    with transaction.atomic():
+        # Lock the flights so bookings and other regenerations wait for the new inventory.
+        flight_ids = list(
+            Flight.objects.select_for_update().filter(id__in=flight_ids).order_by("id").values_list("id", flat=True)
+        )
+        if airplane is not None:
+            Flight.objects.filter(id__in=flight_ids).update(airplane=airplane, updated_at=timezone.now())
+            transaction.on_commit(lambda: bump_model_version(Flight))
+
+        foreign = FlightSeat.objects.filter(flight_id__in=flight_ids).exclude(seat__airplane=F("flight__airplane"))
+        ticketed = list(Ticket.objects.filter(flight_seat__in=foreign).values_list("flight_seat_id", flat=True))
+        if ticketed:
+            raise InventoryConflictError(ticketed)
+        removed, _ = foreign.delete()
+        created = generate_flight_seats(flight_ids)
+        seat_availability.rebuild_availability(flight_ids)
+
+    ticket_ids = Ticket.objects.filter(flight_seat__flight_id__in=flight_ids).values_list("id", flat=True)
+    get_pdf_cache().invalidate_tickets(list(ticket_ids))
+    return {"flights": len(flight_ids), "created": created, "removed": removed}
@@ -0,0 +1,150 @@
+import functools
+import threading
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.redis import RedisCache
+
+from airport.models import FlightSeat, Ticket
+from config.db_router import primary_reads
+
+LAYOUT_KEY = "seat-map:{}:layout"
+BITMAP_KEY = "seat-map:{}:bitmap"
+CHANGES_KEY = "seat-map:{}:changes"
+FILL_ATTEMPTS = 3
+
+_lock = threading.Lock()
+
+
+def encode_bitmap(positions, size: int) -> bytes:
+    """
+    Bitmap of ``size`` bits with the given positions set, most significant bit first.
+    """
+    bitmap = bytearray((size + 7) // 8)
+    for position in positions:
+        bitmap[position // 8] |= 0x80 >> (position % 8)
+    return bytes(bitmap)
+
+
+@functools.cache
+def _redis_connection(url):
+    import redis
+
+    return redis.Redis.from_url(url)
+
+
+def _redis_client():
+    # Bit updates go straight to Redis so concurrent bookings never overwrite each other.
+    if isinstance(caches[DEFAULT_CACHE_ALIAS], RedisCache):
+        return _redis_connection(settings.CACHE_REDIS_URL)
+    return None
+
+
+def get_layout(flight_id) -> dict:
+    """
+    Cabin layout of the flight: seats in row order and the bit position of each flight seat.
+    """
+    key = LAYOUT_KEY.format(flight_id)
+    layout = cache.get(key)
+    if layout is None:
+        with primary_reads():
+            seats = [
+                {"flight_seat": flight_seat_id, "row": row, "seat": seat, "seat_type": seat_type, "ticket_class": name}
+                for flight_seat_id, row, seat, seat_type, name in FlightSeat.objects.filter(flight_id=flight_id)
+                .order_by("seat__row", "seat__seat", "id")
+                .values_list("id", "seat__row", "seat__seat", "seat__seat_type", "seat__ticket_class__name")
+            ]
+        layout = {"seats": seats, "positions": {seat["flight_seat"]: index for index, seat in enumerate(seats)}}
+        cache.set(key, layout, settings.SEAT_MAP_TTL)
+    return layout
+
+
+def _load_bitmap(flight_id, layout) -> bytes:
+    with primary_reads():
+        booked = list(Ticket.objects.filter(flight_seat__flight_id=flight_id).values_list("flight_seat_id", flat=True))
+    positions = layout["positions"]
+    return encode_bitmap((positions[seat_id] for seat_id in booked if seat_id in positions), len(positions))
+
+
+def _changes(flight_id) -> int:
+    return cache.get(CHANGES_KEY.format(flight_id), 0)
+
+
+def _record_change(flight_id) -> None:
+    key = CHANGES_KEY.format(flight_id)
+    cache.add(key, 0, settings.SEAT_MAP_TTL)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, settings.SEAT_MAP_TTL)
+
+
+def get_occupancy(flight_id, layout) -> bytes:
+    """
+    Occupancy bitmap of the flight, loaded from the database on a cache miss.
+
+    Every booking or release of the flight's seats counts a change, also when no
+    bitmap is cached; a fill that saw the count move may have missed a booking,
+    so it drops what it cached and loads again.
+    """
+    key = cache.make_key(BITMAP_KEY.format(flight_id))
+    client = _redis_client()
+    bitmap = client.get(key) if client else cache.get(BITMAP_KEY.format(flight_id))
+    if bitmap is not None:
+        return bitmap
+    for _ in range(FILL_ATTEMPTS):
+        changes = _changes(flight_id)
+        bitmap = _load_bitmap(flight_id, layout)
+        if client:
+            client.set(key, bitmap, ex=settings.SEAT_MAP_TTL, nx=True)
+        else:
+            cache.add(BITMAP_KEY.format(flight_id), bitmap, settings.SEAT_MAP_TTL)
+        if _changes(flight_id) == changes:
+            break
+        cache.delete(BITMAP_KEY.format(flight_id))
+    return bitmap
+
+
+def mark_seats(flight_id, flight_seat_ids, occupied: bool) -> None:
+    """
+    Flip the bits of booked or released seats in the cached bitmap.
+
+    Nothing is done when the flight has no cached map: the next read loads it.
+    """
+    _record_change(flight_id)
+    layout = cache.get(LAYOUT_KEY.format(flight_id))
+    if layout is None:
+        return
+    positions = [layout["positions"][seat_id] for seat_id in flight_seat_ids if seat_id in layout["positions"]]
+    if len(positions) != len(flight_seat_ids):
+        # The inventory changed since the layout was cached.
+        invalidate([flight_id])
+        return
+
+    key = cache.make_key(BITMAP_KEY.format(flight_id))
+    client = _redis_client()
+    if client:
+        if client.exists(key):
+            pipe = client.pipeline()
+            for position in positions:
+                pipe.setbit(key, position, int(occupied))
+            pipe.execute()
+        return
+
+    with _lock:
+        bitmap = cache.get(BITMAP_KEY.format(flight_id))
+        if bitmap is None:
+            return
+        bitmap = bytearray(bitmap)
+        for position in positions:
+            if occupied:
+                bitmap[position // 8] |= 0x80 >> (position % 8)
+            else:
+                bitmap[position // 8] &= ~(0x80 >> (position % 8)) & 0xFF
+        cache.set(BITMAP_KEY.format(flight_id), bytes(bitmap), settings.SEAT_MAP_TTL)
+
+
+def invalidate(flight_ids) -> None:
+    for flight_id in flight_ids:
+        _record_change(flight_id)
+    cache.delete_many([key.format(flight_id) for flight_id in flight_ids for key in (LAYOUT_KEY, BITMAP_KEY)])
@@ -1,6 +1,8 @@
 from django.conf import settings
 from django.core.mail import EmailMessage
 
+from airport.metrics import track_delivery
+
 
 def send_ticket_email(email: str, path_file: str) -> None:
     email = EmailMessage(
@@ -10,4 +12,5 @@ def send_ticket_email(email: str, path_file: str) -> None:
         to=[email],
     )
     email.attach_file(f"{path_file}")
-    email.send()
+    with track_delivery("email"):
+        email.send()
@@ -1,3 +1,4 @@
+import logging
 import os
 
 import django
@@ -10,8 +11,11 @@ load_dotenv()
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 django.setup()
+from airport.metrics import track_delivery  # NOQA E402
 from user.models import PendingTelegramTicket  # NOQA E402
 
+logger = logging.getLogger(__name__)
+
 token = os.getenv("TELEGRAM_TOKEN")
 if token is None:
     token = "123456:dummy"
@@ -65,12 +69,12 @@ def get_ticket_handler(message):
 
     for ticket in pending_tickets:
         try:
-            with open(ticket.pdf_path, "rb") as pdf_file:
+            with open(ticket.pdf_path, "rb") as pdf_file, track_delivery("telegram"):
                 bot.send_document(message.chat.id, pdf_file, caption="Ваш билет 🎟️")
             ticket.sent = True
             ticket.save()
-        except Exception as e:
-            print("Ошибка отправки отложенного билета:", e)
+        except Exception:
+            logger.exception("Sending pending Telegram ticket %s failed", ticket.pk)
             bot.send_message(message.chat.id, "Произошла ошибка при отправке билета. Попробуйте позже.")
 
 
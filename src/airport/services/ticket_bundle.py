@@ -0,0 +1,64 @@
+import os
+import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+
+from airport.services.convert_html_to_pdf import html_to_pdf, render_html
+from airport.services.pdf_cache import get_pdf_cache
+
+
+def build_ticket_bundle(tickets, template_name: str) -> str:
+    """
+    Render every ticket as its own PDF and pack them into a ZIP file in ``tmp``.
+
+    Tickets are streamed from the queryset and rendered concurrently through the
+    renderer pool, with at most a window of renders in flight. Finished PDFs are
+    written to the archive in order and never held in memory, so the cost stays
+    bounded for users with hundreds of tickets. Each PDF goes through the artifact
+    cache, so only changed tickets are rendered again.
+
+    Only the browser renders run in worker threads; template rendering and cache
+    bookkeeping stay on the calling thread and its database connection.
+    """
+    os.makedirs("tmp", exist_ok=True)
+    bundle_path = os.path.join("tmp", f"{uuid.uuid4().hex}.zip")
+    pdf_cache = get_pdf_cache()
+    workers = settings.PDF_RENDERER_POOL_SIZE
+    window = min(workers * 2, settings.PDF_RENDERER_QUEUE_SIZE)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor, zipfile.ZipFile(bundle_path, "w") as bundle:
+            in_flight = deque()
+
+            def write_oldest():
+                ticket_id, key, future = in_flight.popleft()
+                pdf_path = future.result()
+                if key is not None:
+                    pdf_path = pdf_cache.put(key, pdf_path, [ticket_id])
+                bundle.write(pdf_path, arcname=f"ticket-{ticket_id}.pdf")
+
+            for ticket in tickets.iterator(chunk_size=100):
+                html_string = render_html({"tickets": [ticket]}, template_name)
+                key = pdf_cache.make_key(html_string, template_name)
+                cached_path = pdf_cache.get(key)
+                if cached_path:
+                    future = Future()
+                    future.set_result(cached_path)
+                    in_flight.append((ticket.id, None, future))
+                else:
+                    in_flight.append((ticket.id, key, executor.submit(html_to_pdf, html_string)))
+
+                if len(in_flight) >= window:
+                    write_oldest()
+
+            while in_flight:
+                write_oldest()
+    except Exception:
+        if os.path.exists(bundle_path):
+            os.remove(bundle_path)
+        raise
+
+    return bundle_path
@@ -0,0 +1,227 @@
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from airport.bulk import bulk_created
+from airport.caching import bump_model_version
+from airport.models import (Airplane, AirplaneType, Airport, Crew, Flight,
+                            FlightSeat, Order, Route, Seat, Tariff, Ticket,
+                            TicketClass)
+from airport.services import connections, seat_availability, seat_map
+from airport.services.pdf_cache import get_pdf_cache
+
+
+@receiver([post_save, post_delete], sender=Ticket)
+def invalidate_ticket_pdf(sender, instance, **kwargs):
+    get_pdf_cache().invalidate_tickets([instance.id])
+
+
+@receiver([post_save, post_delete], sender=Flight)
+def invalidate_flight_ticket_pdfs(sender, instance, **kwargs):
+    ticket_ids = Ticket.objects.filter(flight_seat__flight_id=instance.id).values_list("id", flat=True)
+    get_pdf_cache().invalidate_tickets(list(ticket_ids))
+
+
+@receiver([post_save, post_delete], sender=Seat)
+def invalidate_seat_ticket_pdfs(sender, instance, **kwargs):
+    ticket_ids = Ticket.objects.filter(flight_seat__seat_id=instance.id).values_list("id", flat=True)
+    get_pdf_cache().invalidate_tickets(list(ticket_ids))
+
+
+def _previous_values(instance, *fields):
+    """
+    Load the stored values of ``fields`` before an update, None for new rows.
+    """
+    if instance._state.adding or instance.pk is None:
+        return None
+    return type(instance).objects.filter(pk=instance.pk).values_list(*fields).first()
+
+
+@receiver(pre_save, sender=Flight)
+def remember_flight_airplane(sender, instance, raw=False, **kwargs):
+    instance._previous_availability = None if raw else _previous_values(instance, "airplane_id")
+
+
+@receiver(post_save, sender=Flight)
+def update_flight_availability(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_availability", None)
+    if created or (previous and previous != (instance.airplane_id,)):
+        seat_availability.rebuild_availability([instance.id])
+
+
+@receiver(pre_save, sender=Seat)
+def remember_seat_class(sender, instance, raw=False, **kwargs):
+    instance._previous_availability = None if raw else _previous_values(instance, "airplane_id", "ticket_class_id")
+
+
+@receiver(post_save, sender=Seat)
+def update_seat_availability(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_availability", None)
+    current = (instance.airplane_id, instance.ticket_class_id)
+    if created:
+        seat_availability.adjust_total(*current, 1)
+    elif previous and previous != current:
+        seat_availability.adjust_total(*previous, -1)
+        seat_availability.adjust_total(*current, 1)
+
+
+@receiver(post_delete, sender=Seat)
+def release_seat_availability(sender, instance, **kwargs):
+    seat_availability.adjust_total(instance.airplane_id, instance.ticket_class_id, -1)
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_seat(sender, instance, raw=False, **kwargs):
+    instance._previous_availability = None if raw else _previous_values(instance, "flight_seat_id")
+
+
+@receiver(post_save, sender=Ticket)
+def update_ticket_availability(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_availability", None)
+    if created:
+        seat_availability.adjust_booked(*seat_availability.ticket_flight_and_class(instance.flight_seat_id), 1)
+    elif previous and previous != (instance.flight_seat_id,):
+        seat_availability.adjust_booked(*seat_availability.ticket_flight_and_class(previous[0]), -1)
+        seat_availability.adjust_booked(*seat_availability.ticket_flight_and_class(instance.flight_seat_id), 1)
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_availability(sender, instance, **kwargs):
+    flight_and_class = (
+        Seat.objects.filter(flight_seats__id=instance.flight_seat_id)
+        .values_list("flight_seats__flight_id", "ticket_class_id")
+        .first()
+    )
+    if flight_and_class:
+        seat_availability.adjust_booked(*flight_and_class, -1)
+
+
+@receiver(bulk_created, sender=Seat)
+def update_bulk_seat_availability(sender, instances, **kwargs):
+    airplane_ids = {seat.airplane_id for seat in instances}
+    seat_availability.rebuild_availability(
+        Flight.objects.filter(airplane_id__in=airplane_ids).values_list("id", flat=True)
+    )
+
+
+@receiver(bulk_created, sender=Flight)
+def update_bulk_flights(sender, instances, **kwargs):
+    seat_availability.rebuild_availability([flight.id for flight in instances])
+    transaction.on_commit(connections.invalidate)
+
+
+@receiver([post_save, post_delete], sender=Flight)
+def update_connection_index_flight(sender, instance, raw=False, **kwargs):
+    if not raw:
+        flight_id = instance.id
+        transaction.on_commit(lambda: connections.flight_changed(flight_id))
+
+
+@receiver([post_save, post_delete], sender=Route)
+def update_connection_index_route(sender, instance, raw=False, **kwargs):
+    if not raw:
+        route_id = instance.id
+        transaction.on_commit(lambda: connections.route_changed(route_id))
+
+
+@receiver(bulk_created, sender=Route)
+def update_connection_index_routes(sender, instances, **kwargs):
+    route_ids = [route.id for route in instances]
+
+    def refresh_routes():
+        for route_id in route_ids:
+            connections.route_changed(route_id)
+
+    transaction.on_commit(refresh_routes)
+
+
+def _mark_seat_map(flight_seat_id, occupied: bool) -> None:
+    flight_id = FlightSeat.objects.filter(pk=flight_seat_id).values_list("flight_id", flat=True).first()
+    if flight_id is not None:
+        transaction.on_commit(lambda: seat_map.mark_seats(flight_id, [flight_seat_id], occupied))
+
+
+@receiver(post_save, sender=Ticket)
+def update_seat_map_ticket(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_availability", None)
+    if created:
+        _mark_seat_map(instance.flight_seat_id, True)
+    elif previous and previous != (instance.flight_seat_id,):
+        _mark_seat_map(previous[0], False)
+        _mark_seat_map(instance.flight_seat_id, True)
+
+
+@receiver(post_delete, sender=Ticket)
+def release_seat_map_ticket(sender, instance, **kwargs):
+    _mark_seat_map(instance.flight_seat_id, False)
+
+
+@receiver([post_save, post_delete], sender=FlightSeat)
+def invalidate_seat_map_layout(sender, instance, raw=False, **kwargs):
+    if not raw:
+        flight_id = instance.flight_id
+        transaction.on_commit(lambda: seat_map.invalidate([flight_id]))
+
+
+@receiver(post_delete, sender=Flight)
+def invalidate_flight_seat_map(sender, instance, **kwargs):
+    flight_id = instance.id
+    transaction.on_commit(lambda: seat_map.invalidate([flight_id]))
+
+
+def invalidate_cached_responses(sender, raw=False, **kwargs):
+    if not raw:
+        # Bump again on commit: a response cached meanwhile may hold pre-commit data.
+        bump_model_version(sender)
+        transaction.on_commit(lambda: bump_model_version(sender))
+
+
+for model in (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    FlightSeat,
+    Order,
+    Route,
+    Seat,
+    Tariff,
+    Ticket,
+    TicketClass,
+):
+    post_save.connect(invalidate_cached_responses, sender=model, dispatch_uid=f"cached-responses-save-{model.__name__}")
+    bulk_created.connect(
+        invalidate_cached_responses, sender=model, dispatch_uid=f"cached-responses-bulk-{model.__name__}"
+    )
+    post_delete.connect(
+        invalidate_cached_responses, sender=model, dispatch_uid=f"cached-responses-delete-{model.__name__}"
+    )
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def touch_flight_crew(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        # The links are gone by post_clear, so remember whose crew is being cleared.
+        instance._cleared_flight_ids = list(Flight.objects.filter(crew=instance).values_list("id", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        flights = Flight.objects.filter(
+            pk__in=instance.__dict__.pop("_cleared_flight_ids", []) if action == "post_clear" else pk_set
+        )
+    else:
+        flights = Flight.objects.filter(pk=instance.pk)
+    flights.update(updated_at=timezone.now())
+    transaction.on_commit(lambda: bump_model_version(Flight))
@@ -0,0 +1,85 @@
+from itertools import islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline-delimited JSON: one compact JSON document per line.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        items = data if isinstance(data, list) else [data]
+        return b"".join(JSONRenderer().render(item) + b"\n" for item in items)
+
+
+class JSONStreamRenderer(JSONRenderer):
+    """
+    A JSON array written in chunks, selected with ``?format=json-stream``.
+    """
+
+    format = "json-stream"
+
+
+class StreamingListMixin:
+    """
+    Stream the list action as NDJSON or as a chunked JSON array.
+
+    With ``?format=ndjson`` or ``?format=json-stream`` the filtered queryset is
+    read with a server-side cursor (``.iterator(chunk_size=...)``), serialized one
+    chunk at a time and written through a StreamingHttpResponse, so the memory of
+    an export does not grow with the number of rows. Pagination is skipped.
+    Viewsets with a ``row_serializer`` stream ``.values()`` rows through it.
+    """
+
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [NDJSONRenderer, JSONStreamRenderer]
+    stream_chunk_size = None
+
+    def list(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, (NDJSONRenderer, JSONStreamRenderer)):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if not queryset.ordered:
+            queryset = queryset.order_by("pk")
+        chunks = self.serialize_chunks(queryset)
+        if isinstance(renderer, NDJSONRenderer):
+            content = (renderer.render(chunk) for chunk in chunks)
+        else:
+            content = self.json_array(chunks)
+        return StreamingHttpResponse(content, content_type=renderer.media_type)
+
+    def serialize_chunks(self, queryset):
+        chunk_size = self.stream_chunk_size or settings.STREAM_CHUNK_SIZE
+        row_serializer = getattr(self, "row_serializer", None)
+        if row_serializer is not None:
+            queryset = queryset.select_related(None).prefetch_related(None).values(*row_serializer.columns)
+
+        rows = queryset.iterator(chunk_size=chunk_size)
+        while chunk := list(islice(rows, chunk_size)):
+            if row_serializer is not None:
+                yield row_serializer.serialize(chunk)
+            else:
+                yield self.get_serializer(chunk, many=True).data
+
+    @staticmethod
+    def json_array(chunks):
+        """The same bytes JSONRenderer produces for the whole list."""
+        renderer = JSONRenderer()
+        yield b"["
+        separator = b""
+        for chunk in chunks:
+            if chunk:
+                yield separator + renderer.render(chunk)[1:-1]
+                separator = b","
+        yield b"]"
@@ -0,0 +1,19 @@
+from celery import shared_task
+from django.conf import settings
+
+from airport.services.seat_holds import get_hold_store
+
+
+@shared_task
+def sweep_seat_holds() -> int:
+    """
+    Drop expired seat holds from the hold indexes in batches.
+    """
+    store = get_hold_store()
+    batch = settings.SEAT_HOLD_SWEEP_BATCH
+    swept = 0
+    while True:
+        count = store.sweep(batch)
+        swept += count
+        if count < batch:
+            return swept
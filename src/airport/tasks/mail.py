@@ -1,24 +1,176 @@
-from celery import shared_task
-from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
+import logging
+from datetime import timedelta
+from smtplib import SMTPException, SMTPRecipientsRefused
 
-from config import settings
+from celery import Task, shared_task
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Max, Min, Q
+from django.utils import timezone
 
-User = get_user_model()
+from airport.metrics import track_delivery
+from airport.models import EmailCampaign, EmailCampaignChunk
+from airport.services.email_campaign import (ProviderRateLimiter,
+                                             campaign_recipients,
+                                             recipient_batches,
+                                             shard_id_ranges)
+
+logger = logging.getLogger(__name__)
+
+Status = EmailCampaign.Status
+
+WEEKLY_WISH_SUBJECT = "Команда SkyLink бажає вам чудового тижня!"
+WEEKLY_WISH_BODY = "Нехай ваш тиждень буде легким, продуктивним і наповненим удачею 🚀"
 
 
 @shared_task
 def weekly_wish_email():
-    users = User.objects.filter(is_active=True, email__isnull=False).exclude(email="")
-    for user in users:
-        try:
-            send_mail(
-                subject="Команда SkyLink бажає вам чудового тижня!",
-                message="Нехай ваш тиждень буде легким, продуктивним і наповненим удачею 🚀",
-                from_email=settings.EMAIL_HOST_USER,
-                recipient_list=[user.email],
-                fail_silently=False,
-            )
-            print(f"An email has been sent to the user {user.email}")
-        except Exception as e:
-            print(f"Error sending to {user.email}: {e}")
+    """
+    Start this week's wish campaign, or resume its unfinished chunks if it was started already.
+    """
+    year, week, _ = timezone.now().isocalendar()
+    start_email_campaign(f"weekly-wish-{year}-W{week:02d}", WEEKLY_WISH_SUBJECT, WEEKLY_WISH_BODY)
+
+
+def start_email_campaign(name: str, subject: str, body: str) -> EmailCampaign:
+    """
+    Create the campaign with one chunk per EMAIL_CAMPAIGN_CHUNK_SIZE user ids and queue the chunks.
+
+    An existing campaign of that name gets its unfinished chunks queued again;
+    chunks are checkpointed and leased, so nobody gets the message twice.
+    """
+    with transaction.atomic():
+        campaign, created = EmailCampaign.objects.get_or_create(name=name, defaults={"subject": subject, "body": body})
+        if created:
+            ids = campaign_recipients().aggregate(first=Min("id"), last=Max("id"))
+            if ids["first"] is not None:
+                EmailCampaignChunk.objects.bulk_create(
+                    EmailCampaignChunk(campaign=campaign, first_user_id=first, last_user_id=last)
+                    for first, last in shard_id_ranges(ids["first"], ids["last"], settings.EMAIL_CAMPAIGN_CHUNK_SIZE)
+                )
+        else:
+            EmailCampaign.objects.filter(pk=campaign.pk, status=Status.FAILED).update(status=Status.RUNNING)
+
+        chunk_ids = list(campaign.chunks.exclude(status=Status.DONE).values_list("id", flat=True))
+        if chunk_ids:
+            transaction.on_commit(lambda: queue_campaign_chunks(chunk_ids))
+        else:
+            finish_campaign(campaign.pk)
+    return campaign
+
+
+def queue_campaign_chunks(chunk_ids) -> None:
+    for chunk_id in chunk_ids:
+        send_campaign_chunk.delay(chunk_id)
+
+
+def finish_campaign(campaign_id) -> None:
+    if not EmailCampaignChunk.objects.filter(campaign_id=campaign_id).exclude(status=Status.DONE).exists():
+        EmailCampaign.objects.filter(pk=campaign_id).exclude(status=Status.DONE).update(
+            status=Status.DONE, finished_at=timezone.now()
+        )
+
+
+def checkpoint(chunk_id, last_sent_id: int, sent: int, failed: int, **fields) -> None:
+    """Record progress and extend the lease of the worker sending the chunk."""
+    now = timezone.now()
+    values = {
+        "last_sent_id": last_sent_id,
+        "sent": F("sent") + sent,
+        "failed": F("failed") + failed,
+        "locked_until": now + timedelta(seconds=settings.EMAIL_CAMPAIGN_LEASE),
+        "updated_at": now,
+    }
+    EmailCampaignChunk.objects.filter(pk=chunk_id).update(**{**values, **fields})
+
+
+class CampaignChunkTask(Task):
+    """
+    Keeps the status of EmailCampaignChunk in sync with Celery retries and final failures.
+
+    A chunk leased by another worker keeps the status that worker gives it.
+    """
+
+    @staticmethod
+    def unleased_chunk(chunk_id):
+        return (
+            EmailCampaignChunk.objects.filter(pk=chunk_id)
+            .exclude(status=Status.DONE)
+            .filter(Q(locked_until__isnull=True) | Q(locked_until__lt=timezone.now()))
+        )
+
+    def on_retry(self, exc, task_id, args, kwargs, einfo):
+        self.unleased_chunk(args[0]).update(status=Status.RETRYING, error=str(exc), updated_at=timezone.now())
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        chunk = self.unleased_chunk(args[0])
+        chunk.update(status=Status.FAILED, error=str(exc), locked_until=None, updated_at=timezone.now())
+        EmailCampaign.objects.filter(chunks__in=chunk).update(status=Status.FAILED)
+        logger.error("Email campaign chunk %s failed: %s", args[0], exc)
+
+
+@shared_task(
+    bind=True,
+    base=CampaignChunkTask,
+    autoretry_for=(SMTPException, OSError),
+    retry_backoff=True,
+    max_retries=5,
+    acks_late=True,
+    reject_on_worker_lost=True,
+)
+def send_campaign_chunk(self, chunk_id) -> None:
+    """
+    Send the campaign message to the users of one chunk over a single SMTP connection.
+
+    Progress is checkpointed every EMAIL_CAMPAIGN_BATCH_SIZE recipients and on
+    errors, so a retry, or a redelivery after a worker crash (the task is acked
+    late), continues after the last recipient handled. A crash can resend at
+    most one batch. Sends are paced by the rate limit of the SMTP host.
+    """
+    now = timezone.now()
+    claimed = self.unleased_chunk(chunk_id).update(
+        status=Status.RUNNING, locked_until=now + timedelta(seconds=settings.EMAIL_CAMPAIGN_LEASE), updated_at=now
+    )
+    chunk = EmailCampaignChunk.objects.select_related("campaign").get(pk=chunk_id)
+    if chunk.status == Status.DONE:
+        return
+    if not claimed:
+        # Another worker is sending the chunk; look again once its lease may have run out.
+        raise self.retry(countdown=settings.EMAIL_CAMPAIGN_LEASE)
+
+    campaign = chunk.campaign
+    limiter = ProviderRateLimiter.for_provider(settings.EMAIL_HOST)
+    last_sent_id, sent, failed = chunk.last_sent_id, 0, 0
+    try:
+        with get_connection() as connection:
+            for batch in recipient_batches(
+                chunk.first_user_id, chunk.last_user_id, chunk.last_sent_id, settings.EMAIL_CAMPAIGN_BATCH_SIZE
+            ):
+                for user_id, email in batch:
+                    limiter.wait()
+                    message = EmailMessage(
+                        subject=campaign.subject,
+                        body=campaign.body,
+                        from_email=settings.EMAIL_HOST_USER,
+                        to=[email],
+                        connection=connection,
+                    )
+                    try:
+                        with track_delivery("email"):
+                            connection.send_messages([message])
+                        sent += 1
+                    except SMTPRecipientsRefused:
+                        logger.warning("Campaign %s: %s was refused", campaign.name, email)
+                        failed += 1
+                    last_sent_id = user_id
+                checkpoint(chunk_id, last_sent_id, sent, failed)
+                sent, failed = 0, 0
+    except Exception:
+        # Keep what was sent and let the retry claim the chunk right away.
+        checkpoint(chunk_id, last_sent_id, sent, failed, locked_until=None)
+        raise
+
+    checkpoint(chunk_id, last_sent_id, 0, 0, status=Status.DONE, locked_until=None, error="")
+    logger.info("Campaign %s: users %d-%d done", campaign.name, chunk.first_user_id, chunk.last_user_id)
+    finish_campaign(campaign.pk)
@@ -0,0 +1,174 @@
+import os
+import shutil
+
+from celery import Task, chain, group, shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from airport.models import Ticket, TicketDeliveryJob
+from airport.services.convert_html_to_pdf import (html_to_pdf, render_html,
+                                                  send_pdf_to_telegram)
+from airport.services.pdf_cache import get_pdf_cache
+from airport.services.send_email import send_ticket_email
+from airport.services.ticket_bundle import build_ticket_bundle
+
+TICKET_TEMPLATE = "ticket.html"
+
+Status = TicketDeliveryJob.StageStatus
+
+
+def set_stage_status(job_id, stage: str, status: str, **fields) -> None:
+    TicketDeliveryJob.objects.filter(pk=job_id).update(
+        **{f"{stage}_status": status}, updated_at=timezone.now(), **fields
+    )
+
+
+class TicketStageTask(Task):
+    """
+    Base task for one pipeline stage.
+
+    Keeps the stage column of TicketDeliveryJob in sync with Celery retries and
+    final failures. The job id is always the last positional argument.
+    """
+
+    stage = None
+
+    def before_start(self, task_id, args, kwargs):
+        set_stage_status(args[-1], self.stage, Status.RUNNING)
+
+    def on_retry(self, exc, task_id, args, kwargs, einfo):
+        set_stage_status(args[-1], self.stage, Status.RETRYING, error=f"{self.stage}: {exc}")
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        set_stage_status(args[-1], self.stage, Status.FAILED, error=f"{self.stage}: {exc}")
+
+
+STAGE_OPTIONS = {
+    "bind": True,
+    "base": TicketStageTask,
+    "autoretry_for": (Exception,),
+    "retry_backoff": True,
+    "max_retries": 3,
+}
+
+
+def user_tickets(user, upcoming_only: bool = False):
+    tickets = Ticket.objects.filter(order__user=user).select_related(
+        "flight_seat__flight__route__source",
+        "flight_seat__flight__route__destination",
+        "flight_seat__flight",
+        "flight_seat__seat",
+        "order__user",
+        "order",
+    )
+    if upcoming_only:
+        tickets = tickets.filter(flight_seat__flight__departure_time__gte=timezone.now())
+    return tickets.order_by("id")
+
+
+def render_job_pdf(job) -> dict:
+    """
+    Render all tickets of the job's user and keep the PDF in shared storage.
+
+    Documents go into the PDF artifact cache, where a hit skips the browser
+    entirely; per-ticket ZIP bundles go to media storage. Nothing is left in the
+    worker's ``tmp``, so the next stages may run on any worker.
+    """
+    if job.mode == TicketDeliveryJob.Mode.PER_TICKET:
+        bundle_path = build_ticket_bundle(user_tickets(job.user, job.upcoming_only), TICKET_TEMPLATE)
+        return {"path": store_bundle(bundle_path, job.id), "bundle": True}
+
+    tickets = list(user_tickets(job.user, job.upcoming_only))
+    html_string = render_html(context={"tickets": tickets}, template_name=TICKET_TEMPLATE)
+    pdf_cache = get_pdf_cache()
+    key = pdf_cache.make_key(html_string, TICKET_TEMPLATE)
+
+    rendered = {"key": key, "bundle": False}
+    cached_path = pdf_cache.get(key)
+    if cached_path:
+        rendered.update(path=cached_path, cached=True)
+    else:
+        path = pdf_cache.put(key, html_to_pdf(html_string), [ticket.id for ticket in tickets])
+        rendered.update(path=path, cached=False)
+    return rendered
+
+
+@shared_task(stage="render", **STAGE_OPTIONS)
+def render_ticket_pdf(self, job_id) -> dict:
+    """
+    Render the job's tickets into a stored PDF (see render_job_pdf).
+    """
+    job = TicketDeliveryJob.objects.select_related("user").get(pk=job_id)
+    rendered = render_job_pdf(job)
+    set_stage_status(job_id, "render", Status.DONE)
+    return rendered
+
+
+def store_bundle(tmp_path: str, job_id) -> str:
+    storage_dir = os.path.join(settings.MEDIA_ROOT, "ticket_bundles")
+    os.makedirs(storage_dir, exist_ok=True)
+    bundle_path = os.path.join(storage_dir, f"{job_id}.zip")
+    shutil.move(tmp_path, bundle_path)
+    return bundle_path
+
+
+@shared_task(stage="store", **STAGE_OPTIONS)
+def store_ticket_pdf(self, rendered: dict, job_id) -> str:
+    """
+    Record the stored PDF on the job for the delivery stages.
+
+    The PDF is rendered again when it is gone by now (evicted from the cache,
+    or storage this worker does not share).
+    """
+    pdf_path = rendered["path"]
+    if not os.path.exists(pdf_path):
+        job = TicketDeliveryJob.objects.select_related("user").get(pk=job_id)
+        pdf_path = render_job_pdf(job)["path"]
+
+    set_stage_status(job_id, "store", Status.DONE, pdf_path=pdf_path)
+    return pdf_path
+
+
+def stored_pdf(job) -> str:
+    """
+    The job's stored PDF, rendered again if it was evicted or invalidated since the store stage.
+
+    A file removed between this check and the send makes the stage fail and
+    retry, which then renders it again.
+    """
+    if not os.path.exists(job.pdf_path):
+        job.pdf_path = render_job_pdf(job)["path"]
+        TicketDeliveryJob.objects.filter(pk=job.pk).update(pdf_path=job.pdf_path, updated_at=timezone.now())
+    return job.pdf_path
+
+
+@shared_task(stage="email", **STAGE_OPTIONS)
+def deliver_ticket_email(self, job_id) -> None:
+    job = TicketDeliveryJob.objects.select_related("user").get(pk=job_id)
+    if not job.user.email:
+        set_stage_status(job_id, "email", Status.SKIPPED)
+        return
+    send_ticket_email(email=job.user.email, path_file=stored_pdf(job))
+    set_stage_status(job_id, "email", Status.DONE)
+
+
+@shared_task(stage="telegram", **STAGE_OPTIONS)
+def deliver_ticket_telegram(self, job_id) -> None:
+    job = TicketDeliveryJob.objects.select_related("user").get(pk=job_id)
+    sent = send_pdf_to_telegram(job.user, stored_pdf(job))
+    set_stage_status(job_id, "telegram", Status.DONE if sent else Status.SKIPPED)
+
+
+def start_ticket_delivery(job_id) -> None:
+    """
+    Queue render -> store -> (email | Telegram) for the job.
+
+    The rendered PDF is persisted before fan-out, so a retry of one delivery
+    channel reuses it instead of rendering again.
+    """
+    job_id = str(job_id)
+    chain(
+        render_ticket_pdf.s(job_id),
+        store_ticket_pdf.s(job_id),
+        group(deliver_ticket_email.si(job_id), deliver_ticket_telegram.si(job_id)),
+    ).apply_async()
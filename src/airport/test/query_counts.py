@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+
+from airport.models import (Airplane, AirplaneType, Airport, Crew, Flight,
+                            Order, Route, Seat, Tariff, Ticket, TicketClass)
+from airport.querycount import QueryRecorder
+from airport.services.seat_inventory import generate_flight_seats
+
+
+class ConstantQueriesMixin:
+    """
+    Assertions that a request runs the same queries however many rows it returns.
+    """
+
+    def record_queries(self, request) -> QueryRecorder:
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = request()
+            if response.streaming:
+                b"".join(response.streaming_content)
+        self.assertLess(response.status_code, 300, getattr(response, "data", None))
+        return recorder
+
+    def assertConstantQueries(self, request, grow):
+        """
+        Run ``request`` before and after ``grow()`` adds rows: the query count must not change.
+
+        Repeated queries are reported too, since an N+1 shows up as one.
+        """
+        before = self.record_queries(request)
+        grow()
+        after = self.record_queries(request)
+        self.assertEqual(
+            len(before),
+            len(after),
+            f"{len(before)} queries before and {len(after)} after adding rows; repeated: {after.duplicates()}",
+        )
+        self.assertEqual(after.duplicates(), {}, "Repeated queries")
+
+
+def create_booked_flight(index: int, user=None) -> Flight:
+    """
+    A flight with crew, seat inventory and a ticket, on reference data of its own.
+    """
+    airplane_type = AirplaneType.objects.create(name=f"Type {index}")
+    airplane = Airplane.objects.create(name=f"Airplane {index}", airplane_type=airplane_type)
+    ticket_class = TicketClass.objects.create(name=f"Class {index}")
+    Tariff.objects.create(code=f"{index:02d}", name=f"Tariff {index}", ticket_class=ticket_class)
+    for row in "AB":
+        Seat.objects.create(airplane=airplane, seat=1, row=row, seat_type="standard", ticket_class=ticket_class)
+    source = Airport.objects.create(
+        name=f"Source {index}", closest_big_city="City", airport_code=f"S{index:03d}", geographical_coordinates=1.0
+    )
+    destination = Airport.objects.create(
+        name=f"Destination {index}",
+        closest_big_city="City",
+        airport_code=f"D{index:03d}",
+        geographical_coordinates=2.0,
+    )
+    route = Route.objects.create(source=source, destination=destination, distance=500, code_route=f"R{index}")
+    departure_time = datetime(2030, 1, 1) + timedelta(days=index)
+    flight = Flight.objects.create(
+        route=route, airplane=airplane, departure_time=departure_time, arrival_time=departure_time + timedelta(hours=2)
+    )
+    flight.crew.add(Crew.objects.create(first_name=f"Pilot{index}", last_name="Smith"))
+    generate_flight_seats([flight.id])
+
+    if user is None:
+        user = get_user_model().objects.create_user(
+            username=f"passenger{index}",
+            email=f"passenger{index}@example.com",
+            password="password123",
+            phone=f"+38050{index:07d}",
+        )
+    order = Order.objects.create(user=user)
+    Ticket.objects.create(flight_seat=flight.flight_seats.order_by("id").first(), order=order, price=100)
+    return flight
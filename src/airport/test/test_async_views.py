@@ -0,0 +1,179 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import (Airplane, AirplaneType, Airport, Flight, Route,
+                            TicketDeliveryJob)
+from airport.querycount import QUERY_COUNT_HEADER
+
+SEND_TICKET_URL = reverse("airport:send_ticket")
+WEEKLY_EMAIL_URL = reverse("airport:weekly_email")
+FLIGHTS_URL = reverse("airport:flight-list")
+
+
+class AsyncViewsTest(TestCase):
+    """
+    The async endpoints served through the ASGI handler.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="TestUser", email="test@example.com", password="password123", phone="+380501234567"
+        )
+        self.client = AsyncClient()
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    async def get(self, url, params=None):
+        return await self.client.get(url, params, headers=self.headers)
+
+    @mock.patch("airport.views.start_ticket_delivery")
+    async def test_send_ticket(self, start_ticket_delivery):
+        response = await self.get(SEND_TICKET_URL, {"mode": "per_ticket"})
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = await TicketDeliveryJob.objects.aget(user=self.user)
+        self.assertEqual(job.mode, TicketDeliveryJob.Mode.PER_TICKET)
+        self.assertEqual(response.json()["job_id"], str(job.id))
+        start_ticket_delivery.assert_called_once_with(job.id)
+        self.assertGreater(int(response[QUERY_COUNT_HEADER]), 0)
+
+    async def test_send_ticket_requires_authentication(self):
+        response = await self.client.get(SEND_TICKET_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_invalid_token(self):
+        response = await self.client.get(SEND_TICKET_URL, headers={"Authorization": "Bearer invalid"})
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("WWW-Authenticate", response)
+
+    async def test_invalid_params(self):
+        response = await self.get(SEND_TICKET_URL, {"mode": "unknown"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("mode", response.json())
+
+    async def test_status(self):
+        job = await TicketDeliveryJob.objects.acreate(user=self.user)
+
+        response = await self.get(reverse("airport:send_ticket_status", args=[job.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["job_id"], str(job.id))
+
+    async def test_status_of_other_user(self):
+        other = await get_user_model().objects.acreate(
+            username="other", email="other@example.com", phone="+380501234568"
+        )
+        job = await TicketDeliveryJob.objects.acreate(user=other)
+
+        response = await self.get(reverse("airport:send_ticket_status", args=[job.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_method_not_allowed(self):
+        response = await self.client.post(SEND_TICKET_URL, headers=self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    @mock.patch("airport.views.weekly_wish_email")
+    async def test_weekly_email(self, weekly_wish_email):
+        response = await self.get(WEEKLY_EMAIL_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        weekly_wish_email.delay.assert_called_once_with()
+
+
+class AsyncFlightViewsTest(TestCase):
+    """
+    The flight reads served as coroutines, and a sync action of the same viewset.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        kbp = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv", airport_code="KBP", geographical_coordinates=1
+        )
+        lhr = Airport.objects.create(
+            name="Heathrow", closest_big_city="London", airport_code="LHR", geographical_coordinates=2
+        )
+        cls.route = Route.objects.create(source=kbp, destination=lhr, distance=2100, code_route="KL1")
+        cls.airplane = Airplane.objects.create(name="A320", airplane_type=AirplaneType.objects.create(name="Jet"))
+        cls.departure_time = datetime(2030, 1, 1, 8, 0)
+        cls.flight = Flight.objects.create(
+            route=cls.route,
+            airplane=cls.airplane,
+            departure_time=cls.departure_time,
+            arrival_time=cls.departure_time + timedelta(hours=3),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = AsyncClient()
+
+    async def test_list(self):
+        response = await self.client.get(FLIGHTS_URL, {"source": "kbp"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["route"]["code_route"] for row in response.json()["results"]], ["KL1"])
+        response = await self.client.get(FLIGHTS_URL, {"source": "kbp"}, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_list_with_min_available_seats(self):
+        response = await self.client.get(FLIGHTS_URL, {"min_available_seats": 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"], [])
+
+    async def test_retrieve(self):
+        url = reverse("airport:flight-detail", args=[self.flight.id])
+        response = await self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["airplane"], "A320")
+        response = await self.client.get(url, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_retrieve_missing(self):
+        for pk in (self.flight.id + 1, "abc"):
+            response = await self.client.get(reverse("airport:flight-detail", args=[pk]))
+
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_connections(self):
+        response = await self.client.get(
+            reverse("airport:flight-connections"),
+            {
+                "source": "KBP",
+                "destination": "LHR",
+                "departure_after": self.departure_time.isoformat(),
+                "departure_before": (self.departure_time + timedelta(days=1)).isoformat(),
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 1)
+
+    async def test_sync_action(self):
+        departure_time = self.departure_time + timedelta(days=1)
+        response = await self.client.post(
+            FLIGHTS_URL,
+            {
+                "route": self.route.id,
+                "airplane": self.airplane.id,
+                "departure_time": departure_time.isoformat(),
+                "arrival_time": (departure_time + timedelta(hours=3)).isoformat(),
+                "crew": [],
+            },
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(await Flight.objects.acount(), 2)
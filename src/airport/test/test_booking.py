@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (Airplane, AirplaneType, Airport, Flight,
+                            FlightAvailability, FlightSeat, Order, Route, Seat,
+                            Ticket, TicketClass)
+from airport.services.booking import SeatConflictError, book_seats
+
+
+def book_url(flight_id):
+    return reverse("airport:flight-book", args=[flight_id])
+
+
+@override_settings(SEAT_HOLD_BACKEND="airport.services.seat_holds.LocalHoldStore")
+class BookingTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="buyer", email="buyer@user.com", password="password", phone="+380501234567"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        kbp = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv", airport_code="KBP", geographical_coordinates=1
+        )
+        lhr = Airport.objects.create(
+            name="Heathrow", closest_big_city="London", airport_code="LHR", geographical_coordinates=2
+        )
+        route = Route.objects.create(source=kbp, destination=lhr, distance=2100, code_route="KL1")
+        airplane = Airplane.objects.create(name="A320", airplane_type=AirplaneType.objects.create(name="Jet"))
+        self.economy = TicketClass.objects.create(name="Economy")
+        self.business = TicketClass.objects.create(name="Business")
+        departure_time = datetime(2030, 1, 1, 8, 0)
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=3),
+        )
+        self.other_flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time=departure_time + timedelta(days=1),
+            arrival_time=departure_time + timedelta(days=1, hours=3),
+        )
+        seats = [
+            Seat.objects.create(airplane=airplane, seat=number, row="A", ticket_class=ticket_class)
+            for number, ticket_class in [(1, self.business), (2, self.economy), (3, self.economy)]
+        ]
+        self.flight_seats = [FlightSeat.objects.create(seat=seat, flight=self.flight) for seat in seats]
+        self.foreign_seat = FlightSeat.objects.create(seat=seats[0], flight=self.other_flight)
+
+    def booked(self, ticket_class):
+        return FlightAvailability.objects.get(flight=self.flight, ticket_class=ticket_class).booked_seats
+
+    def test_book_seats(self):
+        payload = {
+            "tickets": [
+                {"flight_seat": self.flight_seats[0].id, "price": 300},
+                {"flight_seat": self.flight_seats[1].id, "price": 100},
+            ]
+        }
+        response = self.client.post(book_url(self.flight.id), payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get(pk=response.data["order_id"])
+        self.assertEqual(order.user, self.user)
+        self.assertEqual(
+            sorted(order.ticket_order.values_list("flight_seat_id", "price")),
+            [(self.flight_seats[0].id, 300), (self.flight_seats[1].id, 100)],
+        )
+        self.assertEqual(
+            [ticket["flight_seat"] for ticket in response.data["tickets"]],
+            [self.flight_seats[0].id, self.flight_seats[1].id],
+        )
+        self.assertEqual(self.booked(self.business), 1)
+        self.assertEqual(self.booked(self.economy), 1)
+
+    def test_booking_on_flight_without_counters(self):
+        # Flights inserted in bulk have no counter rows until the first booking.
+        FlightAvailability.objects.filter(flight=self.flight).delete()
+
+        book_seats(self.user, self.flight.id, {seat.id: 100 for seat in self.flight_seats})
+
+        self.assertEqual(self.booked(self.business), 1)
+        self.assertEqual(self.booked(self.economy), 2)
+
+    def test_taken_seats_conflict(self):
+        other = get_user_model().objects.create_user(
+            username="other", email="other@user.com", password="password", phone="+380501234568"
+        )
+        Ticket.objects.create(order=Order.objects.create(user=other), flight_seat=self.flight_seats[1], price=100)
+
+        response = self.client.post(
+            book_url(self.flight.id),
+            {
+                "tickets": [
+                    {"flight_seat": self.flight_seats[1].id, "price": 100},
+                    {"flight_seat": self.flight_seats[2].id, "price": 100},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["taken"], [self.flight_seats[1].id])
+        self.assertFalse(Order.objects.filter(user=self.user).exists())
+        self.assertEqual(self.booked(self.economy), 1)
+
+    def test_ticket_insert_race_reported_as_conflict(self):
+        other = get_user_model().objects.create_user(
+            username="other", email="other@user.com", password="password", phone="+380501234568"
+        )
+        Ticket.objects.create(order=Order.objects.create(user=other), flight_seat=self.flight_seats[2], price=100)
+
+        with mock.patch("airport.services.booking._booked", side_effect=[set(), {self.flight_seats[2].id}]):
+            with self.assertRaises(SeatConflictError) as error:
+                book_seats(self.user, self.flight.id, {self.flight_seats[1].id: 100, self.flight_seats[2].id: 100})
+
+        self.assertEqual(error.exception.taken, [self.flight_seats[2].id])
+        self.assertFalse(Order.objects.filter(user=self.user).exists())
+
+    def test_invalid_seats(self):
+        for tickets in (
+            [],
+            [{"flight_seat": self.foreign_seat.id, "price": 100}],
+            [{"flight_seat": self.flight_seats[0].id, "price": 100}] * 2,
+            [{"flight_seat": self.flight_seats[0].id, "price": -1}],
+        ):
+            response = self.client.post(book_url(self.flight.id), {"tickets": tickets}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_requires_authentication(self):
+        response = APIClient().post(
+            book_url(self.flight.id), {"tickets": [{"flight_seat": self.flight_seats[0].id, "price": 1}]}, format="json"
+        )
+
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+        self.assertFalse(Ticket.objects.exists())
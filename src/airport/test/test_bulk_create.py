@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (Airplane, AirplaneType, Airport, Crew, Flight,
+                            FlightAvailability, Route, Seat, TicketClass)
+
+SEATS_URL = reverse("airport:seat-list")
+ROUTES_URL = reverse("airport:route-list")
+AIRPORTS_URL = reverse("airport:airport-list")
+CREWS_URL = reverse("airport:crew-list")
+
+
+class BulkCreateTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@user.com", password="password", phone="+380501234567"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+        self.kbp = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv", airport_code="KBP", geographical_coordinates=1
+        )
+        self.lhr = Airport.objects.create(
+            name="Heathrow", closest_big_city="London", airport_code="LHR", geographical_coordinates=2
+        )
+        self.airplane = Airplane.objects.create(name="A320", airplane_type=AirplaneType.objects.create(name="Jet"))
+        self.economy = TicketClass.objects.create(name="Economy")
+        self.business = TicketClass.objects.create(name="Business")
+
+    def seat(self, number, row="A", **fields):
+        return {"airplane": self.airplane.id, "seat": number, "row": row, "ticket_class": self.economy.id, **fields}
+
+    def post(self, url, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, data, format="json")
+
+    def test_seats_created_with_constant_queries(self):
+        with self.assertNumQueries(7):
+            small = self.post(SEATS_URL, [self.seat(number) for number in range(1, 3)])
+        with self.assertNumQueries(7):
+            large = self.post(SEATS_URL, [self.seat(number, row="B") for number in range(1, 41)])
+
+        self.assertEqual(small.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(large.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(large.data), 40)
+        self.assertEqual(
+            large.data[0], {"airplane": self.airplane.id, "seat": 1, "row": "B", "ticket_class": self.economy.id}
+        )
+        self.assertEqual(Seat.objects.count(), 42)
+
+    def test_per_item_errors(self):
+        Seat.objects.create(airplane=self.airplane, seat=1, row="A", ticket_class=self.economy)
+
+        response = self.post(
+            SEATS_URL,
+            [self.seat(2), self.seat(3, ticket_class=999), self.seat(0), self.seat(2)],
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("ticket_class", response.data[1])
+        self.assertIn("seat", response.data[2])
+        self.assertEqual(response.data[3], {})
+        self.assertEqual(Seat.objects.count(), 1)
+
+    def test_unique_checked_against_list_and_database(self):
+        Seat.objects.create(airplane=self.airplane, seat=1, row="A", ticket_class=self.economy)
+
+        response = self.post(SEATS_URL, [self.seat(1), self.seat(2), self.seat(2)])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.data[0])
+        self.assertEqual(response.data[1], {})
+        self.assertIn("non_field_errors", response.data[2])
+
+    def test_seats_update_availability(self):
+        departure_time = datetime(2030, 1, 1, 8, 0)
+        route = Route.objects.create(source=self.kbp, destination=self.lhr, distance=2100, code_route="KL1")
+        flight = Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=3),
+        )
+
+        self.post(SEATS_URL, [self.seat(1), self.seat(2), self.seat(3, ticket_class=self.business.id)])
+
+        availability = dict(
+            FlightAvailability.objects.filter(flight=flight).values_list("ticket_class__name", "total_seats")
+        )
+        self.assertEqual(availability, {"Economy": 2, "Business": 1})
+
+    def test_routes(self):
+        route = {"source": self.kbp.id, "destination": self.lhr.id, "distance": 2100}
+        self.assertEqual(len(self.client.get(ROUTES_URL).data), 0)
+
+        response = self.post(ROUTES_URL, [{**route, "code_route": "KL1"}, {**route, "code_route": "KL2"}])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(self.client.get(ROUTES_URL).data), 2)
+
+        response = self.post(ROUTES_URL, [{**route, "code_route": "KL3"}, {**route, "code_route": "KL1"}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertEqual(response.data[1]["code_route"], ["This field must be unique."])
+
+    def test_airports_and_crews(self):
+        response = self.post(
+            AIRPORTS_URL,
+            [
+                {"name": "Gatwick", "closest_big_city": "London", "airport_code": "LGW", "geographical_coordinates": 3},
+                {"name": "Luton", "closest_big_city": "London", "airport_code": "LTN", "geographical_coordinates": 4},
+            ],
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Airport.objects.count(), 4)
+
+        response = self.post(CREWS_URL, [{"first_name": "John", "last_name": "Doe"}, {"first_name": "Jane"}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("last_name", response.data[1])
+        self.assertFalse(Crew.objects.exists())
+
+    def test_single_object_and_empty_list(self):
+        self.assertEqual(self.post(SEATS_URL, self.seat(1)).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.post(SEATS_URL, []).status_code, status.HTTP_400_BAD_REQUEST)
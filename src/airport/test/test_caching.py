@@ -0,0 +1,126 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Airport, Route, Tariff, TicketClass
+
+AIRPORTS_URL = reverse("airport:airport-list")
+ROUTES_URL = reverse("airport:route-list")
+TARIFFS_URL = reverse("airport:tariff-list")
+
+
+class CachedResponseTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.kbp = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv", airport_code="KBP", geographical_coordinates=1
+        )
+        self.lhr = Airport.objects.create(
+            name="Heathrow", closest_big_city="London", airport_code="LHR", geographical_coordinates=2
+        )
+
+    def create(self, model, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return model.objects.create(**fields)
+
+    def test_list_served_from_cache(self):
+        first = self.client.get(AIRPORTS_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(AIRPORTS_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=3600, LOCAL_RESPONSE_CACHE_TIMEOUT=10)
+    def test_per_process_cache_keeps_responses_briefly(self):
+        with mock.patch("airport.caching.cache.set", wraps=cache.set) as cache_set:
+            self.client.get(AIRPORTS_URL)
+
+        self.assertEqual(cache_set.call_args.args[2], 10)
+        self.assertEqual(
+            [error.id for error in run_checks(include_deployment_checks=True) if error.id == "airport.E001"],
+            ["airport.E001"],
+        )
+
+    def test_save_invalidates(self):
+        self.client.get(AIRPORTS_URL)
+        self.create(Airport, name="Gatwick", closest_big_city="London", airport_code="LGW", geographical_coordinates=3)
+
+        response = self.client.get(AIRPORTS_URL)
+
+        self.assertEqual(len(response.data), 3)
+
+    def test_delete_of_related_model_invalidates(self):
+        route = Route.objects.create(source=self.kbp, destination=self.lhr, distance=2100, code_route="KL1")
+        self.assertEqual(self.client.get(ROUTES_URL).data[0]["destination"], "Heathrow")
+
+        self.lhr.name = "London Heathrow"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lhr.save()
+
+        self.assertEqual(self.client.get(ROUTES_URL).data[0]["destination"], "London Heathrow")
+        with self.captureOnCommitCallbacks(execute=True):
+            route.delete()
+        self.assertEqual(self.client.get(ROUTES_URL).data, [])
+
+    def test_query_params_are_part_of_key(self):
+        economy = TicketClass.objects.create(name="Economy")
+        Tariff.objects.create(code="A", name="Saver", ticket_class=economy)
+        Tariff.objects.create(code="B", name="Flex", ticket_class=economy)
+
+        self.assertEqual(len(self.client.get(TARIFFS_URL).data), 2)
+        self.assertEqual(len(self.client.get(TARIFFS_URL, {"name": "flex"}).data), 1)
+
+    def test_etag_not_modified(self):
+        etag = self.client.get(AIRPORTS_URL)["ETag"]
+
+        response = self.client.get(AIRPORTS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        self.create(Airport, name="Gatwick", closest_big_city="London", airport_code="LGW", geographical_coordinates=3)
+        response = self.client.get(AIRPORTS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_etag_depends_on_negotiated_renderer(self):
+        etag = self.client.get(AIRPORTS_URL, HTTP_ACCEPT="application/json")["ETag"]
+
+        response = self.client.get(AIRPORTS_URL, HTTP_ACCEPT="text/html", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("Accept", response["Vary"])
+
+    def test_retrieve_and_errors(self):
+        url = reverse("airport:airport-detail", args=[self.kbp.id])
+        self.assertEqual(self.client.get(url).data["airport_code"], "KBP")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).data["airport_code"], "KBP")
+
+        missing = reverse("airport:airport-detail", args=[999])
+        self.assertEqual(self.client.get(missing).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_writes_are_not_cached(self):
+        admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@user.com", password="password", phone="+380501234567"
+        )
+        self.client.force_authenticate(admin)
+        self.client.get(AIRPORTS_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                AIRPORTS_URL,
+                {"name": "Gatwick", "closest_big_city": "London", "airport_code": "LGW", "geographical_coordinates": 3},
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(self.client.get(AIRPORTS_URL).data), 3)
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (Airplane, AirplaneType, Airport, Crew, Flight,
+                            FlightSeat, Route, Seat, TicketClass)
+
+FLIGHTS_URL = reverse("airport:flight-list")
+FLIGHT_SEATS_URL = reverse("airport:flightseat-list")
+
+
+class ConditionalRequestTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        kbp = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv", airport_code="KBP", geographical_coordinates=1
+        )
+        self.lhr = Airport.objects.create(
+            name="Heathrow", closest_big_city="London", airport_code="LHR", geographical_coordinates=2
+        )
+        route = Route.objects.create(source=kbp, destination=self.lhr, distance=2100, code_route="KL1")
+        airplane = Airplane.objects.create(name="A320", airplane_type=AirplaneType.objects.create(name="Jet"))
+        self.crew = Crew.objects.create(first_name="John", last_name="Doe")
+        departure_time = datetime(2030, 1, 1, 8, 0)
+        self.flights = [
+            Flight.objects.create(
+                route=route,
+                airplane=airplane,
+                departure_time=departure_time + timedelta(days=day),
+                arrival_time=departure_time + timedelta(days=day, hours=3),
+            )
+            for day in range(2)
+        ]
+        seat = Seat.objects.create(
+            airplane=airplane, seat=1, row="A", ticket_class=TicketClass.objects.create(name="Economy")
+        )
+        self.flight_seat = FlightSeat.objects.create(seat=seat, flight=self.flights[0])
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response["ETag"]
+
+    def assertNotModified(self, url, etag):
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def assertModified(self, url, etag):
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_not_modified_without_loading_rows(self):
+        etag = self.etag(FLIGHTS_URL)
+
+        # Lists are validated from the cached model versions alone.
+        with self.assertNumQueries(0):
+            self.assertNotModified(FLIGHTS_URL, etag)
+
+        detail_url = reverse("airport:flight-detail", args=[self.flights[0].id])
+        etag = self.etag(detail_url)
+        with self.assertNumQueries(1):
+            self.assertNotModified(detail_url, etag)
+
+    def test_flight_change_modifies_list_and_detail(self):
+        detail_url = reverse("airport:flight-detail", args=[self.flights[1].id])
+        list_etag, detail_etag = self.etag(FLIGHTS_URL), self.etag(detail_url)
+        seats_etag = self.etag(FLIGHT_SEATS_URL)
+
+        self.flights[0].status = Flight.Status.DELAYED
+        self.flights[0].save()
+
+        self.assertModified(FLIGHTS_URL, list_etag)
+        self.assertModified(FLIGHT_SEATS_URL, seats_etag)
+        self.assertNotModified(detail_url, detail_etag)
+
+    def test_etag_depends_on_negotiated_renderer(self):
+        json_response = self.client.get(FLIGHT_SEATS_URL, HTTP_ACCEPT="application/json")
+        ndjson_response = self.client.get(FLIGHT_SEATS_URL, HTTP_ACCEPT="application/x-ndjson")
+
+        self.assertNotEqual(json_response["ETag"], ndjson_response["ETag"])
+        self.assertIn("Accept", ndjson_response["Vary"])
+        response = self.client.get(
+            FLIGHT_SEATS_URL, HTTP_ACCEPT="application/x-ndjson", HTTP_IF_NONE_MATCH=json_response["ETag"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(FLIGHT_SEATS_URL, HTTP_IF_NONE_MATCH=json_response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn("Accept", response["Vary"])
+
+    def test_crew_change_modifies_flight(self):
+        url = reverse("airport:flight-detail", args=[self.flights[0].id])
+        Flight.objects.filter(pk=self.flights[0].pk).update(updated_at=datetime(2000, 1, 1))
+        etag = self.etag(url)
+
+        self.flights[0].crew.add(self.crew)
+
+        self.assertModified(url, etag)
+
+    def test_clearing_crew_assignments_modifies_flight(self):
+        url = reverse("airport:flight-detail", args=[self.flights[0].id])
+        self.flights[0].crew.add(self.crew)
+        Flight.objects.filter(pk=self.flights[0].pk).update(updated_at=datetime(2000, 1, 1))
+        etag = self.etag(url)
+
+        self.crew.flight_crew.clear()
+
+        self.assertModified(url, etag)
+
+    def test_embedded_reference_change_modifies_list(self):
+        etag = self.etag(FLIGHTS_URL)
+
+        self.lhr.name = "London Heathrow"
+        self.lhr.save()
+
+        self.assertModified(FLIGHTS_URL, etag)
+
+    def test_deletion_modifies_list(self):
+        etag = self.etag(FLIGHT_SEATS_URL)
+
+        self.flight_seat.delete()
+
+        self.assertModified(FLIGHT_SEATS_URL, etag)
+
+    def test_if_modified_since(self):
+        response = self.client.get(FLIGHTS_URL)
+        last_modified = response["Last-Modified"]
+
+        response = self.client.get(FLIGHTS_URL, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(FLIGHTS_URL, HTTP_IF_MODIFIED_SINCE=http_date(0))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_filters_are_part_of_validator(self):
+        etag = self.etag(FLIGHTS_URL)
+
+        self.assertModified(f"{FLIGHTS_URL}?source=KBP", etag)
@@ -0,0 +1,187 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Airplane, AirplaneType, Airport, Flight, Route
+from airport.services import connections
+from airport.services.connections import ConnectionIndex, get_connection_index
+
+CONNECTIONS_URL = reverse("airport:flight-connections")
+
+
+class ConnectionSearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.start = datetime(2030, 1, 1, 8, 0)
+        self.airports = {
+            code: Airport.objects.create(
+                name=code, closest_big_city=code, airport_code=code, geographical_coordinates=number
+            )
+            for number, code in enumerate(["KBP", "WAW", "FRA", "JFK"])
+        }
+        self.routes = {
+            (source, destination): Route.objects.create(
+                source=self.airports[source],
+                destination=self.airports[destination],
+                distance=distance,
+                code_route=f"{source}{destination}",
+            )
+            for source, destination, distance in [
+                ("KBP", "WAW", 700),
+                ("WAW", "JFK", 6900),
+                ("KBP", "FRA", 1600),
+                ("FRA", "JFK", 6200),
+                ("WAW", "FRA", 900),
+            ]
+        }
+        self.airplane = Airplane.objects.create(name="A320", airplane_type=AirplaneType.objects.create(name="Jet"))
+        get_connection_index().build()
+
+    def flight(self, source, destination, departure_hours, duration_hours, **kwargs):
+        departure_time = self.start + timedelta(hours=departure_hours)
+        with self.captureOnCommitCallbacks(execute=True):
+            return Flight.objects.create(
+                route=self.routes[(source, destination)],
+                airplane=self.airplane,
+                departure_time=departure_time,
+                arrival_time=departure_time + timedelta(hours=duration_hours),
+                **kwargs,
+            )
+
+    def search(self, **params):
+        query = {
+            "source": "KBP",
+            "destination": "JFK",
+            "departure_after": self.start.isoformat(),
+            "departure_before": (self.start + timedelta(days=1)).isoformat(),
+            **params,
+        }
+        response = self.client.get(CONNECTIONS_URL, query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [[leg["code_route"] for leg in itinerary["legs"]] for itinerary in response.data]
+
+    def test_two_leg_connections_ranked_by_duration(self):
+        self.flight("KBP", "WAW", 0, 2)
+        self.flight("WAW", "JFK", 3, 9)
+        self.flight("KBP", "FRA", 1, 3)
+        self.flight("FRA", "JFK", 5, 8)
+
+        self.assertEqual(self.search(), [["KBPWAW", "WAWJFK"], ["KBPFRA", "FRAJFK"]])
+        self.assertEqual(self.search(sort="distance"), [["KBPWAW", "WAWJFK"], ["KBPFRA", "FRAJFK"]])
+
+        response = self.client.get(
+            CONNECTIONS_URL,
+            {
+                "source": "kbp",
+                "destination": "jfk",
+                "departure_after": self.start.isoformat(),
+                "departure_before": (self.start + timedelta(days=1)).isoformat(),
+            },
+        )
+        itinerary = response.data[0]
+        self.assertEqual(itinerary["total_duration_minutes"], 12 * 60)
+        self.assertEqual(itinerary["total_distance"], 7600)
+        self.assertEqual(itinerary["layovers_minutes"], [60])
+
+    def test_layover_constraints(self):
+        self.flight("KBP", "WAW", 0, 2)
+        self.flight("WAW", "JFK", 2.5, 9)
+
+        self.assertEqual(self.search(), [])
+        self.assertEqual(self.search(min_layover=30), [["KBPWAW", "WAWJFK"]])
+        self.assertEqual(self.search(min_layover=10, max_layover=20), [])
+
+    def test_three_leg_connection_and_max_legs(self):
+        self.flight("KBP", "WAW", 0, 2)
+        self.flight("WAW", "FRA", 3, 2)
+        self.flight("FRA", "JFK", 6, 8)
+
+        self.assertEqual(self.search(), [["KBPWAW", "WAWFRA", "FRAJFK"]])
+        self.assertEqual(self.search(max_legs=2), [])
+
+    def test_first_leg_departure_window(self):
+        self.flight("KBP", "FRA", 30, 3)
+        self.flight("FRA", "JFK", 34, 8)
+
+        self.assertEqual(self.search(), [])
+        self.assertEqual(
+            self.search(departure_before=(self.start + timedelta(days=2)).isoformat()), [["KBPFRA", "FRAJFK"]]
+        )
+
+    def test_index_follows_flight_changes(self):
+        first = self.flight("KBP", "FRA", 1, 3)
+        second = self.flight("FRA", "JFK", 5, 8)
+        self.assertEqual(self.search(), [["KBPFRA", "FRAJFK"]])
+
+        second.status = Flight.Status.CANCELLED
+        with self.captureOnCommitCallbacks(execute=True):
+            second.save()
+        self.assertEqual(self.search(), [])
+
+        second.status = Flight.Status.SCHEDULED
+        second.departure_time = self.start + timedelta(hours=6)
+        with self.captureOnCommitCallbacks(execute=True):
+            second.save()
+        self.assertEqual(self.search(), [["KBPFRA", "FRAJFK"]])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self.search(), [])
+
+    def test_index_follows_route_changes(self):
+        self.flight("KBP", "WAW", 0, 2)
+        self.flight("WAW", "JFK", 3, 9)
+        route = self.routes[("WAW", "JFK")]
+
+        route.destination = self.airports["FRA"]
+        with self.captureOnCommitCallbacks(execute=True):
+            route.save()
+
+        self.assertEqual(self.search(), [])
+        self.assertEqual(self.search(destination="FRA"), [["KBPWAW", "WAWJFK"]])
+
+    def test_other_process_replays_changes(self):
+        other = ConnectionIndex()
+        other.build()
+        first = self.flight("KBP", "FRA", 1, 3)
+        second = self.flight("FRA", "JFK", 5, 8)
+
+        with mock.patch.object(other, "build", wraps=other.build) as build:
+            other.ensure_fresh()
+            self.assertEqual(set(other._legs), {first.id, second.id})
+
+            second.status = Flight.Status.CANCELLED
+            with self.captureOnCommitCallbacks(execute=True):
+                second.save()
+            other.ensure_fresh()
+            self.assertEqual(set(other._legs), {first.id})
+            build.assert_not_called()
+
+            connections.invalidate()
+            other.ensure_fresh()
+            build.assert_called_once()
+
+    def test_unknown_airport_and_invalid_params(self):
+        self.assertEqual(self.search(destination="XXX"), [])
+
+        response = self.client.get(CONNECTIONS_URL, {"source": "KBP", "destination": "JFK"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(
+            CONNECTIONS_URL,
+            {
+                "source": "KBP",
+                "destination": "JFK",
+                "departure_after": self.start.isoformat(),
+                "departure_before": (self.start + timedelta(days=1)).isoformat(),
+                "min_layover": 100,
+                "max_layover": 50,
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
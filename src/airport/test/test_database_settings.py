@@ -0,0 +1,44 @@
+from django.test import SimpleTestCase
+
+from config.database import connection_settings
+
+
+class ConnectionSettingsTest(SimpleTestCase):
+    def test_web_defaults_to_persistent_connections(self):
+        self.assertEqual(connection_settings({}), {"CONN_MAX_AGE": 60, "CONN_HEALTH_CHECKS": True, "OPTIONS": {}})
+
+    def test_celery_keeps_connections_longer(self):
+        self.assertEqual(connection_settings({"DJANGO_PROCESS_ROLE": "celery"})["CONN_MAX_AGE"], 600)
+
+    def test_asgi_defaults_to_pool(self):
+        result = connection_settings({"DJANGO_PROCESS_ROLE": "asgi"})
+
+        self.assertEqual(result["CONN_MAX_AGE"], 0)
+        self.assertEqual(
+            result["OPTIONS"]["pool"],
+            {"min_size": 2, "max_size": 10, "timeout": 10.0, "max_idle": 300.0, "max_lifetime": 3600.0},
+        )
+
+    def test_role_variable_overrides_shared_one(self):
+        environ = {
+            "DJANGO_PROCESS_ROLE": "celery",
+            "DATABASE_CONN_MAX_AGE": "30",
+            "CELERY_DATABASE_CONN_MAX_AGE": "0",
+            "DATABASE_CONN_HEALTH_CHECKS": "false",
+        }
+
+        self.assertEqual(connection_settings(environ), {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False, "OPTIONS": {}})
+        self.assertEqual(connection_settings({**environ, "DJANGO_PROCESS_ROLE": "web"})["CONN_MAX_AGE"], 30)
+
+    def test_pool_enabled_for_one_role(self):
+        environ = {"WEB_DATABASE_POOL": "true", "DATABASE_POOL_MAX_SIZE": "20", "DATABASE_CONN_MAX_AGE": "60"}
+
+        result = connection_settings(environ)
+
+        self.assertEqual(result["CONN_MAX_AGE"], 0)
+        self.assertEqual(result["OPTIONS"]["pool"]["max_size"], 20)
+        self.assertEqual(connection_settings({**environ, "DJANGO_PROCESS_ROLE": "celery"})["OPTIONS"], {})
+
+    def test_unknown_role(self):
+        with self.assertRaises(ValueError):
+            connection_settings({"DJANGO_PROCESS_ROLE": "cron"})
@@ -0,0 +1,226 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import (AsyncRequestFactory, RequestFactory, SimpleTestCase,
+                         TransactionTestCase, override_settings)
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from airport.models import (Airplane, AirplaneType, Airport, Flight,
+                            FlightSeat, Route, Seat, Tariff, Ticket,
+                            TicketClass)
+from airport.services import connections
+from config import db_router
+from config.database import replica_databases
+from config.db_router import (PIN_COOKIE, PrimaryReplicaRouter,
+                              ReplicaRoutingMiddleware, primary_reads)
+
+router = PrimaryReplicaRouter()
+
+
+def read_db(request):
+    return HttpResponse(router.db_for_read(Flight) or "default")
+
+
+def write_then_read_db(request):
+    router.db_for_write(Flight)
+    return read_db(request)
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1", "replica_2"], REPLICA_MAX_LAG_SECONDS=5)
+class PrimaryReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        db_router.reset_replica_health()
+        self.lag = mock.patch("config.db_router.replica_lag", return_value=0.0)
+        self.replica_lag = self.lag.start()
+        self.addCleanup(self.lag.stop)
+        self.factory = RequestFactory()
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertIsNone(router.db_for_read(Flight))
+        self.assertEqual(router.db_for_write(Flight), "default")
+
+    def test_safe_request_reads_from_replica(self):
+        response = ReplicaRoutingMiddleware(read_db)(self.factory.get("/"))
+
+        self.assertIn(response.content.decode(), ("replica_1", "replica_2"))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_unsafe_request_uses_primary(self):
+        response = ReplicaRoutingMiddleware(read_db)(self.factory.post("/"))
+
+        self.assertEqual(response.content, b"default")
+
+    def test_write_pins_client_to_primary(self):
+        response = ReplicaRoutingMiddleware(write_then_read_db)(self.factory.get("/"))
+
+        self.assertEqual(response.content, b"default")
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], 10)
+
+        pinned = self.factory.get("/")
+        pinned.COOKIES[PIN_COOKIE] = "1"
+        self.assertEqual(ReplicaRoutingMiddleware(read_db)(pinned).content, b"default")
+
+    @override_settings(REPLICA_LAG_CHECK_INTERVAL=60)
+    def test_lagging_replica_is_skipped(self):
+        self.replica_lag.side_effect = lambda alias: 30.0 if alias == "replica_1" else 1.0
+
+        for _ in range(3):
+            self.assertEqual(ReplicaRoutingMiddleware(read_db)(self.factory.get("/")).content, b"replica_2")
+        # Checked once per interval.
+        self.assertEqual(self.replica_lag.call_count, 2)
+
+    def test_unreachable_replicas_fall_back_to_primary(self):
+        self.replica_lag.side_effect = DatabaseError("connection refused")
+
+        with self.assertLogs("config.db_router", "WARNING"):
+            response = ReplicaRoutingMiddleware(read_db)(self.factory.get("/"))
+
+        self.assertEqual(response.content, b"default")
+
+    def test_streaming_response_reads_from_replica(self):
+        def view(request):
+            return StreamingHttpResponse(router.db_for_read(Flight) for _ in range(2))
+
+        chunks = list(ReplicaRoutingMiddleware(view)(self.factory.get("/")).streaming_content)
+
+        self.assertEqual(len(chunks), 2)
+        self.assertTrue(all(chunk in (b"replica_1", b"replica_2") for chunk in chunks))
+
+    def test_async_request_reads_from_replica(self):
+        async def view(request):
+            return await sync_to_async(read_db)(request)
+
+        async def call():
+            return await ReplicaRoutingMiddleware(view)(AsyncRequestFactory().get("/"))
+
+        response = async_to_sync(call)()
+
+        self.assertIn(response.content.decode(), ("replica_1", "replica_2"))
+
+    def test_primary_reads_block(self):
+        def view(request):
+            with primary_reads():
+                inside = router.db_for_read(Flight) or "default"
+            return HttpResponse(f"{inside} {router.db_for_read(Flight)}")
+
+        inside, after = ReplicaRoutingMiddleware(view)(self.factory.get("/")).content.decode().split()
+
+        self.assertEqual(inside, "default")
+        self.assertIn(after, ("replica_1", "replica_2"))
+
+    def test_no_migrations_on_replicas(self):
+        self.assertTrue(router.allow_migrate("default", "airport"))
+        self.assertFalse(router.allow_migrate("replica_1", "airport"))
+
+
+@override_settings(
+    DATABASE_REPLICAS=["replica_1"],
+    REPLICA_MAX_LAG_SECONDS=5,
+    SEAT_HOLD_BACKEND="airport.services.seat_holds.LocalHoldStore",
+)
+class CacheFillRoutingTest(TransactionTestCase):
+    """
+    Cache fills of a GET read from the primary while replica_1, lagging within the limit, serves the other reads.
+
+    Not a TestCase: reads inside its wrapping transaction would all go to the primary.
+    """
+
+    def setUp(self):
+        cache.clear()
+        db_router.reset_replica_health()
+        lag = mock.patch("config.db_router.replica_lag", return_value=2.0)
+        lag.start()
+        self.addCleanup(lag.stop)
+
+        self.reads = []
+        db_for_read = PrimaryReplicaRouter.db_for_read
+
+        def record_read(router, model, **hints):
+            self.reads.append((model, db_for_read(router, model, **hints)))
+            # The test database has no replica, the primary answers in its place.
+            return DEFAULT_DB_ALIAS
+
+        spy = mock.patch.object(PrimaryReplicaRouter, "db_for_read", autospec=True, side_effect=record_read)
+        spy.start()
+        self.addCleanup(spy.stop)
+        index = mock.patch.object(connections, "_index", connections.ConnectionIndex())
+        index.start()
+        self.addCleanup(index.stop)
+
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                username="reader", email="reader@user.com", password="password", phone="+380501234567"
+            )
+        )
+        kbp = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv", airport_code="KBP", geographical_coordinates=1
+        )
+        lhr = Airport.objects.create(
+            name="Heathrow", closest_big_city="London", airport_code="LHR", geographical_coordinates=2
+        )
+        route = Route.objects.create(source=kbp, destination=lhr, distance=2100, code_route="KL1")
+        airplane = Airplane.objects.create(name="A320", airplane_type=AirplaneType.objects.create(name="Jet"))
+        economy = TicketClass.objects.create(name="Economy")
+        Tariff.objects.create(code="A", name="Saver", ticket_class=economy)
+        self.departure_time = datetime(2030, 1, 1, 8, 0)
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time=self.departure_time,
+            arrival_time=self.departure_time + timedelta(hours=3),
+        )
+        FlightSeat.objects.create(
+            seat=Seat.objects.create(airplane=airplane, seat=1, row="A", ticket_class=economy), flight=self.flight
+        )
+        self.reads.clear()
+
+    def aliases(self, *models):
+        return {alias or DEFAULT_DB_ALIAS for model, alias in self.reads if model in models}
+
+    def test_response_cache_fill(self):
+        self.client.get(reverse("airport:tariff-list"))
+
+        self.assertEqual(self.aliases(Tariff), {DEFAULT_DB_ALIAS})
+
+    def test_seat_map_fill(self):
+        self.client.get(reverse("airport:flight-seat-map", args=[self.flight.id]))
+
+        self.assertEqual(self.aliases(Flight), {"replica_1"})
+        self.assertEqual(self.aliases(FlightSeat, Ticket), {DEFAULT_DB_ALIAS})
+
+    def test_connection_index_rebuild(self):
+        self.client.get(
+            reverse("airport:flight-connections"),
+            {
+                "source": "KBP",
+                "destination": "LHR",
+                "departure_after": (self.departure_time - timedelta(hours=1)).isoformat(),
+                "departure_before": (self.departure_time + timedelta(hours=1)).isoformat(),
+            },
+        )
+
+        self.assertEqual(self.aliases(Airport), {"replica_1"})
+        self.assertEqual(self.aliases(Route, Flight), {DEFAULT_DB_ALIAS})
+
+
+class ReplicaDatabasesTest(SimpleTestCase):
+    def test_replicas_from_hosts(self):
+        primary = {"ENGINE": "django.db.backends.postgresql", "HOST": "postgres", "PORT": "5432", "CONN_MAX_AGE": 60}
+
+        replicas = replica_databases(primary, {"DATABASE_REPLICA_HOSTS": "replica-a, replica-b:5433"})
+
+        self.assertEqual(list(replicas), ["replica_1", "replica_2"])
+        self.assertEqual((replicas["replica_1"]["HOST"], replicas["replica_1"]["PORT"]), ("replica-a", "5432"))
+        self.assertEqual((replicas["replica_2"]["HOST"], replicas["replica_2"]["PORT"]), ("replica-b", "5433"))
+        self.assertEqual(replicas["replica_2"]["CONN_MAX_AGE"], 60)
+        self.assertEqual(replicas["replica_2"]["TEST"], {"MIRROR": "default"})
+
+    def test_no_replicas(self):
+        self.assertEqual(replica_databases({"HOST": "postgres"}, {}), {})
@@ -0,0 +1,220 @@
+from datetime import timedelta
+from smtplib import SMTPRecipientsRefused, SMTPServerDisconnected
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import get_connection
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from airport.models import EmailCampaign, EmailCampaignChunk
+from airport.services.email_campaign import (ProviderRateLimiter,
+                                             shard_id_ranges)
+from airport.tasks.mail import (send_campaign_chunk, start_email_campaign,
+                                weekly_wish_email)
+
+Status = EmailCampaign.Status
+
+
+class FlakyBackend(EmailBackend):
+    """Drops the connection once on the third message, refuses refused@example.com."""
+
+    sent = 0
+    disconnected = False
+
+    def send_messages(self, messages):
+        for message in messages:
+            if "refused@example.com" in message.to:
+                raise SMTPRecipientsRefused({"refused@example.com": (550, b"No such user")})
+            FlakyBackend.sent += 1
+            if FlakyBackend.sent == 3 and not FlakyBackend.disconnected:
+                FlakyBackend.disconnected = True
+                raise SMTPServerDisconnected("Connection unexpectedly closed")
+        return super().send_messages(messages)
+
+
+def run_chunks_eagerly():
+    return mock.patch(
+        "airport.tasks.mail.send_campaign_chunk.delay",
+        side_effect=lambda chunk_id: send_campaign_chunk.apply(args=(chunk_id,)),
+    )
+
+
+class ShardIdRangesTest(SimpleTestCase):
+    def test_ranges_cover_ids(self):
+        self.assertEqual(shard_id_ranges(1, 10, 4), [(1, 4), (5, 8), (9, 10)])
+        self.assertEqual(shard_id_ranges(7, 7, 4), [(7, 7)])
+
+
+class FakeRedis:
+    """The counter commands the rate limiter pipelines, on a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.queued = []
+
+    def pipeline(self):
+        return self
+
+    def incr(self, key):
+        self.queued.append(lambda: self.data.update({key: self.data.get(key, 0) + 1}) or self.data[key])
+
+    def expire(self, key, seconds):
+        self.queued.append(lambda: True)
+
+    def execute(self):
+        queued, self.queued = self.queued, []
+        return [command() for command in queued]
+
+
+class ProviderRateLimiterTest(SimpleTestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.now = 1000.2
+        self.sleeps = []
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 3))
+        self.now += seconds
+
+    def test_waits_for_next_second_when_budget_is_used(self):
+        limiter = ProviderRateLimiter("smtp.example.com", 2, self.redis, clock=lambda: self.now, sleep=self.sleep)
+
+        for _ in range(3):
+            limiter.wait()
+
+        self.assertEqual(self.sleeps, [0.8])
+
+    def test_budget_is_per_provider(self):
+        for provider in ("smtp.example.com", "smtp.example.org"):
+            limiter = ProviderRateLimiter(provider, 1, self.redis, clock=lambda: self.now, sleep=self.sleep)
+            limiter.wait()
+
+        self.assertEqual(self.sleeps, [])
+
+    def test_budget_is_shared_by_workers(self):
+        workers = [
+            ProviderRateLimiter("smtp.example.com", 2, self.redis, clock=lambda: self.now, sleep=self.sleep)
+            for _ in range(3)
+        ]
+
+        for limiter in workers:
+            limiter.wait()
+
+        self.assertEqual(self.sleeps, [0.8])
+
+    @override_settings(EMAIL_PROVIDER_RATE_LIMITS={"smtp.example.com": 3}, EMAIL_DEFAULT_RATE_LIMIT=7)
+    def test_rate_from_settings(self):
+        self.assertEqual(ProviderRateLimiter.for_provider("smtp.example.com").rate, 3)
+        self.assertEqual(ProviderRateLimiter.for_provider("smtp.example.org").rate, 7)
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    EMAIL_CAMPAIGN_CHUNK_SIZE=3,
+    EMAIL_CAMPAIGN_BATCH_SIZE=2,
+    EMAIL_DEFAULT_RATE_LIMIT=0,
+    EMAIL_PROVIDER_RATE_LIMITS={},
+)
+class EmailCampaignTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        FlakyBackend.sent = 0
+        FlakyBackend.disconnected = False
+        self.users = [
+            get_user_model().objects.create_user(
+                username=f"user{number}",
+                email=f"user{number}@example.com",
+                password="password123",
+                phone=f"+38050123456{number}",
+            )
+            for number in range(7)
+        ]
+        self.users[1].is_active = False
+        self.users[1].save()
+
+    def start(self, name="campaign"):
+        with run_chunks_eagerly(), self.captureOnCommitCallbacks(execute=True):
+            return start_email_campaign(name, "Subject", "Body")
+
+    def recipients(self):
+        return sorted(address for message in mail.outbox for address in message.to)
+
+    def expected_recipients(self):
+        return sorted(user.email for user in self.users if user.is_active)
+
+    def test_sends_once_to_active_users(self):
+        with mock.patch("airport.tasks.mail.get_connection", wraps=get_connection) as connections:
+            campaign = self.start()
+
+        self.assertEqual(self.recipients(), self.expected_recipients())
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, Status.DONE)
+        self.assertIsNotNone(campaign.finished_at)
+        chunks = list(campaign.chunks.all())
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(sum(chunk.sent for chunk in chunks), 6)
+        self.assertTrue(all(chunk.status == Status.DONE for chunk in chunks))
+        # One SMTP connection per chunk.
+        self.assertEqual(connections.call_count, 3)
+
+    def test_starting_again_does_not_resend(self):
+        campaign = self.start()
+        mail.outbox.clear()
+
+        self.assertEqual(self.start(), campaign)
+        self.assertEqual(mail.outbox, [])
+
+    def test_weekly_campaign(self):
+        with run_chunks_eagerly(), self.captureOnCommitCallbacks(execute=True):
+            weekly_wish_email()
+
+        campaign = EmailCampaign.objects.get()
+        self.assertTrue(campaign.name.startswith("weekly-wish-"))
+        self.assertEqual(self.recipients(), self.expected_recipients())
+
+    @override_settings(EMAIL_BACKEND="airport.test.test_email_campaign.FlakyBackend")
+    def test_retry_resumes_after_checkpoint(self):
+        self.users[4].email = "refused@example.com"
+        self.users[4].save()
+
+        campaign = self.start()
+
+        # Each address once, although the connection dropped in the middle of a chunk.
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(len(set(self.recipients())), 5)
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, Status.DONE)
+        self.assertEqual(sum(campaign.chunks.values_list("failed", flat=True)), 1)
+
+    def test_leased_chunk_is_left_to_its_worker(self):
+        campaign = EmailCampaign.objects.create(name="campaign", subject="Subject", body="Body")
+        chunk = EmailCampaignChunk.objects.create(
+            campaign=campaign,
+            first_user_id=self.users[0].id,
+            last_user_id=self.users[-1].id,
+            status=Status.RUNNING,
+            locked_until=timezone.now() + timedelta(minutes=5),
+        )
+
+        send_campaign_chunk.apply(args=(chunk.id,))
+
+        self.assertEqual(mail.outbox, [])
+        chunk.refresh_from_db()
+        self.assertEqual(chunk.status, Status.RUNNING)
+
+    def test_chunk_resumes_from_last_sent_id(self):
+        campaign = EmailCampaign.objects.create(name="campaign", subject="Subject", body="Body")
+        chunk = EmailCampaignChunk.objects.create(
+            campaign=campaign,
+            first_user_id=self.users[0].id,
+            last_user_id=self.users[-1].id,
+            last_sent_id=self.users[3].id,
+        )
+
+        send_campaign_chunk.apply(args=(chunk.id,))
+
+        self.assertEqual(self.recipients(), sorted(user.email for user in self.users[4:]))
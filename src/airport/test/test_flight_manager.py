@@ -1,11 +1,14 @@
 from datetime import datetime, timedelta
+from io import StringIO
 
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
 
 from airport.models import (Airplane, AirplaneType, Airport, Crew, Flight,
-                            FlightSeat, Order, Route, Seat, Tariff, Ticket,
-                            TicketClass)
+                            FlightAvailability, FlightSeat, Order, Route, Seat,
+                            Tariff, Ticket, TicketClass)
 
 
 class FlightModelTest(TestCase):
@@ -116,3 +119,44 @@ class FlightModelTest(TestCase):
         flight = Flight.objects.with_available_seats().get(id=1)
         self.assertEqual(flight.booked_seats, 3)
         self.assertEqual(flight.total_seats, 4)
+
+    def test_ticket_delete_releases_seat(self):
+        self.ticket_1.delete()
+
+        flight = Flight.objects.with_available_seats().get(id=self.flight_1.id)
+        self.assertEqual(flight.booked_seats, 1)
+        self.assertEqual(flight.available_seats, 2)
+
+    def test_counters_per_ticket_class(self):
+        economy = TicketClass.objects.create(name="Economy")
+        self.seats_3.ticket_class = economy
+        self.seats_3.save()
+
+        availability = {
+            row.ticket_class_id: (row.total_seats, row.booked_seats)
+            for row in FlightAvailability.objects.filter(flight=self.flight_1)
+        }
+        self.assertEqual(availability, {self.ticket_class.id: (2, 2), economy.id: (1, 0)})
+
+    def test_airplane_change_rebuilds_counters(self):
+        other_airplane = Airplane.objects.create(name="Other Airplane", airplane_type=self.airplane_type)
+        Seat.objects.create(airplane=other_airplane, seat=1, row=1, seat_type="window", ticket_class=self.ticket_class)
+        Ticket.objects.all().delete()
+
+        self.flight_1.airplane = other_airplane
+        self.flight_1.save()
+
+        flight = Flight.objects.with_available_seats().get(id=self.flight_1.id)
+        self.assertEqual(flight.total_seats, 1)
+        self.assertEqual(flight.booked_seats, 0)
+
+    def test_rebuild_command_repairs_counters(self):
+        FlightAvailability.objects.update(booked_seats=0)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_seat_availability", "--verify", stdout=StringIO())
+        call_command("rebuild_seat_availability", stdout=StringIO())
+        call_command("rebuild_seat_availability", "--verify", stdout=StringIO())
+
+        flight = Flight.objects.with_available_seats().get(id=self.flight_1.id)
+        self.assertEqual(flight.booked_seats, 2)
@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (Airplane, AirplaneType, Airport, Flight,
+                            FlightSeat, Order, Route, Seat, Ticket,
+                            TicketClass)
+
+FLIGHTS_URL = reverse("airport:flight-list")
+
+
+@override_settings(SEAT_HOLD_BACKEND="airport.services.seat_holds.LocalHoldStore")
+class FlightSearchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.start = datetime(2030, 1, 1, 8, 0)
+        self._create_flights()
+
+    def _create_flights(self):
+        kbp = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv", airport_code="KBP", geographical_coordinates=1
+        )
+        lhr = Airport.objects.create(
+            name="Heathrow", closest_big_city="London", airport_code="LHR", geographical_coordinates=2
+        )
+        jfk = Airport.objects.create(
+            name="John F. Kennedy", closest_big_city="New York", airport_code="JFK", geographical_coordinates=3
+        )
+        self.kbp_lhr = Route.objects.create(source=kbp, destination=lhr, distance=2100, code_route="KL1")
+        self.lhr_jfk = Route.objects.create(source=lhr, destination=jfk, distance=5500, code_route="LJ1")
+
+        self.jet = Airplane.objects.create(name="Boeing 737", airplane_type=AirplaneType.objects.create(name="Jet"))
+        self.cargo = Airplane.objects.create(name="An-124", airplane_type=AirplaneType.objects.create(name="Cargo"))
+        ticket_class = TicketClass.objects.create(name="Economy")
+        self.seats = [
+            Seat.objects.create(airplane=self.jet, seat=number, row="A", ticket_class=ticket_class) for number in (1, 2)
+        ]
+
+        self.flights = []
+        for day in range(5):
+            departure_time = self.start + timedelta(days=day)
+            self.flights.append(
+                Flight.objects.create(
+                    route=self.kbp_lhr if day % 2 == 0 else self.lhr_jfk,
+                    airplane=self.jet if day < 4 else self.cargo,
+                    departure_time=departure_time,
+                    arrival_time=departure_time + timedelta(hours=3),
+                    status=Flight.Status.DELAYED if day == 3 else Flight.Status.SCHEDULED,
+                )
+            )
+
+        user = get_user_model().objects.create_user(email="user@user.com", password="password", phone="+380501234567")
+        order = Order.objects.create(user=user)
+        flight_seat = FlightSeat.objects.create(seat=self.seats[0], flight=self.flights[0])
+        Ticket.objects.create(order=order, price=100, flight_seat=flight_seat)
+
+    def departures(self, response):
+        return [flight["departure_time"] for flight in response.data["results"]]
+
+    def expected(self, *days):
+        return [self.flights[day].departure_time.isoformat() for day in days]
+
+    def test_flights_ordered_by_departure(self):
+        response = self.client.get(FLIGHTS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.departures(response), self.expected(0, 1, 2, 3, 4))
+        self.assertIsNone(response.data["next"])
+
+    def test_filter_by_airport_codes(self):
+        response = self.client.get(FLIGHTS_URL, {"source": "kbp", "destination": "LHR"})
+
+        self.assertEqual(self.departures(response), self.expected(0, 2, 4))
+
+    def test_filter_by_departure_window(self):
+        response = self.client.get(
+            FLIGHTS_URL,
+            {
+                "departure_after": (self.start + timedelta(days=1)).isoformat(),
+                "departure_before": (self.start + timedelta(days=3)).isoformat(),
+            },
+        )
+
+        self.assertEqual(self.departures(response), self.expected(1, 2))
+
+    def test_filter_by_status_and_airplane_type(self):
+        response = self.client.get(FLIGHTS_URL, {"status": Flight.Status.DELAYED})
+        self.assertEqual(self.departures(response), self.expected(3))
+
+        response = self.client.get(FLIGHTS_URL, {"airplane_type": "cargo"})
+        self.assertEqual(self.departures(response), self.expected(4))
+
+    def test_filter_by_min_available_seats(self):
+        response = self.client.get(FLIGHTS_URL, {"min_available_seats": 2})
+
+        self.assertEqual(self.departures(response), self.expected(1, 2, 3))
+
+    def test_invalid_departure_window(self):
+        response = self.client.get(
+            FLIGHTS_URL,
+            {"departure_after": self.start.isoformat(), "departure_before": self.start.isoformat()},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_keyset_pagination(self):
+        Flight.objects.filter(pk=self.flights[2].pk).update(departure_time=self.flights[1].departure_time)
+        seen = []
+        url, params = FLIGHTS_URL, {"page_size": 2}
+        while url:
+            response = self.client.get(url, params)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            seen.extend(self.departures(response))
+            url, params = response.data["next"], None
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen, sorted(seen))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(FLIGHTS_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,52 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count
+from django.test import TestCase
+
+from airport.benchmarks import dataset, rolled_back
+from airport.models import (Airport, Flight, FlightAvailability, FlightSeat,
+                            Route, Seat, Ticket)
+from airport.services.seat_availability import verify_availability
+
+
+class GenerateDatasetTest(TestCase):
+    def generate(self, *args):
+        call_command("generate_dataset", "--flights", "40", "--batch-size", "15", *args, stdout=StringIO())
+
+    def snapshot(self) -> list:
+        return list(
+            Flight.objects.order_by("departure_time", "route__code_route", "airplane__name", "status")
+            .annotate(tickets=Count("flight_seats__ticket_flight"), seats=Count("flight_seats", distinct=True))
+            .values_list("route__code_route", "airplane__name", "departure_time", "status", "tickets", "seats")
+        )
+
+    def test_generate(self):
+        self.generate("--seed", "7")
+
+        self.assertEqual(Flight.objects.count(), 40)
+        self.assertEqual(Airport.objects.count(), dataset.AIRPORTS_PER_SCALE)
+        self.assertEqual(
+            FlightSeat.objects.count(), Seat.objects.filter(airplane__flight_airplane__isnull=False).count()
+        )
+        self.assertEqual(verify_availability(), [])
+        self.assertTrue(FlightAvailability.objects.exists())
+        self.assertFalse(Ticket.objects.filter(flight_seat__flight__status=Flight.Status.CANCELLED).exists())
+
+        load_factor = Ticket.objects.count() / FlightSeat.objects.count()
+        self.assertTrue(0.5 < load_factor < 0.9, load_factor)
+        hub_routes = Route.objects.filter(source__in=Airport.objects.order_by("id")[:2]).values("id")
+        self.assertGreater(Flight.objects.filter(route__in=hub_routes).count(), 0)
+
+        with self.assertRaises(CommandError):
+            self.generate()
+
+    def test_deterministic(self):
+        with rolled_back():
+            self.generate("--seed", "3")
+            first = self.snapshot()
+
+        self.generate("--seed", "3")
+
+        self.assertEqual(self.snapshot(), first)
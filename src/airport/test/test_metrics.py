@@ -0,0 +1,162 @@
+import os
+import tempfile
+from unittest import mock
+
+from celery import shared_task
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+from airport import metrics
+from airport.tasks.mail import send_campaign_chunk, weekly_wish_email
+
+METRICS_URL = reverse("metrics")
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@shared_task
+def failing_task():
+    raise RuntimeError("boom")
+
+
+class MetricsViewTest(TestCase):
+    def test_exposes_metrics(self):
+        response = self.client.get(METRICS_URL)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"airport_http_request_duration_seconds", response.content)
+        self.assertIn(b"airport_celery_task_duration_seconds", response.content)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_token(self):
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 403)
+        self.assertEqual(self.client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer secret").status_code, 200)
+
+    def test_multiprocess_registry(self):
+        with tempfile.TemporaryDirectory() as directory, mock.patch.dict(
+            os.environ, {metrics.MULTIPROC_DIR_ENV: directory}
+        ):
+            self.assertIsNot(metrics.get_registry(), REGISTRY)
+            self.assertEqual(self.client.get(METRICS_URL).status_code, 200)
+
+
+class RequestMetricsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                username="user", email="user@example.com", password="password123", phone="+380501234567"
+            )
+        )
+
+    def test_request_observed_by_view(self):
+        labels = {"view": "airport:ticket-list", "method": "GET"}
+        requests = sample("airport_http_request_duration_seconds_count", status="200", **labels)
+        queries = sample("airport_http_request_db_queries_sum", **labels)
+
+        self.client.get(reverse("airport:ticket-list"))
+
+        self.assertEqual(sample("airport_http_request_duration_seconds_count", status="200", **labels), requests + 1)
+        self.assertGreater(sample("airport_http_request_db_queries_sum", **labels), queries)
+
+    def test_unmatched_path(self):
+        labels = {"view": "unmatched", "method": "GET", "status": "404"}
+        before = sample("airport_http_request_duration_seconds_count", **labels)
+
+        self.client.get("/no-such-page/")
+
+        self.assertEqual(sample("airport_http_request_duration_seconds_count", **labels), before + 1)
+
+
+class DatabasePoolMetricsTest(TestCase):
+    def test_pool_stats_are_exported(self):
+        stats = {
+            "pool_max": 10,
+            "pool_size": 4,
+            "pool_available": 1,
+            "requests_waiting": 2,
+            "requests_num": 7,
+            "requests_queued": 3,
+            "requests_wait_ms": 1500,
+        }
+        pool = mock.Mock()
+        # Like the real pool, counters are reset once popped (the view and the middleware both read them).
+        pool.pop_stats.side_effect = iter([stats] + [{**stats, "requests_num": 0, "requests_wait_ms": 0}] * 2)
+        requests = sample("airport_db_pool_requests_total", alias="default")
+        waited = sample("airport_db_pool_wait_seconds_total", alias="default")
+
+        with mock.patch.object(connection, "_connection_pools", {"default": pool}, create=True):
+            self.client.get(METRICS_URL)
+
+        self.assertEqual(sample("airport_db_pool_connections", alias="default"), 4)
+        self.assertEqual(sample("airport_db_pool_available_connections", alias="default"), 1)
+        self.assertEqual(sample("airport_db_pool_waiting_requests", alias="default"), 2)
+        self.assertEqual(sample("airport_db_pool_requests_total", alias="default"), requests + 7)
+        self.assertEqual(sample("airport_db_pool_wait_seconds_total", alias="default"), waited + 1.5)
+
+    def test_without_pool(self):
+        metrics.observe_db_pools()
+
+
+class TaskMetricsTest(TestCase):
+    def test_success_and_failure(self):
+        name = weekly_wish_email.name
+        succeeded = sample("airport_celery_task_duration_seconds_count", task=name, state="SUCCESS")
+
+        weekly_wish_email.apply()
+
+        self.assertEqual(
+            sample("airport_celery_task_duration_seconds_count", task=name, state="SUCCESS"), succeeded + 1
+        )
+
+        failures = sample("airport_celery_task_failures_total", task=failing_task.name, exception="RuntimeError")
+        failing_task.apply()
+        self.assertEqual(
+            sample("airport_celery_task_failures_total", task=failing_task.name, exception="RuntimeError"),
+            failures + 1,
+        )
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    EMAIL_DEFAULT_RATE_LIMIT=0,
+    EMAIL_PROVIDER_RATE_LIMITS={},
+)
+class DeliveryMetricsTest(TestCase):
+    def setUp(self):
+        get_user_model().objects.create_user(
+            username="user", email="user@example.com", password="password123", phone="+380501234567"
+        )
+
+    def weekly_wish_email(self):
+        with mock.patch(
+            "airport.tasks.mail.send_campaign_chunk.delay",
+            side_effect=lambda chunk_id: send_campaign_chunk.apply(args=(chunk_id,)),
+        ), self.captureOnCommitCallbacks(execute=True):
+            weekly_wish_email()
+
+    def test_weekly_email(self):
+        sent = sample("airport_delivery_duration_seconds_count", channel="email")
+
+        self.weekly_wish_email()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(sample("airport_delivery_duration_seconds_count", channel="email"), sent + 1)
+
+    def test_weekly_email_error_is_logged_and_counted(self):
+        errors = sample("airport_delivery_errors_total", channel="email")
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=OSError("SMTP down")
+        ), self.assertLogs("airport.tasks.mail", "ERROR") as logs:
+            self.weekly_wish_email()
+
+        self.assertGreater(sample("airport_delivery_errors_total", channel="email"), errors)
+        self.assertIn("SMTP down", logs.output[-1])
@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from airport.services.pdf_cache import PdfArtifactCache, asset_version
+from user.models import PendingTelegramTicket
+
+
+class PdfArtifactCacheTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.addCleanup(cache.clear)
+        self.pdf_cache = PdfArtifactCache(directory=os.path.join(self.directory, "cache"), max_bytes=25)
+
+    def make_pdf(self, name, size=10):
+        path = os.path.join(self.directory, name)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        return path
+
+    def test_key_depends_on_html(self):
+        first = self.pdf_cache.make_key("<p>1</p>", "ticket.html")
+        second = self.pdf_cache.make_key("<p>2</p>", "ticket.html")
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(first, self.pdf_cache.make_key("<p>1</p>", "ticket.html"))
+
+    def test_asset_version_computed_once(self):
+        asset_version.cache_clear()
+        self.addCleanup(asset_version.cache_clear)
+
+        with mock.patch("airport.services.pdf_cache.os.stat", wraps=os.stat) as stat:
+            self.pdf_cache.make_key("<p>1</p>", "ticket.html")
+            calls = stat.call_count
+            self.pdf_cache.make_key("<p>2</p>", "ticket.html")
+
+        self.assertGreater(calls, 0)
+        self.assertEqual(stat.call_count, calls)
+
+    def test_put_and_get(self):
+        self.assertIsNone(self.pdf_cache.get("a"))
+
+        path = self.pdf_cache.put("a", self.make_pdf("a.pdf"))
+
+        self.assertEqual(self.pdf_cache.get("a"), path)
+        self.assertTrue(os.path.exists(path))
+
+    def test_least_recently_used_evicted(self):
+        self.pdf_cache.put("a", self.make_pdf("a.pdf"))
+        self.pdf_cache.put("b", self.make_pdf("b.pdf"))
+        os.utime(self.pdf_cache.path_for("a"), (1, 1))
+        os.utime(self.pdf_cache.path_for("b"), (2, 2))
+        self.pdf_cache.get("a")
+
+        self.pdf_cache.put("c", self.make_pdf("c.pdf"))
+
+        self.assertIsNotNone(self.pdf_cache.get("a"))
+        self.assertIsNone(self.pdf_cache.get("b"))
+        self.assertIsNotNone(self.pdf_cache.get("c"))
+
+    def test_pending_telegram_artifact_not_evicted(self):
+        user = get_user_model().objects.create_user(
+            username="TestUser", email="test@example.com", password="password123", phone="+380501234567"
+        )
+        pinned = self.pdf_cache.put("a", self.make_pdf("a.pdf"))
+        os.utime(pinned, (1, 1))
+        PendingTelegramTicket.objects.create(user=user, pdf_path=pinned)
+        self.pdf_cache.put("b", self.make_pdf("b.pdf"))
+
+        self.pdf_cache.put("c", self.make_pdf("c.pdf"))
+
+        self.assertIsNotNone(self.pdf_cache.get("a"))
+        self.assertIsNone(self.pdf_cache.get("b"))
+
+    def test_invalidate_tickets(self):
+        self.pdf_cache.put("a", self.make_pdf("a.pdf"), ticket_ids=[1, 2])
+        self.pdf_cache.put("b", self.make_pdf("b.pdf"), ticket_ids=[3])
+
+        self.assertEqual(self.pdf_cache.invalidate_tickets([2]), 1)
+
+        self.assertIsNone(self.pdf_cache.get("a"))
+        self.assertIsNotNone(self.pdf_cache.get("b"))
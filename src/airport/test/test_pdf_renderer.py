@@ -0,0 +1,111 @@
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from airport.services.pdf_renderer import (PdfRendererBusy, PdfRendererPool,
+                                           PdfRenderError, _RenderJob)
+
+
+class FakeSession:
+    def __init__(self, fail=False, block=None):
+        self.renders = 0
+        self.closed = False
+        self.fail = fail
+        self.block = block
+        self.healthy = True
+        self.timeouts = []
+
+    def render(self, html_path, pdf_path, timeout):
+        self.timeouts.append(timeout)
+        if self.block is not None and not self.block.wait(timeout):
+            # What Playwright does once its timeout is spent.
+            raise TimeoutError(f"Timeout {timeout * 1000:.0f}ms exceeded")
+        if self.fail:
+            raise RuntimeError("browser crashed")
+        self.renders += 1
+
+    def close(self):
+        self.closed = True
+
+
+class PdfRendererPoolTest(SimpleTestCase):
+    def make_pool(self, sessions, **kwargs):
+        options = {"size": 1, "queue_size": 5, "render_timeout": 5, "max_renders": 100}
+        options.update(kwargs)
+        pool = PdfRendererPool(**options)
+        patcher = mock.patch.object(pool, "_launch", side_effect=sessions)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_render_reuses_warm_browser(self):
+        session = FakeSession()
+        pool = self.make_pool([session])
+
+        self.assertEqual(pool.render("a.html", "a.pdf"), "a.pdf")
+        self.assertEqual(pool.render("b.html", "b.pdf"), "b.pdf")
+
+        self.assertEqual(session.renders, 2)
+        self.assertEqual(pool.metrics()["renders"], 2)
+        self.assertIsNotNone(pool.metrics()["latency"]["p50"])
+
+    def test_browser_recycled_after_max_renders(self):
+        first, second = FakeSession(), FakeSession()
+        pool = self.make_pool([first, second], max_renders=1)
+
+        pool.render("a.html", "a.pdf")
+        pool.render("b.html", "b.pdf")
+
+        self.assertTrue(first.closed)
+        self.assertEqual(second.renders, 1)
+        self.assertEqual(pool.stats.recycles, 2)
+
+    def test_crashed_browser_is_replaced(self):
+        broken, healthy = FakeSession(fail=True), FakeSession()
+        pool = self.make_pool([broken, healthy])
+
+        with self.assertRaises(PdfRenderError):
+            pool.render("a.html", "a.pdf")
+        self.assertEqual(pool.render("b.html", "b.pdf"), "b.pdf")
+
+        self.assertTrue(broken.closed)
+        self.assertEqual(pool.stats.failures, 1)
+
+    def test_full_queue_rejects_render(self):
+        block = threading.Event()
+        pool = self.make_pool([FakeSession(block=block)], queue_size=1, render_timeout=0.2)
+        self.addCleanup(block.set)
+
+        with self.assertRaises(PdfRenderError):
+            pool.render("a.html", "a.pdf")
+        pool._queue.put_nowait(_RenderJob("b.html", "b.pdf", deadline=time.monotonic() - 1))
+        with self.assertRaises(PdfRendererBusy):
+            pool.render("c.html", "c.pdf")
+        self.assertEqual(pool.stats.rejected, 1)
+
+    def test_timed_out_render_releases_its_worker(self):
+        hung, fresh = FakeSession(block=threading.Event()), FakeSession()
+        pool = self.make_pool([hung, fresh], render_timeout=0.2)
+
+        with self.assertRaises(PdfRenderError):
+            pool.render("a.html", "a.pdf")
+        # The single worker is free again and runs the next render in a new browser.
+        self.assertEqual(pool.render("b.html", "b.pdf"), "b.pdf")
+
+        self.assertLessEqual(hung.timeouts[0], 0.2)
+        self.assertTrue(hung.closed)
+        self.assertEqual(fresh.renders, 1)
+
+    def test_job_expired_in_queue_is_not_rendered(self):
+        session = FakeSession()
+        pool = self.make_pool([session], render_timeout=0.2)
+        job = _RenderJob("a.html", "a.pdf", deadline=time.monotonic() - 1)
+        pool._queue.put_nowait(job)
+        pool.start()
+
+        with self.assertRaises(PdfRenderError):
+            job.future.result(timeout=1)
+        self.assertEqual(session.timeouts, [])
@@ -0,0 +1,132 @@
+import logging
+from itertools import count
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from airport import querycount
+from airport.models import Ticket
+from airport.streaming import StreamingListMixin
+from airport.test.query_counts import (ConstantQueriesMixin,
+                                       create_booked_flight)
+from airport.urls import router
+
+
+class FingerprintTest(TestCase):
+    def test_in_and_values_lists(self):
+        self.assertEqual(
+            querycount.fingerprint('SELECT "id" FROM "seat" WHERE "id" IN (%s, %s, %s)'),
+            'SELECT "id" FROM "seat" WHERE "id" IN (...)',
+        )
+        self.assertEqual(
+            querycount.fingerprint('INSERT INTO "crew" ("a", "b") VALUES (%s, %s), (%s, %s)'),
+            'INSERT INTO "crew" ("a", "b") VALUES (...)',
+        )
+
+
+@override_settings(SEAT_HOLD_BACKEND="airport.services.seat_holds.LocalHoldStore")
+@mock.patch.object(APIView, "get_throttles", return_value=[])
+class RouterQueryCountTest(ConstantQueriesMixin, TestCase):
+    """
+    Every list of the router, and every GET action of its detail routes, runs a
+    fixed number of queries whatever the number of rows.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.admin = get_user_model().objects.create_user(
+            username="admin", email="admin@example.com", password="password123", phone="+380501234567", is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.index = count(1)
+        self.grow()
+
+    def grow(self):
+        cache.clear()
+        create_booked_flight(next(self.index), user=self.admin)
+
+    def get(self, url, params=None):
+        def request():
+            cache.clear()
+            return self.client.get(url, params)
+
+        return request
+
+    def test_lists(self, _):
+        for prefix, viewset, basename in router.registry:
+            formats = [None]
+            if issubclass(viewset, StreamingListMixin):
+                formats += ["ndjson", "json-stream"]
+            for format in formats:
+                with self.subTest(prefix, format=format):
+                    params = {"format": format} if format else None
+                    self.assertConstantQueries(self.get(reverse(f"airport:{basename}-list"), params), self.grow)
+
+    def test_detail_actions(self, _):
+        for prefix, viewset, basename in router.registry:
+            pk = viewset.queryset.model.objects.order_by("pk").values_list("pk", flat=True).first()
+            url_names = ["detail"] + [
+                action.url_name for action in viewset.get_extra_actions() if action.detail and "get" in action.mapping
+            ]
+            for url_name in url_names:
+                with self.subTest(prefix, action=url_name):
+                    self.assertConstantQueries(
+                        self.get(reverse(f"airport:{basename}-{url_name}", args=[pk])), self.grow
+                    )
+
+    def test_send_ticket(self, _):
+        with mock.patch("airport.views.start_ticket_delivery"):
+            self.assertConstantQueries(self.get(reverse("airport:send_ticket")), self.grow)
+
+
+@override_settings(QUERY_COUNT_ENABLED=True, QUERY_COUNT_DUPLICATE_THRESHOLD=2)
+@mock.patch.object(APIView, "get_throttles", return_value=[])
+class QueryCountMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        querycount.reset_endpoint_stats()
+        self.user = get_user_model().objects.create_user(
+            username="user", email="user@example.com", password="password123", phone="+380501234568"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_headers_and_stats(self, _):
+        create_booked_flight(1, user=self.user)
+
+        response = self.client.get(reverse("airport:ticket-list"))
+
+        self.assertGreater(int(response[querycount.QUERY_COUNT_HEADER]), 0)
+        self.assertEqual(response[querycount.DUPLICATE_QUERIES_HEADER], "0")
+        stats = querycount.endpoint_stats()["GET airport:ticket-list"]
+        self.assertEqual(stats["requests"], 1)
+        self.assertEqual(stats["queries"], int(response[querycount.QUERY_COUNT_HEADER]))
+
+    def test_streaming_response(self, _):
+        create_booked_flight(1, user=self.user)
+
+        response = self.client.get(reverse("airport:ticket-list"), {"format": "ndjson"})
+        self.assertNotIn(querycount.QUERY_COUNT_HEADER, response)
+        b"".join(response.streaming_content)
+
+        self.assertGreater(querycount.endpoint_stats()["GET airport:ticket-list"]["queries"], 0)
+
+    def test_logs_repeated_queries(self, _):
+        for index in (1, 2):
+            create_booked_flight(index, user=self.user)
+
+        # Without select_related("order") every ticket loads its order.
+        with (
+            mock.patch("airport.views.TicketViewSet.queryset", Ticket.objects.all()),
+            self.assertLogs(querycount.logger, logging.WARNING) as logs,
+        ):
+            response = self.client.get(reverse("airport:ticket-list"))
+
+        self.assertGreater(int(response[querycount.DUPLICATE_QUERIES_HEADER]), 0)
+        self.assertIn("GET airport:ticket-list ran the same query", logs.output[0])
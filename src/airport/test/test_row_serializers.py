@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from airport.benchmarks.serializers import create_flights
+from airport.models import (Airplane, AirplaneType, Airport, Crew, Flight,
+                            FlightSeat, Route, Seat, TicketClass)
+from airport.row_serializers import (FlightRowSerializer,
+                                     FlightSeatRowSerializer)
+from airport.serializers import (FlightListRetrieveSerializer,
+                                 FlightSeatListRetrieveSerializer)
+
+FLIGHTS_URL = reverse("airport:flight-list")
+FLIGHT_SEATS_URL = reverse("airport:flightseat-list")
+
+
+def render(data) -> bytes:
+    return JSONRenderer().render(data)
+
+
+class RowSerializerTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        kbp = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv", airport_code="KBP", geographical_coordinates=1
+        )
+        lhr = Airport.objects.create(
+            name="Heathrow", closest_big_city="London", airport_code="LHR", geographical_coordinates=2
+        )
+        route = Route.objects.create(source=kbp, destination=lhr, distance=2100, code_route="KL1")
+        airplane = Airplane.objects.create(name="A320", airplane_type=AirplaneType.objects.create(name="Jet"))
+        crew = [Crew.objects.create(first_name=name, last_name="Doe") for name in ("John", "Jane")]
+        departure_time = datetime(2030, 1, 1, 8, 0)
+        self.flights = []
+        for index, flight_status in enumerate([1, 2, 3, 4]):
+            flight = Flight.objects.create(
+                route=route,
+                airplane=airplane,
+                departure_time=departure_time + timedelta(days=index),
+                arrival_time=departure_time + timedelta(days=index, hours=3, minutes=25 * index),
+                status=flight_status,
+            )
+            flight.crew.set(crew[: index % 3])
+            self.flights.append(flight)
+        seat = Seat.objects.create(
+            airplane=airplane, seat=1, row="A", ticket_class=TicketClass.objects.create(name="Economy")
+        )
+        for flight in self.flights:
+            FlightSeat.objects.create(seat=seat, flight=flight)
+
+    def test_flight_rows_match_serializer(self):
+        rows = FlightRowSerializer()
+        queryset = Flight.objects.order_by("id")
+
+        expected = FlightListRetrieveSerializer(queryset, many=True).data
+        with self.assertNumQueries(2):
+            actual = rows.serialize(list(queryset.values(*rows.columns)))
+
+        self.assertEqual(render(actual), render(expected))
+
+    def test_flight_seat_rows_match_serializer(self):
+        rows = FlightSeatRowSerializer()
+        queryset = FlightSeat.objects.order_by("id")
+
+        expected = FlightSeatListRetrieveSerializer(queryset, many=True).data
+        actual = rows.serialize(list(queryset.values(*rows.columns)))
+
+        self.assertEqual(render(actual), render(expected))
+
+    def test_flight_list_endpoint(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(FLIGHTS_URL, {"page_size": 3})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = FlightListRetrieveSerializer(self.flights[:3], many=True).data
+        self.assertEqual(render(response.data["results"]), render(expected))
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["status"], "COMPLETED")
+
+    def test_flight_seat_list_endpoint(self):
+        response = self.client.get(FLIGHT_SEATS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = FlightSeatListRetrieveSerializer(FlightSeat.objects.order_by("id"), many=True).data
+        self.assertEqual(render(response.data), render(expected))
+
+
+class BenchmarkDatasetTest(TestCase):
+    def test_row_serializers_match_on_benchmark_dataset(self):
+        create_flights(25)
+
+        rows = FlightSeatRowSerializer()
+        queryset = FlightSeat.objects.order_by("id")
+        self.assertEqual(
+            render(rows.serialize(list(queryset.values(*rows.columns)))),
+            render(FlightSeatListRetrieveSerializer(queryset, many=True).data),
+        )
@@ -0,0 +1,99 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from airport.benchmarks import api
+from airport.models import Flight, Ticket
+
+
+def results(p95_ms, queries):
+    return {"scales": {"1": {"cases": {"flights": {"p95_ms": p95_ms, "queries": queries}}}}}
+
+
+class CompareTest(TestCase):
+    def test_within_threshold(self):
+        self.assertEqual(api.compare(results(11.0, 3), results(10.0, 3), threshold=0.2), [])
+
+    def test_slower(self):
+        self.assertEqual(
+            api.compare(results(13.0, 3), results(10.0, 3), threshold=0.2),
+            ["scale 1 flights: p95 10.0 ms -> 13.0 ms"],
+        )
+
+    def test_more_queries(self):
+        self.assertEqual(
+            api.compare(results(10.0, 4), results(10.0, 3), threshold=0.2), ["scale 1 flights: queries 3 -> 4"]
+        )
+
+    def test_throughput_drop(self):
+        current = {"scales": {"1": {"cases": {}, "throughput": {"flights": {"wsgi_rps": 100.0, "asgi_rps": 70.0}}}}}
+        baseline = {"scales": {"1": {"cases": {}, "throughput": {"flights": {"wsgi_rps": 100.0, "asgi_rps": 100.0}}}}}
+
+        self.assertEqual(api.compare(current, baseline, threshold=0.2), ["scale 1 flights: asgi_rps 100.0 -> 70.0"])
+
+    def test_missing_baseline_case(self):
+        self.assertEqual(api.compare(results(10.0, 3), {"scales": {}}, threshold=0.2), [])
+
+    def test_percentile(self):
+        self.assertEqual(api.percentile(range(1, 101), 95), 95)
+        self.assertEqual(api.percentile([4.0], 99), 4.0)
+
+
+class RunBenchmarksTest(TestCase):
+    def run_benchmarks(self, *args):
+        call_command(
+            "run_benchmarks",
+            "--flights-per-scale",
+            "20",
+            "--iterations",
+            "2",
+            *args,
+            stdout=StringIO(),
+            stderr=StringIO()
+        )
+
+    def test_run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / "results.json"
+            self.run_benchmarks("--output", str(output))
+
+            measured = json.loads(output.read_text())
+            cases = measured["scales"]["1"]["cases"]
+            self.assertEqual(
+                set(cases),
+                {
+                    "flights",
+                    "flights-filtered",
+                    "flight-seats",
+                    "tickets",
+                    "with-available-seats",
+                    "book",
+                    "send-ticket",
+                },
+            )
+            self.assertEqual(measured["scales"]["1"]["dataset"]["flights"], 20)
+            self.assertEqual(
+                set(measured["scales"]["1"]["throughput"]), {"send-ticket", "send-ticket-status", "flights"}
+            )
+            for metrics in measured["scales"]["1"]["throughput"].values():
+                self.assertGreater(metrics["wsgi_rps"], 0)
+                self.assertGreater(metrics["asgi_rps"], 0)
+            for metrics in cases.values():
+                self.assertLessEqual(metrics["p50_ms"], metrics["p99_ms"])
+                self.assertGreater(metrics["queries"], 0)
+
+            # Every scale runs in a transaction that is rolled back.
+            self.assertFalse(Flight.objects.exists())
+            self.assertFalse(Ticket.objects.exists())
+
+            baseline = json.loads(output.read_text())
+            for metrics in baseline["scales"]["1"]["cases"].values():
+                metrics["queries"] = 0
+            output.write_text(json.dumps(baseline))
+            with self.assertRaises(CommandError):
+                self.run_benchmarks("--compare", str(output))
@@ -0,0 +1,132 @@
+import csv
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from airport.models import (Airplane, AirplaneType, Airport, Crew, Flight,
+                            FlightAvailability, FlightSeat, Route, Seat,
+                            TicketClass)
+from airport.services.schedule_import import COLUMNS
+
+
+class ImportScheduleTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "schedule.csv"
+
+        for code in ("KBP", "LHR", "CDG"):
+            Airport.objects.create(name=code, closest_big_city=code, airport_code=code, geographical_coordinates=1)
+        self.airplane = Airplane.objects.create(name="A320", airplane_type=AirplaneType.objects.create(name="Jet"))
+        economy = TicketClass.objects.create(name="Economy")
+        for number in (1, 2):
+            Seat.objects.create(airplane=self.airplane, seat=number, row="A", ticket_class=economy)
+        self.pilot = Crew.objects.create(first_name="John", last_name="Doe")
+
+    def write(self, rows):
+        with self.path.open("w", newline="") as schedule:
+            writer = csv.DictWriter(schedule, fieldnames=COLUMNS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(dict(zip(COLUMNS, row)))
+
+    def run_import(self, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command("import_schedule", str(self.path), *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import(self):
+        self.write(
+            [
+                ("KL1", "kbp", "LHR", 2100, "A320", "2030-01-01T08:00", "2030-01-01T11:00", "", "John Doe;Jane Roe"),
+                ("KL1", "KBP", "LHR", 2100, "A320", "2030-01-02T08:00", "2030-01-02T11:00", "DELAYED", "Jane Roe"),
+                ("KL2", "LHR", "CDG", 350, "A320", "2030-01-02T12:00", "2030-01-02T13:00", 4, ""),
+            ]
+        )
+
+        stdout, stderr = self.run_import("--chunk-size", "2")
+
+        self.assertIn("3 rows: 3 flights created", stdout)
+        self.assertEqual(stderr, "")
+        self.assertEqual(sorted(Route.objects.values_list("code_route", flat=True)), ["KL1", "KL2"])
+        flights = list(Flight.objects.order_by("departure_time"))
+        self.assertEqual([flight.status for flight in flights], [1, 3, 4])
+        self.assertEqual(
+            [sorted(flight.crew.values_list("first_name", flat=True)) for flight in flights],
+            [["Jane", "John"], ["Jane"], []],
+        )
+        self.assertEqual(Crew.objects.count(), 2)
+        self.assertIn(self.pilot, flights[0].crew.all())
+        self.assertEqual(FlightSeat.objects.count(), 6)
+        self.assertEqual(set(FlightAvailability.objects.values_list("total_seats", flat=True)), {2})
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        self.write(
+            [
+                ("KL1", "KBP", "XXX", 2100, "A320", "2030-01-01T08:00", "2030-01-01T11:00", "", ""),
+                ("KL2", "KBP", "LHR", 2100, "B737", "2030-01-01T08:00", "2030-01-01T11:00", "", ""),
+                ("KL3", "KBP", "LHR", 2100, "A320", "2030-01-01T08:00", "2030-01-01T07:00", "", ""),
+                ("KL4", "KBP", "LHR", 2100, "A320", "2030-01-01T08:00", "2030-01-01T11:00", "", ""),
+            ]
+        )
+
+        stdout, stderr = self.run_import()
+
+        self.assertIn("Line 2: Unknown airport 'XXX'", stderr)
+        self.assertIn("Line 3: Unknown airplane 'B737'", stderr)
+        self.assertIn("Line 4: arrival_time must be after departure_time", stderr)
+        self.assertIn("1 flights created", stdout)
+        self.assertEqual(list(Route.objects.values_list("code_route", flat=True)), ["KL4"])
+
+    def test_resume_from_checkpoint(self):
+        rows = [
+            ("KL1", "KBP", "LHR", 2100, "A320", f"2030-01-0{day}T08:00", f"2030-01-0{day}T11:00", "", "")
+            for day in range(1, 6)
+        ]
+        self.write(rows)
+        checkpoint = Path(f"{self.path}.checkpoint")
+        checkpoint.write_text(
+            json.dumps(
+                {
+                    "source": str(self.path.resolve()),
+                    "size": self.path.stat().st_size,
+                    "rows": 3,
+                    "created": 3,
+                    "duplicates": 0,
+                    "errors": 0,
+                }
+            )
+        )
+
+        stdout, _ = self.run_import("--resume")
+
+        self.assertIn("Resuming after 3 rows", stdout)
+        self.assertEqual(Flight.objects.count(), 2)
+        self.assertEqual(json.loads(checkpoint.read_text())["rows"], 5)
+
+        self.write(rows + [rows[0]])
+        with self.assertRaises(CommandError):
+            self.run_import("--resume")
+
+    def test_reimport_skips_existing_flights(self):
+        self.write([("KL1", "KBP", "LHR", 2100, "A320", "2030-01-01T08:00", "2030-01-01T11:00", "", "John Doe")])
+        self.run_import()
+
+        stdout, _ = self.run_import()
+
+        self.assertIn("0 flights created, 1 already present", stdout)
+        self.assertEqual(Flight.objects.count(), 1)
+
+    def test_parquet_requires_pyarrow(self):
+        parquet = self.path.with_suffix(".parquet")
+        parquet.write_bytes(b"PAR1")
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            with self.assertRaisesMessage(CommandError, "pyarrow"):
+                call_command("import_schedule", str(parquet), stdout=StringIO())
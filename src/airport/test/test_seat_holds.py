@@ -0,0 +1,181 @@
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (Airplane, AirplaneType, Airport, Flight,
+                            FlightSeat, Order, Route, Seat, Ticket,
+                            TicketClass)
+from airport.services.seat_holds import HoldStore, get_hold_store
+from airport.tasks.holds import sweep_seat_holds
+
+
+def hold_url(flight_id):
+    return reverse("airport:flight-hold", args=[flight_id])
+
+
+def availability_url(flight_id):
+    return reverse("airport:flight-availability", args=[flight_id])
+
+
+def confirm_url(hold_id):
+    return reverse("airport:seat_hold_confirm", args=[hold_id])
+
+
+def detail_url(hold_id):
+    return reverse("airport:seat_hold_detail", args=[hold_id])
+
+
+FLIGHTS_URL = reverse("airport:flight-list")
+
+
+@override_settings(SEAT_HOLD_BACKEND="airport.services.seat_holds.LocalHoldStore", SEAT_HOLD_TTL=600)
+class SeatHoldTest(TestCase):
+    def setUp(self):
+        get_hold_store().clear()
+        self.user = get_user_model().objects.create_user(
+            username="buyer", email="buyer@user.com", password="password", phone="+380501234567"
+        )
+        self.other = get_user_model().objects.create_user(
+            username="other", email="other@user.com", password="password", phone="+380501234568"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.other_client = APIClient()
+        self.other_client.force_authenticate(self.other)
+
+        kbp = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv", airport_code="KBP", geographical_coordinates=1
+        )
+        lhr = Airport.objects.create(
+            name="Heathrow", closest_big_city="London", airport_code="LHR", geographical_coordinates=2
+        )
+        route = Route.objects.create(source=kbp, destination=lhr, distance=2100, code_route="KL1")
+        airplane = Airplane.objects.create(name="A320", airplane_type=AirplaneType.objects.create(name="Jet"))
+        economy = TicketClass.objects.create(name="Economy")
+        departure_time = datetime(2030, 1, 1, 8, 0)
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=3),
+        )
+        self.flight_seats = [
+            FlightSeat.objects.create(
+                seat=Seat.objects.create(airplane=airplane, seat=number, row="A", ticket_class=economy),
+                flight=self.flight,
+            )
+            for number in (1, 2, 3)
+        ]
+
+    def payload(self, *indexes):
+        return {"tickets": [{"flight_seat": self.flight_seats[index].id, "price": 100} for index in indexes]}
+
+    def hold(self, *indexes, client=None):
+        return (client or self.client).post(hold_url(self.flight.id), self.payload(*indexes), format="json")
+
+    def availability(self):
+        response = self.client.get(availability_url(self.flight.id))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {key: response.data[0][key] for key in ("total_seats", "booked_seats", "held_seats", "available_seats")}
+
+    def test_hold_and_confirm(self):
+        response = self.hold(0, 1)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        hold_id = response.data["hold_id"]
+        self.assertEqual(response.data["flight_seats"], [self.flight_seats[0].id, self.flight_seats[1].id])
+        self.assertEqual(
+            self.availability(), {"total_seats": 3, "booked_seats": 0, "held_seats": 2, "available_seats": 1}
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(confirm_url(hold_id))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get(pk=response.data["order_id"])
+        self.assertEqual(order.ticket_order.count(), 2)
+        self.assertIsNone(get_hold_store().get(hold_id))
+        self.assertEqual(
+            self.availability(), {"total_seats": 3, "booked_seats": 2, "held_seats": 0, "available_seats": 1}
+        )
+
+    def test_held_seats_are_taken_for_others(self):
+        self.hold(0)
+
+        response = self.hold(0, 1, client=self.other_client)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["taken"], [self.flight_seats[0].id])
+
+        response = self.other_client.post(
+            reverse("airport:flight-book", args=[self.flight.id]), self.payload(0), format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Ticket.objects.exists())
+
+        self.assertEqual(self.hold(1, client=self.other_client).status_code, status.HTTP_201_CREATED)
+
+    def test_booked_seats_cannot_be_held(self):
+        Ticket.objects.create(order=Order.objects.create(user=self.other), flight_seat=self.flight_seats[2], price=1)
+
+        response = self.hold(2)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["taken"], [self.flight_seats[2].id])
+
+    def test_release_hold(self):
+        hold_id = self.hold(0).data["hold_id"]
+
+        self.assertEqual(self.other_client.delete(detail_url(hold_id)).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(detail_url(hold_id)).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.delete(detail_url(hold_id)).status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertEqual(self.hold(0, client=self.other_client).status_code, status.HTTP_201_CREATED)
+
+    def test_expired_hold(self):
+        hold_id = self.hold(0).data["hold_id"]
+        later = time.time() + 601
+
+        with mock.patch("airport.services.seat_holds.time.time", return_value=later):
+            self.assertEqual(self.client.post(confirm_url(hold_id)).status_code, status.HTTP_404_NOT_FOUND)
+            self.assertEqual(self.availability()["held_seats"], 0)
+            self.assertEqual(sweep_seat_holds(), 1)
+            self.assertEqual(self.hold(0, client=self.other_client).status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(sweep_seat_holds(), 0)
+
+    def test_min_available_seats_subtracts_holds(self):
+        departure_time = self.flight.departure_time + timedelta(days=1)
+        later = Flight.objects.create(
+            route=self.flight.route,
+            airplane=self.flight.airplane,
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=3),
+        )
+        hold_id = self.hold(0, 1).data["hold_id"]
+        self.assertEqual(get_hold_store().held_per_flight([self.flight.id, later.id]), {self.flight.id: 2})
+
+        # Holds are read for the flights of the page only.
+        with mock.patch.object(type(get_hold_store()), "held_per_flight", autospec=True, return_value={}) as held:
+            self.client.get(FLIGHTS_URL, {"min_available_seats": 2, "page_size": 1})
+        self.assertEqual(held.call_args.args[1], [self.flight.id])
+
+        response = self.client.get(FLIGHTS_URL, {"min_available_seats": 2})
+        self.assertEqual([row["departure_time"] for row in response.data["results"]], [departure_time.isoformat()])
+        self.assertNotIn("ETag", response)
+        self.assertEqual(len(self.client.get(FLIGHTS_URL, {"min_available_seats": 1}).data["results"]), 2)
+
+        self.client.delete(detail_url(hold_id))
+        self.assertEqual(len(self.client.get(FLIGHTS_URL, {"min_available_seats": 2}).data["results"]), 2)
+
+    def test_hold_store_must_implement_every_method(self):
+        class PartialHoldStore(HoldStore):
+            def hold(self, user_id, flight_id, seats, prices, ttl):
+                pass
+
+        with self.assertRaises(TypeError):
+            PartialHoldStore()
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (Airplane, AirplaneType, Airport, Crew, Flight,
+                            FlightAvailability, FlightSeat, Order, Route, Seat,
+                            Ticket, TicketClass)
+
+FLIGHTS_URL = reverse("airport:flight-list")
+REGENERATE_URL = reverse("airport:flight-regenerate-seats")
+
+
+class SeatInventoryTest(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@user.com", password="password", phone="+380501234567"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        kbp = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv", airport_code="KBP", geographical_coordinates=1
+        )
+        lhr = Airport.objects.create(
+            name="Heathrow", closest_big_city="London", airport_code="LHR", geographical_coordinates=2
+        )
+        self.route = Route.objects.create(source=kbp, destination=lhr, distance=2100, code_route="KL1")
+        airplane_type = AirplaneType.objects.create(name="Jet")
+        self.small = Airplane.objects.create(name="Small", airplane_type=airplane_type)
+        self.large = Airplane.objects.create(name="Large", airplane_type=airplane_type)
+        self.economy = TicketClass.objects.create(name="Economy")
+        for airplane, count in ((self.small, 2), (self.large, 4)):
+            for number in range(1, count + 1):
+                Seat.objects.create(airplane=airplane, seat=number, row="A", ticket_class=self.economy)
+        self.crew = Crew.objects.create(first_name="John", last_name="Doe")
+        self.departure_time = datetime(2030, 1, 1, 8, 0)
+
+    def create_flight(self, airplane):
+        response = self.client.post(
+            FLIGHTS_URL,
+            {
+                "route": self.route.id,
+                "airplane": airplane.id,
+                "departure_time": self.departure_time.isoformat(),
+                "arrival_time": (self.departure_time + timedelta(hours=3)).isoformat(),
+                "crew": [self.crew.id],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Flight.objects.latest("id")
+
+    def seat_airplanes(self, flight):
+        return set(FlightSeat.objects.filter(flight=flight).values_list("seat__airplane_id", flat=True))
+
+    def test_flight_creation_generates_seats(self):
+        flight = self.create_flight(self.small)
+
+        self.assertEqual(FlightSeat.objects.filter(flight=flight).count(), 2)
+        self.assertEqual(self.seat_airplanes(flight), {self.small.id})
+
+    def test_regenerate_after_airplane_swap(self):
+        flight = self.create_flight(self.small)
+
+        response = self.client.post(REGENERATE_URL, {"flights": [flight.id], "airplane": self.large.id}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"flights": 1, "created": 4, "removed": 2})
+        flight.refresh_from_db()
+        self.assertEqual(flight.airplane, self.large)
+        self.assertEqual(self.seat_airplanes(flight), {self.large.id})
+        self.assertEqual(FlightAvailability.objects.get(flight=flight).total_seats, 4)
+
+    def test_regenerate_fills_missing_seats(self):
+        flight = self.create_flight(self.small)
+        FlightSeat.objects.filter(flight=flight).first().delete()
+
+        response = self.client.post(REGENERATE_URL, {"flights": [flight.id]}, format="json")
+
+        self.assertEqual(response.data, {"flights": 1, "created": 1, "removed": 0})
+        self.assertEqual(FlightSeat.objects.filter(flight=flight).count(), 2)
+
+    def test_regenerate_keeps_ticketed_seats(self):
+        flight = self.create_flight(self.small)
+        flight_seat = FlightSeat.objects.filter(flight=flight).first()
+        Ticket.objects.create(order=Order.objects.create(user=self.admin), flight_seat=flight_seat, price=10)
+
+        response = self.client.post(REGENERATE_URL, {"flights": [flight.id], "airplane": self.large.id}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["flight_seats"], [flight_seat.id])
+        flight.refresh_from_db()
+        self.assertEqual(flight.airplane, self.small)
+
+    def test_regenerate_validation_and_permissions(self):
+        response = self.client.post(REGENERATE_URL, {"flights": [999]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        user = get_user_model().objects.create_user(
+            username="user", email="user@user.com", password="password", phone="+380501234568"
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post(REGENERATE_URL, {"flights": [999]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_flight_seat_clean(self):
+        flight = self.create_flight(self.small)
+        foreign_seat = Seat.objects.filter(airplane=self.large).first()
+
+        with self.assertNumQueries(1):
+            with self.assertRaises(ValidationError):
+                FlightSeat(seat_id=foreign_seat.id, flight_id=flight.id).clean()
+
+        own_seat = Seat.objects.filter(airplane=self.small).first()
+        with self.assertNumQueries(0):
+            FlightSeat(seat=own_seat, flight=flight).clean()
@@ -0,0 +1,190 @@
+from base64 import b64decode
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (Airplane, AirplaneType, Airport, Flight,
+                            FlightSeat, Order, Route, Seat, Ticket,
+                            TicketClass)
+from airport.services import seat_map
+from airport.services.seat_holds import get_hold_store
+from airport.services.seat_map import BITMAP_KEY, encode_bitmap
+
+
+def seat_map_url(flight_id):
+    return reverse("airport:flight-seat-map", args=[flight_id])
+
+
+class FakeRedis:
+    """The few Redis commands the seat map uses, on a dict."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def setbit(self, key, offset, value):
+        bitmap = bytearray(self.data[key])
+        bitmap[offset // 8] = bitmap[offset // 8] & ~(0x80 >> (offset % 8)) | (value << (7 - offset % 8))
+        self.data[key] = bytes(bitmap)
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+
+@override_settings(SEAT_HOLD_BACKEND="airport.services.seat_holds.LocalHoldStore")
+class SeatMapTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_hold_store().clear()
+        self.user = get_user_model().objects.create_user(
+            username="buyer", email="buyer@user.com", password="password", phone="+380501234567"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        kbp = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv", airport_code="KBP", geographical_coordinates=1
+        )
+        lhr = Airport.objects.create(
+            name="Heathrow", closest_big_city="London", airport_code="LHR", geographical_coordinates=2
+        )
+        route = Route.objects.create(source=kbp, destination=lhr, distance=2100, code_route="KL1")
+        self.airplane = Airplane.objects.create(name="A320", airplane_type=AirplaneType.objects.create(name="Jet"))
+        self.economy = TicketClass.objects.create(name="Economy")
+        departure_time = datetime(2030, 1, 1, 8, 0)
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=3),
+        )
+        # Created out of order: the map lists seats by row and number.
+        self.flight_seats = {}
+        for row, number in [("B", 1), ("A", 2), ("A", 1)]:
+            seat = Seat.objects.create(
+                airplane=self.airplane, seat=number, row=row, seat_type="window", ticket_class=self.economy
+            )
+            self.flight_seats[f"{row}{number}"] = FlightSeat.objects.create(seat=seat, flight=self.flight)
+
+    def seat_map(self):
+        response = self.client.get(seat_map_url(self.flight.id))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def book(self, name):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Ticket.objects.create(
+                order=Order.objects.create(user=self.user), flight_seat=self.flight_seats[name], price=100
+            )
+
+    def test_layout_and_occupancy(self):
+        self.book("A2")
+
+        data = self.seat_map()
+
+        self.assertEqual([(seat["row"], seat["seat"]) for seat in data["seats"]], [("A", 1), ("A", 2), ("B", 1)])
+        self.assertEqual(data["seats"][0]["ticket_class"], "Economy")
+        self.assertEqual(b64decode(data["occupancy"]), encode_bitmap([1], 3))
+        self.assertEqual(data["free_seats"], 2)
+
+    def test_bitmap_updated_incrementally(self):
+        self.seat_map()
+        ticket = self.book("B1")
+
+        with self.assertNumQueries(1):
+            data = self.seat_map()
+        self.assertEqual(b64decode(data["occupancy"]), encode_bitmap([2], 3))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.delete()
+        self.assertEqual(b64decode(self.seat_map()["occupancy"]), encode_bitmap([], 3))
+
+    def test_booking_endpoint_marks_seats(self):
+        self.seat_map()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("airport:flight-book", args=[self.flight.id]),
+                {"tickets": [{"flight_seat": self.flight_seats[name].id, "price": 10} for name in ("A1", "B1")]},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        data = self.seat_map()
+        self.assertEqual(b64decode(data["occupancy"]), encode_bitmap([0, 2], 3))
+        self.assertEqual(data["free_seats"], 1)
+
+    def test_booking_during_fill_is_not_lost(self):
+        load_bitmap = seat_map._load_bitmap
+
+        def load_then_book(flight_id, layout):
+            bitmap = load_bitmap(flight_id, layout)
+            if not Ticket.objects.exists():
+                self.book("B1")
+            return bitmap
+
+        with mock.patch("airport.services.seat_map._load_bitmap", side_effect=load_then_book):
+            self.assertEqual(b64decode(self.seat_map()["occupancy"]), encode_bitmap([2], 3))
+        self.assertEqual(b64decode(self.seat_map()["occupancy"]), encode_bitmap([2], 3))
+
+    @override_settings(CACHE_REDIS_URL="redis://cache:6379/0")
+    def test_bitmap_kept_in_redis(self):
+        redis_client = FakeRedis()
+        with (
+            mock.patch("airport.services.seat_map.RedisCache", LocMemCache),
+            mock.patch("airport.services.seat_map._redis_connection", return_value=redis_client) as connection,
+        ):
+            self.seat_map()
+            self.book("B1")
+            data = self.seat_map()
+
+        connection.assert_called_with("redis://cache:6379/0")
+        self.assertEqual(b64decode(data["occupancy"]), encode_bitmap([2], 3))
+        key = BITMAP_KEY.format(self.flight.id)
+        self.assertEqual(redis_client.data[cache.make_key(key)], encode_bitmap([2], 3))
+        self.assertIsNone(cache.get(key))
+
+    def test_held_seats(self):
+        self.seat_map()
+        self.client.post(
+            reverse("airport:flight-hold", args=[self.flight.id]),
+            {"tickets": [{"flight_seat": self.flight_seats["A1"].id, "price": 10}]},
+            format="json",
+        )
+
+        data = self.seat_map()
+        self.assertEqual(b64decode(data["held"]), encode_bitmap([0], 3))
+        self.assertEqual(data["free_seats"], 2)
+
+    def test_new_flight_seat_invalidates_layout(self):
+        self.assertEqual(len(self.seat_map()["seats"]), 3)
+        seat = Seat.objects.create(airplane=self.airplane, seat=1, row="C", ticket_class=self.economy)
+        with self.captureOnCommitCallbacks(execute=True):
+            FlightSeat.objects.create(seat=seat, flight=self.flight)
+
+        self.assertEqual(len(self.seat_map()["seats"]), 4)
+
+    def test_unknown_flight(self):
+        response = self.client.get(seat_map_url(999))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
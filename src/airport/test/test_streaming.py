@@ -0,0 +1,81 @@
+import json
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (Airplane, AirplaneType, Airport, Crew, Flight,
+                            FlightSeat, Order, Route, Seat, Ticket,
+                            TicketClass)
+
+TICKETS_URL = reverse("airport:ticket-list")
+ORDERS_URL = reverse("airport:order-list")
+FLIGHT_SEATS_URL = reverse("airport:flightseat-list")
+
+
+@override_settings(STREAM_CHUNK_SIZE=2)
+class StreamingListTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="buyer", email="buyer@user.com", password="password", phone="+380501234567"
+        )
+        kbp = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv", airport_code="KBP", geographical_coordinates=1
+        )
+        lhr = Airport.objects.create(
+            name="Heathrow", closest_big_city="London", airport_code="LHR", geographical_coordinates=2
+        )
+        route = Route.objects.create(source=kbp, destination=lhr, distance=2100, code_route="KL1")
+        airplane = Airplane.objects.create(name="A320", airplane_type=AirplaneType.objects.create(name="Jet"))
+        departure_time = datetime(2030, 1, 1, 8, 0)
+        flight = Flight.objects.create(
+            route=route, airplane=airplane, departure_time=departure_time, arrival_time=departure_time + timedelta(2)
+        )
+        flight.crew.add(Crew.objects.create(first_name="John", last_name="Doe"))
+        economy = TicketClass.objects.create(name="Economy")
+        for number in range(1, 6):
+            seat = Seat.objects.create(airplane=airplane, seat=number, row="A", ticket_class=economy)
+            flight_seat = FlightSeat.objects.create(seat=seat, flight=flight)
+            Ticket.objects.create(order=Order.objects.create(user=self.user), flight_seat=flight_seat, price=number)
+
+    def stream(self, url, stream_format):
+        response = self.client.get(url, {"format": stream_format})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content)
+
+    def test_ndjson(self):
+        response, content = self.stream(TICKETS_URL, "ndjson")
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = content.decode().splitlines()
+        self.assertEqual([json.loads(line)["price"] for line in lines], [1.0, 2.0, 3.0, 4.0, 5.0])
+
+    def test_json_stream_matches_list(self):
+        for url in (TICKETS_URL, ORDERS_URL, FLIGHT_SEATS_URL):
+            with self.subTest(url=url):
+                expected = self.client.get(url, {"format": "json"}).content
+
+                response, content = self.stream(url, "json-stream")
+
+                self.assertEqual(response["Content-Type"], "application/json")
+                self.assertEqual(content, expected)
+
+    def test_reads_with_iterator_chunks(self):
+        # One cursor over the rows and a crew query per chunk of 2 flight seats.
+        with self.assertNumQueries(1):
+            self.stream(TICKETS_URL, "ndjson")
+        with self.assertNumQueries(4):
+            self.stream(FLIGHT_SEATS_URL, "ndjson")
+
+    def test_empty_stream(self):
+        Ticket.objects.all().delete()
+
+        self.assertEqual(self.stream(TICKETS_URL, "json-stream")[1], b"[]")
+        self.assertEqual(self.stream(TICKETS_URL, "ndjson")[1], b"")
@@ -0,0 +1,238 @@
+import os
+import shutil
+import tempfile
+import uuid
+import zipfile
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (Airplane, AirplaneType, Airport, Flight,
+                            FlightSeat, Order, Route, Seat, Ticket,
+                            TicketClass, TicketDeliveryJob)
+from airport.services.pdf_cache import PdfArtifactCache
+from airport.services.ticket_bundle import build_ticket_bundle
+from airport.tasks.tickets import (deliver_ticket_email,
+                                   deliver_ticket_telegram, render_ticket_pdf,
+                                   store_ticket_pdf, user_tickets)
+
+SEND_TICKET_URL = reverse("airport:send_ticket")
+
+
+class SendTicketViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="TestUser", email="test@example.com", password="password123", phone="+380501234567"
+        )
+        self.client.force_authenticate(self.user)
+
+    @mock.patch("airport.views.start_ticket_delivery")
+    def test_send_ticket_queues_job(self, start_ticket_delivery):
+        response = self.client.get(SEND_TICKET_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = TicketDeliveryJob.objects.get(user=self.user)
+        self.assertEqual(response.data["job_id"], str(job.id))
+        start_ticket_delivery.assert_called_once_with(job.id)
+
+    @mock.patch("airport.views.start_ticket_delivery")
+    def test_send_ticket_per_ticket_mode(self, start_ticket_delivery):
+        response = self.client.get(SEND_TICKET_URL, {"mode": "per_ticket", "upcoming": "true"})
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = TicketDeliveryJob.objects.get(user=self.user)
+        self.assertEqual(job.mode, TicketDeliveryJob.Mode.PER_TICKET)
+        self.assertTrue(job.upcoming_only)
+
+    def test_send_ticket_unknown_mode(self):
+        response = self.client.get(SEND_TICKET_URL, {"mode": "unknown"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(TicketDeliveryJob.objects.exists())
+
+    def test_status_reports_stages(self):
+        job = TicketDeliveryJob.objects.create(user=self.user, render_status=TicketDeliveryJob.StageStatus.DONE)
+
+        response = self.client.get(reverse("airport:send_ticket_status", args=[job.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["stages"],
+            {"render": "done", "store": "pending", "email": "pending", "telegram": "pending"},
+        )
+        self.assertFalse(response.data["pdf_ready"])
+
+    def test_status_of_foreign_job_not_found(self):
+        other = get_user_model().objects.create_user(
+            username="Other", email="other@example.com", password="password123", phone="+380501234568"
+        )
+        job = TicketDeliveryJob.objects.create(user=other)
+
+        response = self.client.get(reverse("airport:send_ticket_status", args=[job.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TicketPipelineStagesTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="TestUser", email="test@example.com", password="password123", phone="+380501234567"
+        )
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.pdf_path = os.path.join(directory, "test.pdf")
+        with open(self.pdf_path, "wb") as f:
+            f.write(b"%PDF")
+        self.job = TicketDeliveryJob.objects.create(user=self.user, pdf_path=self.pdf_path)
+
+    @mock.patch("airport.tasks.tickets.get_pdf_cache")
+    @mock.patch("airport.tasks.tickets.render_html", return_value="<html></html>")
+    @mock.patch("airport.tasks.tickets.html_to_pdf", return_value="tmp/test.pdf")
+    def test_render_stage(self, html_to_pdf, render_html, get_pdf_cache):
+        get_pdf_cache.return_value.get.return_value = None
+        get_pdf_cache.return_value.make_key.return_value = "key"
+        get_pdf_cache.return_value.put.return_value = "/cache/key.pdf"
+
+        result = render_ticket_pdf.apply(args=[str(self.job.id)])
+
+        # The PDF is moved into the artifact cache by the render stage itself.
+        get_pdf_cache.return_value.put.assert_called_once_with("key", "tmp/test.pdf", [])
+        self.assertEqual(result.get(), {"key": "key", "bundle": False, "path": "/cache/key.pdf", "cached": False})
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.render_status, TicketDeliveryJob.StageStatus.DONE)
+
+    @mock.patch("airport.tasks.tickets.get_pdf_cache")
+    @mock.patch("airport.tasks.tickets.render_html", return_value="<html></html>")
+    @mock.patch("airport.tasks.tickets.html_to_pdf")
+    def test_render_stage_cache_hit_skips_browser(self, html_to_pdf, render_html, get_pdf_cache):
+        get_pdf_cache.return_value.get.return_value = "/cache/key.pdf"
+
+        result = render_ticket_pdf.apply(args=[str(self.job.id)])
+
+        html_to_pdf.assert_not_called()
+        self.assertEqual(result.get()["path"], "/cache/key.pdf")
+        self.assertTrue(result.get()["cached"])
+
+    @mock.patch("airport.tasks.tickets.render_job_pdf", return_value={"path": "/cache/new.pdf", "bundle": False})
+    def test_store_stage_rerenders_missing_pdf(self, render_job_pdf):
+        result = store_ticket_pdf.apply(args=[{"path": "/elsewhere/key.pdf", "bundle": False}, str(self.job.id)])
+
+        self.assertEqual(result.get(), "/cache/new.pdf")
+        render_job_pdf.assert_called_once_with(self.job)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.pdf_path, "/cache/new.pdf")
+        self.assertEqual(self.job.store_status, TicketDeliveryJob.StageStatus.DONE)
+
+    @mock.patch("airport.tasks.tickets.html_to_pdf")
+    @mock.patch("airport.tasks.tickets.send_pdf_to_telegram", side_effect=RuntimeError("telegram down"))
+    def test_telegram_failure_does_not_rerender(self, send_pdf_to_telegram, html_to_pdf):
+        with mock.patch.object(deliver_ticket_telegram, "max_retries", 0):
+            deliver_ticket_telegram.apply(args=[str(self.job.id)])
+
+        html_to_pdf.assert_not_called()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.telegram_status, TicketDeliveryJob.StageStatus.FAILED)
+        self.assertIn("telegram down", self.job.error)
+
+    @mock.patch("airport.tasks.tickets.send_ticket_email")
+    def test_email_stage_uses_stored_pdf(self, send_ticket_email):
+        deliver_ticket_email.apply(args=[str(self.job.id)])
+
+        send_ticket_email.assert_called_once_with(email="test@example.com", path_file=self.pdf_path)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.email_status, TicketDeliveryJob.StageStatus.DONE)
+
+    @mock.patch("airport.tasks.tickets.render_job_pdf", return_value={"path": "/cache/new.pdf", "bundle": False})
+    @mock.patch("airport.tasks.tickets.send_ticket_email")
+    def test_email_stage_rerenders_evicted_pdf(self, send_ticket_email, render_job_pdf):
+        os.remove(self.pdf_path)
+
+        deliver_ticket_email.apply(args=[str(self.job.id)])
+
+        send_ticket_email.assert_called_once_with(email="test@example.com", path_file="/cache/new.pdf")
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.pdf_path, "/cache/new.pdf")
+        self.assertEqual(self.job.email_status, TicketDeliveryJob.StageStatus.DONE)
+
+
+def fake_html_to_pdf(html_string):
+    path = os.path.join("tmp", f"{uuid.uuid4().hex}.pdf")
+    os.makedirs("tmp", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html_string)
+    return path
+
+
+class TicketBundleTest(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        patcher = mock.patch(
+            "airport.services.ticket_bundle.get_pdf_cache",
+            return_value=PdfArtifactCache(directory=directory, max_bytes=10**6),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = get_user_model().objects.create_user(
+            username="TestUser", email="test@example.com", password="password123", phone="+380501234567"
+        )
+        ticket_class = TicketClass.objects.create(name="Economy")
+        airplane = Airplane.objects.create(name="Boeing 737", airplane_type=AirplaneType.objects.create(name="Jet"))
+        route = Route.objects.create(
+            source=Airport.objects.create(
+                name="Boryspil", closest_big_city="Kyiv", airport_code="KBP", geographical_coordinates=1.0
+            ),
+            destination=Airport.objects.create(
+                name="Heathrow", closest_big_city="London", airport_code="LHR", geographical_coordinates=2.0
+            ),
+            distance=2100,
+            code_route="KL1",
+        )
+        order = Order.objects.create(user=self.user)
+        for index, departure_time in enumerate(
+            [datetime.now() - timedelta(days=2), datetime.now() + timedelta(days=2)]
+        ):
+            flight = Flight.objects.create(
+                route=route,
+                airplane=airplane,
+                departure_time=departure_time,
+                arrival_time=departure_time + timedelta(hours=3),
+            )
+            seat = Seat.objects.create(airplane=airplane, seat=index + 1, row="A", ticket_class=ticket_class)
+            Ticket.objects.create(
+                order=order, price=100, flight_seat=FlightSeat.objects.create(seat=seat, flight=flight)
+            )
+
+    def bundle_names(self, tickets):
+        with mock.patch("airport.services.ticket_bundle.html_to_pdf", side_effect=fake_html_to_pdf) as html_to_pdf:
+            bundle_path = build_ticket_bundle(tickets, "ticket.html")
+        self.addCleanup(os.remove, bundle_path)
+        with zipfile.ZipFile(bundle_path) as bundle:
+            return bundle.namelist(), html_to_pdf.call_count
+
+    def test_bundle_has_pdf_per_ticket(self):
+        names, renders = self.bundle_names(user_tickets(self.user))
+
+        self.assertEqual(names, [f"ticket-{ticket.id}.pdf" for ticket in Ticket.objects.order_by("id")])
+        self.assertEqual(renders, 2)
+
+    def test_bundle_reuses_cached_tickets(self):
+        self.bundle_names(user_tickets(self.user))
+
+        names, renders = self.bundle_names(user_tickets(self.user))
+
+        self.assertEqual(len(names), 2)
+        self.assertEqual(renders, 0)
+
+    def test_bundle_upcoming_only(self):
+        names, _ = self.bundle_names(user_tickets(self.user, upcoming_only=True))
+
+        upcoming = Ticket.objects.get(flight_seat__flight__departure_time__gte=datetime.now())
+        self.assertEqual(names, [f"ticket-{upcoming.id}.pdf"])
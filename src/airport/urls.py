@@ -5,7 +5,8 @@ from airport.views import (AirplaneTypeViewSet, AirplaneViewSet,
                            AirportViewSet, CrewViewSet, FlightSeatViewSet,
                            FlightViewSet, OrderViewSet, RouteViewSet,
                            SeatViewSet, TariffViewSet, TicketClassViewSet,
-                           TicketViewSet, send_ticket,
+                           TicketViewSet, confirm_seat_hold, seat_hold_detail,
+                           send_ticket, send_ticket_status,
                            send_to_user_weekly_email)
 
 router = routers.DefaultRouter()
@@ -26,6 +27,9 @@ router.register("flight-seats", FlightSeatViewSet)
 urlpatterns = [
     path("", include(router.urls)),
     path("send-ticket/", send_ticket, name="send_ticket"),
+    path("send-ticket/<uuid:job_id>/", send_ticket_status, name="send_ticket_status"),
+    path("seat-holds/<uuid:hold_id>/", seat_hold_detail, name="seat_hold_detail"),
+    path("seat-holds/<uuid:hold_id>/confirm/", confirm_seat_hold, name="seat_hold_confirm"),
     path("weekly-email/", send_to_user_weekly_email, name="weekly_email"),
 ]
 
@@ -1,35 +1,70 @@
-from django.http import HttpRequest, HttpResponse
+from base64 import b64encode
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.http import Http404, HttpRequest, HttpResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.urls import reverse
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import mixins, status, viewsets
-from rest_framework.decorators import api_view
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from airport.async_api import (AsyncGenericViewSet, AsyncRetrieveModelMixin,
+                               async_api_view)
+from airport.bulk import BulkCreateMixin
+from airport.caching import (AsyncConditionalResponseMixin,
+                             CachedResponseMixin, ConditionalResponseMixin)
 from airport.models import (Airplane, AirplaneType, Airport, Crew, Flight,
-                            FlightSeat, Order, Route, Seat, Tariff, Ticket,
-                            TicketClass)
+                            FlightAvailability, FlightSeat, Order, Route, Seat,
+                            Tariff, Ticket, TicketClass, TicketDeliveryJob)
+from airport.pagination import FlightKeysetPagination
 from airport.permissions import IsAdminOrIfAuthenticatedReadOnly
+from airport.row_serializers import (AsyncRowListMixin, FlightRowSerializer,
+                                     FlightSeatRowSerializer, RowListMixin)
 from airport.serializers import (AirplaneCreateSerializer,
                                  AirplaneListRetrieveSerializer,
                                  AirplaneTypeSerializer, AirportSerializer,
-                                 CrewSerializer, FlightCreateSerializer,
+                                 BookingResultSerializer, BookingSerializer,
+                                 ConnectionItinerarySerializer,
+                                 ConnectionSearchSerializer, CrewSerializer,
+                                 FlightAvailabilitySerializer,
+                                 FlightCreateSerializer,
+                                 FlightFilterSerializer,
                                  FlightListRetrieveSerializer,
                                  FlightSeatCreateSerializer,
                                  FlightSeatListRetrieveSerializer,
+                                 FlightSeatRegenerateSerializer,
                                  OrderSerializer, RouteCreateSerializer,
                                  RouteListRetrieveSerializer,
                                  SeatCreateSerializer, SeatFilterSerializer,
-                                 SeatListRetrieveSerializer,
+                                 SeatHoldSerializer,
+                                 SeatListRetrieveSerializer, SeatMapSerializer,
+                                 SendTicketParamsSerializer,
                                  TariffCreateSerializer,
                                  TariffFilterSerializer,
                                  TariffListRetrieveSerializer,
                                  TicketClassSerializer, TicketCreateSerializer,
+                                 TicketDeliveryJobSerializer,
                                  TicketListRetrieveSerializer)
-from airport.services.convert_html_to_pdf import generate_and_send_pdf
+from airport.services.booking import (SeatConflictError, book_seats,
+                                      confirm_hold, hold_seats)
+from airport.services.connections import get_connection_index
+from airport.services.seat_holds import get_hold_store
+from airport.services.seat_inventory import (InventoryConflictError,
+                                             regenerate_flight_seats)
+from airport.services.seat_map import encode_bitmap, get_layout, get_occupancy
+from airport.streaming import StreamingListMixin
 from airport.tasks.mail import weekly_wish_email
+from airport.tasks.tickets import start_ticket_delivery
 
 
-class AirplaneTypeViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin, GenericViewSet):
+class AirplaneTypeViewSet(
+    CachedResponseMixin, mixins.ListModelMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin, GenericViewSet
+):
     """
     ViewSet for viewing (list, retrieve) and creating (create) airplane types.
     """
@@ -76,7 +111,9 @@ class AirplaneViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, mixins.Ret
         return super().list(request, *args, **kwargs)
 
 
-class SeatViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin, GenericViewSet):
+class SeatViewSet(
+    BulkCreateMixin, mixins.ListModelMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin, GenericViewSet
+):
     """
     ViewSet for listing, retrieving and creating seats.
 
@@ -110,17 +147,23 @@ class SeatViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, mixins.Retriev
         return super().list(request, *args, **kwargs)
 
 
-class OrderViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, mixins.CreateModelMixin, GenericViewSet):
+class OrderViewSet(
+    StreamingListMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin, mixins.CreateModelMixin, GenericViewSet
+):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
 
 
-class TicketClassViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin, GenericViewSet):
+class TicketClassViewSet(
+    CachedResponseMixin, mixins.ListModelMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin, GenericViewSet
+):
     queryset = TicketClass.objects.all()
     serializer_class = TicketClassSerializer
 
 
-class TariffViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin, GenericViewSet):
+class TariffViewSet(
+    CachedResponseMixin, mixins.ListModelMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin, GenericViewSet
+):
     """
     ViewSet for managing tariffs.
 
@@ -129,6 +172,7 @@ class TariffViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, mixins.Retri
     """
 
     queryset = Tariff.objects.all().select_related("ticket_class").order_by("code")
+    cache_models = (Tariff, TicketClass)
 
     def get_serializer_class(self):
         if self.action in ["list", "retrieve"]:
@@ -153,8 +197,16 @@ class TariffViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, mixins.Retri
         return super().list(request, *args, **kwargs)
 
 
-class TicketViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin, GenericViewSet):
+class TicketViewSet(
+    ConditionalResponseMixin,
+    StreamingListMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    GenericViewSet,
+):
     queryset = Ticket.objects.all().select_related("flight_seat", "order")
+    conditional_models = (Order,)
 
     def get_serializer_class(self):
         if self.action in ["list", "retrieve"]:
@@ -162,13 +214,28 @@ class TicketViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, mixins.Retri
         return TicketCreateSerializer
 
 
-class AirportViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, mixins.CreateModelMixin, GenericViewSet):
+class AirportViewSet(
+    CachedResponseMixin,
+    BulkCreateMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.CreateModelMixin,
+    GenericViewSet,
+):
     queryset = Airport.objects.all()
     serializer_class = AirportSerializer
 
 
-class RouteViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, mixins.CreateModelMixin, GenericViewSet):
+class RouteViewSet(
+    CachedResponseMixin,
+    BulkCreateMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.CreateModelMixin,
+    GenericViewSet,
+):
     queryset = Route.objects.all().select_related("source", "destination")
+    cache_models = (Route, Airport)
 
     def get_serializer_class(self):
         if self.action in ["list", "retrieve"]:
@@ -176,21 +243,229 @@ class RouteViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, mixins.Crea
         return RouteCreateSerializer
 
 
-class CrewViewSet(viewsets.ModelViewSet):
+class CrewViewSet(BulkCreateMixin, viewsets.ModelViewSet):
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
 
 
-class FlightViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, mixins.CreateModelMixin, GenericViewSet):
-    queryset = Flight.objects.all().select_related("route", "airplane").prefetch_related("crew")
+# List, retrieve and the connection search are coroutines on the async ORM; the other actions are sync.
+class FlightViewSet(
+    AsyncConditionalResponseMixin,
+    AsyncRowListMixin,
+    AsyncRetrieveModelMixin,
+    mixins.CreateModelMixin,
+    AsyncGenericViewSet,
+):
+    """
+    ViewSet for searching, retrieving and creating flights.
+
+    The list is a search: filters by source/destination airport code, departure
+    time window, status, airplane type and minimum number of free seats, and is
+    paginated with a (departure_time, id) keyset cursor.
+    """
+
+    queryset = (
+        Flight.objects.all().select_related("route__source", "route__destination", "airplane").prefetch_related("crew")
+    )
+    pagination_class = FlightKeysetPagination
+    row_serializer = FlightRowSerializer()
+    conditional_models = (Route, Airport, Airplane, Crew)
+    min_available_seats = None
+
+    def is_conditional(self) -> bool:
+        # Free seats depend on holds, which expire without any model version moving.
+        return not (self.action == "list" and "min_available_seats" in self.request.query_params)
 
     def get_serializer_class(self):
         if self.action in ["list", "retrieve"]:
             return FlightListRetrieveSerializer
         return FlightCreateSerializer
 
+    def get_queryset(self):
+        """Retrieve the flights with search filters"""
+        queryset = self.queryset
+        if self.action != "list":
+            return queryset
+
+        filters = FlightFilterSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        params = filters.validated_data
+
+        if "source" in params:
+            queryset = queryset.filter(route__source__airport_code__iexact=params["source"])
+        if "destination" in params:
+            queryset = queryset.filter(route__destination__airport_code__iexact=params["destination"])
+        if "departure_after" in params:
+            queryset = queryset.filter(departure_time__gte=params["departure_after"])
+        if "departure_before" in params:
+            queryset = queryset.filter(departure_time__lt=params["departure_before"])
+        if "status" in params:
+            queryset = queryset.filter(status=params["status"])
+        if "airplane_type" in params:
+            queryset = queryset.filter(airplane__airplane_type__name__icontains=params["airplane_type"])
+        if "min_available_seats" in params:
+            self.min_available_seats = params["min_available_seats"]
+            queryset = queryset.with_available_seats().filter(available_seats__gte=self.min_available_seats)
+        return queryset
+
+    async def apaginate_queryset(self, queryset):
+        """
+        The page of flights, without those that held seats leave with too few free ones.
+
+        Holds are read for the flights of the page only, so a page can come out
+        shorter than the page size; the cursor still continues after its last row.
+        """
+        page = await super().apaginate_queryset(queryset)
+        if page is None or self.min_available_seats is None:
+            return page
+        held_per_flight = sync_to_async(get_hold_store().held_per_flight, thread_sensitive=False)
+        held = await held_per_flight([row["id"] for row in page])
+        if not held:
+            return page
+        available = {
+            flight_id: seats
+            async for flight_id, seats in Flight.objects.filter(pk__in=held)
+            .with_available_seats()
+            .values_list("id", "available_seats")
+        }
+        return [
+            row
+            for row in page
+            if row["id"] not in held or available[row["id"]] - held[row["id"]] >= self.min_available_seats
+        ]
+
+    @extend_schema(parameters=[FlightFilterSerializer])
+    async def list(self, request, *args, **kwargs):
+        return await super().list(request, *args, **kwargs)
+
+    @extend_schema(parameters=[ConnectionSearchSerializer], responses=ConnectionItinerarySerializer(many=True))
+    @action(detail=False, methods=["get"], url_path="connections", pagination_class=None)
+    async def connections(self, request):
+        """Search 1-3 leg itineraries between two airports"""
+        search = ConnectionSearchSerializer(data=request.query_params)
+        search.is_valid(raise_exception=True)
+        params = search.validated_data
+
+        airports = {
+            code.upper(): airport_id
+            async for code, airport_id in Airport.objects.filter(
+                Q(airport_code__iexact=params["source"]) | Q(airport_code__iexact=params["destination"])
+            ).values_list("airport_code", "id")
+        }
+        source_id = airports.get(params["source"].upper())
+        destination_id = airports.get(params["destination"].upper())
+        if source_id is None or destination_id is None:
+            return Response([])
+
+        def search_index():
+            # Refreshes the index from the database, so it runs off the event loop.
+            return get_connection_index().search(
+                source_id,
+                destination_id,
+                departure_after=params["departure_after"],
+                departure_before=params["departure_before"],
+                max_legs=params["max_legs"],
+                min_layover=timedelta(minutes=params["min_layover"]),
+                max_layover=timedelta(minutes=params["max_layover"]),
+                sort=params["sort"],
+                limit=params["limit"],
+            )
+
+        itineraries = await sync_to_async(search_index)()
+        return Response(ConnectionItinerarySerializer(itineraries, many=True).data)
+
+    @extend_schema(request=BookingSerializer, responses={201: BookingResultSerializer})
+    @action(detail=True, methods=["post"], url_path="book", permission_classes=[IsAuthenticated])
+    def book(self, request, pk=None):
+        """Book several seats of the flight in one order"""
+        flight = get_object_or_404(Flight, pk=pk)
+        serializer = BookingSerializer(data=request.data, context={"flight": flight})
+        serializer.is_valid(raise_exception=True)
+        prices = {item["flight_seat"]: item["price"] for item in serializer.validated_data["tickets"]}
+
+        try:
+            booking = book_seats(request.user, flight.id, prices)
+        except SeatConflictError as error:
+            return seat_conflict_response(error)
+        return Response(BookingResultSerializer(booking).data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(request=BookingSerializer, responses={201: SeatHoldSerializer})
+    @action(detail=True, methods=["post"], url_path="hold", permission_classes=[IsAuthenticated])
+    def hold(self, request, pk=None):
+        """Hold seats of the flight for checkout; the hold expires after SEAT_HOLD_TTL seconds"""
+        flight = get_object_or_404(Flight, pk=pk)
+        serializer = BookingSerializer(data=request.data, context={"flight": flight})
+        serializer.is_valid(raise_exception=True)
+        prices = {item["flight_seat"]: item["price"] for item in serializer.validated_data["tickets"]}
+
+        try:
+            hold = hold_seats(request.user, flight.id, prices)
+        except SeatConflictError as error:
+            return seat_conflict_response(error)
+        return Response(SeatHoldSerializer(hold).data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(request=FlightSeatRegenerateSerializer)
+    @action(detail=False, methods=["post"], url_path="regenerate-seats", permission_classes=[IsAdminUser])
+    def regenerate_seats(self, request):
+        """Rebuild the seat inventory of flights, optionally moving them to another airplane"""
+        serializer = FlightSeatRegenerateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            result = regenerate_flight_seats(
+                serializer.validated_data["flights"], airplane=serializer.validated_data.get("airplane")
+            )
+        except InventoryConflictError as error:
+            return Response(
+                {"detail": "Flight seats with tickets cannot be removed", "flight_seats": error.flight_seat_ids},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(result, status=status.HTTP_200_OK)
+
+    @extend_schema(responses=SeatMapSerializer)
+    @action(detail=True, methods=["get"], url_path="seat-map", pagination_class=None)
+    def seat_map(self, request, pk=None):
+        """Cabin layout of the flight with bitmaps of booked and held seats"""
+        flight_id = get_object_or_404(Flight.objects.values_list("id", flat=True), pk=pk)
+        layout = get_layout(flight_id)
+        occupancy = get_occupancy(flight_id, layout)
+        positions = layout["positions"]
+        held = encode_bitmap(
+            (positions[seat_id] for seat_id in get_hold_store().held_seats(flight_id) if seat_id in positions),
+            len(positions),
+        )
+        taken = int.from_bytes(occupancy, "big") | int.from_bytes(held, "big")
+        return Response(
+            {
+                "flight": flight_id,
+                "seats": layout["seats"],
+                "occupancy": b64encode(occupancy).decode(),
+                "held": b64encode(held).decode(),
+                "free_seats": len(positions) - taken.bit_count(),
+            }
+        )
 
-class FlightSeatViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, mixins.CreateModelMixin, GenericViewSet):
+    @extend_schema(responses=FlightAvailabilitySerializer(many=True))
+    @action(detail=True, methods=["get"], url_path="availability", pagination_class=None)
+    def availability(self, request, pk=None):
+        """Free seats of the flight per ticket class, net of tickets and active holds"""
+        flight = get_object_or_404(Flight, pk=pk)
+        rows = list(FlightAvailability.objects.filter(flight=flight).select_related("ticket_class"))
+        held = get_hold_store().held_counts(flight.id, [row.ticket_class_id for row in rows])
+        for row in rows:
+            row.held_seats = held.get(row.ticket_class_id, 0)
+        return Response(FlightAvailabilitySerializer(rows, many=True).data)
+
+
+class FlightSeatViewSet(
+    ConditionalResponseMixin,
+    StreamingListMixin,
+    RowListMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.CreateModelMixin,
+    GenericViewSet,
+):
     queryset = (
         FlightSeat.objects.all()
         .select_related(
@@ -202,6 +477,8 @@ class FlightSeatViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, mixins
         )
         .prefetch_related("flight__crew")
     )
+    row_serializer = FlightSeatRowSerializer()
+    conditional_models = (Flight, Seat, TicketClass, Airplane, Route, Airport, Crew)
 
     def get_serializer_class(self):
         if self.action in ["list", "retrieve"]:
@@ -209,30 +486,85 @@ class FlightSeatViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, mixins
         return FlightSeatCreateSerializer
 
 
-@api_view(["GET"])
-def send_ticket(request: HttpRequest) -> HttpResponse:
+@extend_schema(parameters=[SendTicketParamsSerializer])
+@async_api_view(["GET"])
+async def send_ticket(request: HttpRequest) -> HttpResponse:
+    """
+    Queue rendering and delivery of the user's tickets.
+
+    Returns 202 with the job id; progress is available at the status URL.
+    """
     user = request.user
     if not user.is_authenticated:
         return Response({"detail": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
 
-    template_name = "ticket.html"
+    params = SendTicketParamsSerializer(data=request.query_params)
+    params.is_valid(raise_exception=True)
 
-    tickets = Ticket.objects.filter(order__user=user).select_related(
-        "flight_seat__flight__route__source",
-        "flight_seat__flight__route__destination",
-        "flight_seat__flight",
-        "flight_seat__seat",
-        "order__user",
-        "order",
+    job = await TicketDeliveryJob.objects.acreate(
+        user=user, mode=params.validated_data["mode"], upcoming_only=params.validated_data["upcoming"]
     )
+    # Publishing to the broker blocks.
+    await sync_to_async(start_ticket_delivery, thread_sensitive=False)(job.id)
+
+    return Response(
+        {
+            "detail": "Ticket delivery queued",
+            "job_id": str(job.id),
+            "status_url": reverse("airport:send_ticket_status", args=[job.id]),
+        },
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
+@async_api_view(["GET"])
+async def send_ticket_status(request: HttpRequest, job_id) -> HttpResponse:
+    user = request.user
+    if not user.is_authenticated:
+        return Response({"detail": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
+
+    job = await aget_object_or_404(TicketDeliveryJob, pk=job_id, user=user)
+    return Response(TicketDeliveryJobSerializer(job).data, status=status.HTTP_200_OK)
+
 
-    context = {"tickets": tickets}
-    generate_and_send_pdf(user=user, template_name=template_name, context=context)
+def seat_conflict_response(error: SeatConflictError) -> Response:
+    return Response({"detail": "Some seats are already taken", "taken": error.taken}, status=status.HTTP_409_CONFLICT)
 
-    return Response({"detail": "Ticket sent successfully"}, status=status.HTTP_200_OK)
+
+def _user_hold(request, hold_id):
+    hold = get_hold_store().get(str(hold_id))
+    if hold is None or hold.user_id != request.user.id:
+        raise Http404("Seat hold not found or expired")
+    return hold
+
+
+@extend_schema(responses=SeatHoldSerializer)
+@api_view(["GET", "DELETE"])
+@permission_classes([IsAuthenticated])
+def seat_hold_detail(request: HttpRequest, hold_id) -> HttpResponse:
+    hold = _user_hold(request, hold_id)
+    if request.method == "DELETE":
+        get_hold_store().release(hold)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(SeatHoldSerializer(hold).data, status=status.HTTP_200_OK)
+
+
+@extend_schema(request=None, responses={201: BookingResultSerializer})
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def confirm_seat_hold(request: HttpRequest, hold_id) -> HttpResponse:
+    """
+    Book the held seats at the held prices.
+    """
+    hold = _user_hold(request, hold_id)
+    try:
+        booking = confirm_hold(request.user, hold)
+    except SeatConflictError as error:
+        return seat_conflict_response(error)
+    return Response(BookingResultSerializer(booking).data, status=status.HTTP_201_CREATED)
 
 
-@api_view(["GET"])
-def send_to_user_weekly_email(request: HttpRequest) -> HttpResponse:
-    weekly_wish_email.delay()
+@async_api_view(["GET"])
+async def send_to_user_weekly_email(request: HttpRequest) -> HttpResponse:
+    await sync_to_async(weekly_wish_email.delay, thread_sensitive=False)()
     return Response({"detail": "Email sent successfully"}, status=status.HTTP_200_OK)
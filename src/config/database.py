@@ -0,0 +1,92 @@
+"""
+Connection settings of the database, tuned per process role through environment variables.
+
+DJANGO_PROCESS_ROLE (web, asgi or celery) picks the defaults of ROLE_DEFAULTS.
+Each value can be overridden with DATABASE_<NAME>, or for one role only with
+<ROLE>_DATABASE_<NAME> (e.g. CELERY_DATABASE_CONN_MAX_AGE=0).
+
+Without pooling, connections persist for CONN_MAX_AGE seconds and are checked
+with CONN_HEALTH_CHECKS before reuse. With DATABASE_POOL on, Django keeps a
+psycopg 3 connection pool per process instead (CONN_MAX_AGE is then 0, as the
+pool requires). Async requests cannot reuse persistent connections, so the asgi
+role uses the pool by default.
+
+Read replicas are listed in DATABASE_REPLICA_HOSTS as comma-separated
+``host[:port]`` entries; they share the credentials and connection settings of
+the primary and are routed by config/db_router.py.
+"""
+
+ROLES = ("web", "asgi", "celery")
+ROLE_DEFAULTS = {
+    "web": {"CONN_MAX_AGE": 60, "POOL": False},
+    "asgi": {"CONN_MAX_AGE": 0, "POOL": True},
+    "celery": {"CONN_MAX_AGE": 600, "POOL": False},
+}
+DEFAULTS = {
+    "CONN_HEALTH_CHECKS": True,
+    "POOL_MIN_SIZE": 2,
+    "POOL_MAX_SIZE": 10,
+    "POOL_TIMEOUT": 10,
+    "POOL_MAX_IDLE": 300,
+    "POOL_MAX_LIFETIME": 3600,
+}
+
+
+def _flag(value) -> bool:
+    return str(value).lower() in ("1", "true", "yes", "on")
+
+
+def connection_settings(environ) -> dict:
+    """
+    The CONN_MAX_AGE, CONN_HEALTH_CHECKS and OPTIONS["pool"] entries of a DATABASES alias.
+    """
+    role = environ.get("DJANGO_PROCESS_ROLE", "web").lower()
+    if role not in ROLES:
+        raise ValueError(f"DJANGO_PROCESS_ROLE must be one of {', '.join(ROLES)}, not {role!r}")
+    defaults = {**DEFAULTS, **ROLE_DEFAULTS[role]}
+
+    def value(name):
+        for key in (f"{role.upper()}_DATABASE_{name}", f"DATABASE_{name}"):
+            if key in environ:
+                return environ[key]
+        return defaults[name]
+
+    if not _flag(value("POOL")):
+        return {
+            "CONN_MAX_AGE": int(value("CONN_MAX_AGE")),
+            "CONN_HEALTH_CHECKS": _flag(value("CONN_HEALTH_CHECKS")),
+            "OPTIONS": {},
+        }
+    return {
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": False,
+        "OPTIONS": {
+            "pool": {
+                "min_size": int(value("POOL_MIN_SIZE")),
+                "max_size": int(value("POOL_MAX_SIZE")),
+                "timeout": float(value("POOL_TIMEOUT")),
+                "max_idle": float(value("POOL_MAX_IDLE")),
+                "max_lifetime": float(value("POOL_MAX_LIFETIME")),
+            }
+        },
+    }
+
+
+def replica_databases(primary: dict, environ) -> dict:
+    """
+    DATABASES entries (replica_1, replica_2, ...) for the hosts of DATABASE_REPLICA_HOSTS.
+
+    Replicas mirror the primary in tests, so no test database is created for them.
+    """
+    hosts = [host.strip() for host in environ.get("DATABASE_REPLICA_HOSTS", "").split(",") if host.strip()]
+    replicas = {}
+    for number, entry in enumerate(hosts, start=1):
+        host, _, port = entry.partition(":")
+        replicas[f"replica_{number}"] = {
+            **primary,
+            "HOST": host,
+            "PORT": port or primary.get("PORT", ""),
+            "OPTIONS": {**primary.get("OPTIONS", {})},
+            "TEST": {"MIRROR": "default"},
+        }
+    return replicas
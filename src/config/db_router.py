@@ -0,0 +1,207 @@
+"""
+Read replica routing.
+
+ReplicaRoutingMiddleware lets the safe-method requests (GET, HEAD, OPTIONS)
+read from the replicas of DATABASE_REPLICAS; everything else, including
+Celery tasks and management commands, stays on the primary. Within such a
+request, reads go back to the primary once the request writes or enters a
+transaction, and after a write the client is pinned to the primary for
+REPLICA_PIN_SECONDS with a cookie, so it reads its own writes. Replicas
+lagging more than REPLICA_MAX_LAG_SECONDS behind are skipped.
+
+Reads that fill a shared cache run under ``primary_reads``: the cache key is
+versioned by signals on commit, so a fill from a replica that has not replayed
+the commit yet would store old rows under the new version.
+"""
+
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = "db_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Seconds the replica has not replayed yet; 0 when it is caught up or not a standby.
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class RoutingState:
+    def __init__(self, use_replicas: bool):
+        self.use_replicas = use_replicas
+        self.wrote = False
+
+
+_state = ContextVar("db_routing_state", default=None)
+# alias -> (checked at, healthy)
+_health = {}
+
+
+def replica_lag(alias: str) -> float:
+    """Replication lag of the ``alias`` replica in seconds."""
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRES_LAG_SQL)
+        return float(cursor.fetchone()[0])
+
+
+def replica_is_healthy(alias: str) -> bool:
+    """
+    Whether ``alias`` answers and lags less than REPLICA_MAX_LAG_SECONDS, checked at most every
+    REPLICA_LAG_CHECK_INTERVAL seconds per process.
+    """
+    now = time.monotonic()
+    checked_at, healthy = _health.get(alias, (None, False))
+    if checked_at is not None and now - checked_at < settings.REPLICA_LAG_CHECK_INTERVAL:
+        return healthy
+    try:
+        lag = replica_lag(alias)
+    except DatabaseError:
+        logger.warning("Replica %s is unreachable, reading from the primary", alias, exc_info=True)
+        healthy = False
+    else:
+        healthy = lag <= settings.REPLICA_MAX_LAG_SECONDS
+        if not healthy:
+            logger.warning("Replica %s lags %.1f s behind, reading from the primary", alias, lag)
+    _health[alias] = (now, healthy)
+    return healthy
+
+
+def reset_replica_health() -> None:
+    _health.clear()
+
+
+@contextmanager
+def primary_reads():
+    """
+    Send the reads of the block to the primary, also within a request allowed to use the replicas.
+    """
+    state = _state.get()
+    if state is None or not state.use_replicas:
+        yield
+        return
+    state.use_replicas = False
+    try:
+        yield
+    finally:
+        state.use_replicas = True
+
+
+class PrimaryReplicaRouter:
+    """
+    Send reads to a healthy replica while ReplicaRoutingMiddleware allows it, everything else to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.use_replicas or state.wrote or not settings.DATABASE_REPLICAS:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # Reads of a transaction (select_for_update, read-modify-write) need the primary.
+            return DEFAULT_DB_ALIAS
+        replicas = [alias for alias in settings.DATABASE_REPLICAS if replica_is_healthy(alias)]
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data, so objects read from any of them relate.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Allow replica reads for safe-method requests of clients not pinned to the primary,
+    and pin the clients whose requests wrote.
+
+    Streaming responses read while their content is written, so the routing
+    state is kept for the stream.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def routing_state(request) -> RoutingState:
+        return RoutingState(use_replicas=request.method in SAFE_METHODS and PIN_COOKIE not in request.COOKIES)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = self.routing_state(request)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.process_response(response, state)
+
+    async def __acall__(self, request):
+        state = self.routing_state(request)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.process_response(response, state)
+
+    def process_response(self, response, state):
+        if response.streaming and response.is_async:
+            response.streaming_content = self.route_async_stream(response.streaming_content, state)
+        elif response.streaming:
+            response.streaming_content = self.route_stream(response.streaming_content, state)
+        if state.wrote:
+            response.set_cookie(PIN_COOKIE, "1", max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite="Lax")
+        return response
+
+    @staticmethod
+    def route_stream(content, state):
+        # The state is set around each chunk: the server may read them in different contexts.
+        iterator = iter(content)
+        while True:
+            token = _state.set(state)
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _state.reset(token)
+            yield chunk
+
+    @staticmethod
+    async def route_async_stream(content, state):
+        iterator = aiter(content)
+        while True:
+            token = _state.set(state)
+            try:
+                chunk = await anext(iterator)
+            except StopAsyncIteration:
+                return
+            finally:
+                _state.reset(token)
+            yield chunk
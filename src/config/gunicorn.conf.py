@@ -0,0 +1,40 @@
+"""
+Gunicorn settings, used as ``gunicorn -c config/gunicorn.conf.py``.
+
+GUNICORN_MODE selects the profile:
+
+- ``wsgi`` (default): sync workers serving config.wsgi.
+- ``asgi``: uvicorn workers serving config.asgi, so the async views wait on
+  I/O without holding a worker. Sync views still run in a thread per request.
+  Django cannot reuse database connections across async requests, so this
+  mode runs with DJANGO_PROCESS_ROLE=asgi, which uses a connection pool
+  instead (see config/database.py).
+
+Workers write their Prometheus metrics to files in PROMETHEUS_MULTIPROC_DIR,
+which must be set and emptied before gunicorn starts (the start scripts in
+commands/ do both); /metrics merges the files of all workers.
+"""
+
+import os
+
+from prometheus_client import multiprocess
+
+mode = os.getenv("GUNICORN_MODE", "wsgi")
+if mode == "asgi":
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "config.wsgi:application"
+    worker_class = "sync"
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", 4))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+
+def child_exit(server, worker):
+    """Drop the live gauges of a worker that exited; its counters and histograms are kept."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(worker.pid)
@@ -18,6 +18,8 @@ from celery.schedules import crontab
 from django.conf.global_settings import STATIC_ROOT
 from dotenv import load_dotenv
 
+from config.database import connection_settings, replica_databases
+
 load_dotenv()
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -53,7 +55,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "airport.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "config.db_router.ReplicaRoutingMiddleware",
+    "airport.querycount.QueryCountMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -118,6 +123,19 @@ else:
     #     }
     # }
 
+# Persistent connections or a connection pool, per process role (see config/database.py)
+DATABASES["default"].update(connection_settings(os.environ))
+
+# Read replicas (see config/db_router.py)
+DATABASES.update(replica_databases(DATABASES["default"], os.environ))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["config.db_router.PrimaryReplicaRouter"]
+# Replicas further behind the primary than this are skipped; the lag is checked at most every interval.
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", 5))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", 5))
+# After a write, reads of the same client stay on the primary this long.
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 10))
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -175,6 +193,17 @@ EMAIL_PORT = 587
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 
+# EMAIL CAMPAIGNS
+# User ids per chunk task, recipients per progress checkpoint, and how long a worker holds a chunk (seconds).
+EMAIL_CAMPAIGN_CHUNK_SIZE = int(os.getenv("EMAIL_CAMPAIGN_CHUNK_SIZE", 5000))
+EMAIL_CAMPAIGN_BATCH_SIZE = int(os.getenv("EMAIL_CAMPAIGN_BATCH_SIZE", 100))
+EMAIL_CAMPAIGN_LEASE = int(os.getenv("EMAIL_CAMPAIGN_LEASE", 300))
+# Messages per second per SMTP host (0 is unlimited); the counters live in
+# EMAIL_RATE_LIMIT_REDIS_URL, so all workers share one budget per host.
+EMAIL_PROVIDER_RATE_LIMITS = {"smtp.gmail.com": 5}
+EMAIL_DEFAULT_RATE_LIMIT = int(os.getenv("EMAIL_DEFAULT_RATE_LIMIT", 10))
+EMAIL_RATE_LIMIT_REDIS_URL = os.getenv("EMAIL_RATE_LIMIT_REDIS_URL", "redis://redis:6379/3")
+
 # REST
 REST_FRAMEWORK = {
     # YOUR SETTINGS
@@ -209,9 +238,75 @@ CELERY_BROKER_BACKEND = "redis://redis"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TASK_SERIALIZER = "json"
 CELERY_ACCEPT_CONTENT = ["application/json"]
+CELERY_IMPORTS = ("airport.tasks.mail", "airport.tasks.tickets", "airport.tasks.holds")
 CELERY_BEAT_SCHEDULE = {
     "send_email_periodic_task": {
         "task": "airport.tasks.mail.weekly_wish_email",
         "schedule": crontab(minute=0, hour=9, day_of_week=1),
-    }
+    },
+    "sweep_seat_holds_periodic_task": {
+        "task": "airport.tasks.holds.sweep_seat_holds",
+        "schedule": crontab(),
+    },
+}
+
+# PDF RENDERER
+PDF_RENDERER_POOL_SIZE = int(os.getenv("PDF_RENDERER_POOL_SIZE", 2))
+PDF_RENDERER_QUEUE_SIZE = int(os.getenv("PDF_RENDERER_QUEUE_SIZE", 20))
+PDF_RENDER_TIMEOUT = float(os.getenv("PDF_RENDER_TIMEOUT", 30))
+PDF_RENDERER_MAX_RENDERS = int(os.getenv("PDF_RENDERER_MAX_RENDERS", 200))
+
+# PDF CACHE
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join(MEDIA_ROOT, "pdf_cache"))
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# CONNECTION SEARCH
+CONNECTION_INDEX_LOOKBACK = timedelta(days=int(os.getenv("CONNECTION_INDEX_LOOKBACK_DAYS", 1)))
+# Seconds the changed flight and route ids are kept for other processes to replay.
+CONNECTION_INDEX_CHANGE_TTL = int(os.getenv("CONNECTION_INDEX_CHANGE_TTL", 3600))
+
+# SEAT HOLDS
+SEAT_HOLD_BACKEND = os.getenv("SEAT_HOLD_BACKEND", "airport.services.seat_holds.RedisHoldStore")
+SEAT_HOLD_REDIS_URL = os.getenv("SEAT_HOLD_REDIS_URL", "redis://redis:6379/1")
+SEAT_HOLD_TTL = int(os.getenv("SEAT_HOLD_TTL", 600))
+SEAT_HOLD_SWEEP_BATCH = int(os.getenv("SEAT_HOLD_SWEEP_BATCH", 500))
+
+# SEAT MAP
+SEAT_MAP_TTL = int(os.getenv("SEAT_MAP_TTL", 300))
+
+# CACHE
+# Model versions, ETag validators and the connection index version live here, so every web and
+# Celery process must share it; an empty CACHE_REDIS_URL falls back to a per-process cache.
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://redis:6379/2")
+if CACHE_REDIS_URL:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": CACHE_REDIS_URL}}
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", 3600))
+# Other processes never see the invalidations of a per-process cache, so its entries live briefly.
+LOCAL_RESPONSE_CACHE_TIMEOUT = int(os.getenv("LOCAL_RESPONSE_CACHE_TIMEOUT", 10))
+
+# STREAMING EXPORT
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", 2000))
+
+# BULK CREATE
+BULK_CREATE_BATCH_SIZE = int(os.getenv("BULK_CREATE_BATCH_SIZE", 500))
+BULK_CREATE_MAX_ITEMS = int(os.getenv("BULK_CREATE_MAX_ITEMS", 5000))
+
+# QUERY COUNTS
+QUERY_COUNT_ENABLED = os.getenv("QUERY_COUNT_ENABLED", str(DEBUG)).lower() in ("1", "true", "yes")
+QUERY_COUNT_DUPLICATE_THRESHOLD = int(os.getenv("QUERY_COUNT_DUPLICATE_THRESHOLD", 5))
+
+# METRICS
+# Set PROMETHEUS_MULTIPROC_DIR in the environment for gunicorn and Celery prefork (see config/gunicorn.conf.py).
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+CELERY_METRICS_PORT = int(os.getenv("CELERY_METRICS_PORT", 0))
+
+# LOGGING
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"default": {"format": "%(asctime)s %(levelname)s %(name)s %(process)d %(message)s"}},
+    "handlers": {"console": {"class": "logging.StreamHandler", "formatter": "default"}},
+    "loggers": {"airport": {"handlers": ["console"], "level": os.getenv("LOG_LEVEL", "INFO")}},
 }
@@ -22,11 +22,13 @@ from django.urls import include, path
 from drf_spectacular.views import (SpectacularAPIView, SpectacularRedocView,
                                    SpectacularSwaggerView)
 
+from airport.metrics import metrics_view
 from config import settings
 
 urlpatterns = (
     [
         path("admin/", admin.site.urls),
+        path("metrics", metrics_view, name="metrics"),
         path("api/v1/airport/", include("airport.urls", namespace="airport")),
         path("api/v1/user/", include("user.urls", namespace="user")),
         path("api/schema/", SpectacularAPIView.as_view(), name="schema"),